@@ -9,6 +9,12 @@ from app.components.diagnostic_view import diagnostic_view
 from app.components.review_view import review_view
 from app.states.navigation import NavState
 from app.states.auth import AuthState
+from app.services.openai_client import openai_client_lifespan
+from app.services.progress_store import progress_store_lifespan
+from app.services.code_runner import code_runner_lifespan
+from app.services.question_bank import question_bank_lifespan
+from app.services.terminal_log import terminal_spill_lifespan
+from app.services.metrics import metrics_api
 
 
 def index() -> rx.Component:
@@ -67,5 +73,11 @@ app = rx.App(
             rel="stylesheet",
         ),
     ],
+    api_transformer=metrics_api,
 )
+app.register_lifespan_task(openai_client_lifespan)
+app.register_lifespan_task(progress_store_lifespan)
+app.register_lifespan_task(code_runner_lifespan)
+app.register_lifespan_task(question_bank_lifespan)
+app.register_lifespan_task(terminal_spill_lifespan)
 app.add_page(index, route="/")
\ No newline at end of file
@@ -84,7 +84,7 @@ def stats_summary() -> rx.Component:
     )
 
 
-from app.states.i18n import I18nState
+from app.states.i18n import t
 
 
 def course_header() -> rx.Component:
@@ -108,15 +108,11 @@ def course_header() -> rx.Component:
         rx.el.div(
             rx.el.div(
                 rx.el.span(
-                    I18nState.translations[I18nState.current_language][
-                        "course.progress"
-                    ],
+                    t("course.progress"),
                     class_name="text-xs font-bold text-slate-500 uppercase tracking-widest",
                 ),
                 rx.el.p(
-                    I18nState.translations[I18nState.current_language][
-                        "course.modules_completed"
-                    ]
+                    t("course.modules_completed")
                     .replace("{completed}", CourseState.completed_count.to_string())
                     .replace("{total}", CourseState.total_count.to_string()),
                     class_name="text-sm text-indigo-400 font-medium",
@@ -149,19 +145,13 @@ def module_card(module: dict) -> rx.Component:
                         status,
                         (
                             "completed",
-                            I18nState.translations[I18nState.current_language][
-                                "course.completed"
-                            ],
+                            t("course.completed"),
                         ),
                         (
                             "locked",
-                            I18nState.translations[I18nState.current_language][
-                                "course.locked"
-                            ],
+                            t("course.locked"),
                         ),
-                        I18nState.translations[I18nState.current_language][
-                            "course.active"
-                        ],
+                        t("course.active"),
                     ),
                     class_name=rx.match(
                         status,
@@ -200,19 +190,13 @@ def module_card(module: dict) -> rx.Component:
                     status,
                     (
                         "completed",
-                        I18nState.translations[I18nState.current_language][
-                            "course.review_module"
-                        ],
+                        t("course.review_module"),
                     ),
                     (
                         "locked",
-                        I18nState.translations[I18nState.current_language][
-                            "course.locked"
-                        ],
+                        t("course.locked"),
                     ),
-                    I18nState.translations[I18nState.current_language][
-                        "course.start_learning"
-                    ],
+                    t("course.start_learning"),
                 ),
                 on_click=CourseState.action_module(module["id"], status),
                 class_name=rx.match(
@@ -251,17 +235,15 @@ def level_up_modal() -> rx.Component:
             rx.el.div(
                 rx.el.span("🎉", class_name="text-6xl mb-6 block animate-bounce"),
                 rx.el.h2(
-                    I18nState.translations[I18nState.current_language][
-                        "course.level_complete"
-                    ]
+                    t("course.level_complete")
                     .replace("{level}", CourseState.current_level)
                     .replace("{topic}", CourseState.course_topic),
                     class_name="text-2xl font-bold text-white mb-2",
                 ),
                 rx.el.p(
-                    I18nState.translations[I18nState.current_language][
-                        "course.ready_advance"
-                    ].replace("{next_level}", CourseState.next_level_label),
+                    t("course.ready_advance").replace(
+                        "{next_level}", CourseState.next_level_label
+                    ),
                     class_name="text-slate-400 mb-8",
                 ),
                 rx.el.div(
@@ -288,16 +270,12 @@ def level_up_modal() -> rx.Component:
                 ),
                 rx.el.div(
                     rx.el.button(
-                        I18nState.translations[I18nState.current_language][
-                            "course.take_assessment"
-                        ],
+                        t("course.take_assessment"),
                         on_click=CourseState.start_level_up,
                         class_name="w-full py-4 bg-indigo-600 hover:bg-indigo-500 text-white rounded-2xl font-bold transition-all shadow-lg shadow-indigo-600/20 mb-3",
                     ),
                     rx.el.button(
-                        I18nState.translations[I18nState.current_language][
-                            "course.stay_current"
-                        ],
+                        t("course.stay_current"),
                         on_click=CourseState.set_show_level_up_modal(False),
                         class_name="w-full py-4 bg-slate-800 hover:bg-slate-700 text-slate-300 rounded-2xl font-semibold transition-all",
                     ),
@@ -6,7 +6,7 @@ def question_card() -> rx.Component:
     return rx.el.div(
         rx.el.div(
             rx.el.span(
-                f"Question {DiagnosticState.current_question_index + 1} of {DiagnosticState.total_questions}",
+                f"Question {DiagnosticState.current_question_index + 1} of up to {DiagnosticState.total_questions}",
                 class_name="text-xs font-bold text-indigo-400 uppercase tracking-widest mb-2 block",
             ),
             rx.el.h3(
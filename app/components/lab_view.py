@@ -2,6 +2,7 @@ import reflex as rx
 from app.states.lab import LabState
 from app.states.tutor import TutorState
 from app.components.tutor_panel import tutor_panel
+from app.components.virtual_list import virtual_list
 
 
 def tab_button(label: str, tab_id: str) -> rx.Component:
@@ -140,7 +141,8 @@ def editor_view() -> rx.Component:
             ),
             rx.cond(is_lang, "Check Answer", "Run Code"),
             on_click=LabState.run_code,
-            class_name="absolute bottom-12 right-12 flex items-center bg-indigo-600 hover:bg-indigo-500 text-white px-8 py-4 rounded-2xl shadow-xl shadow-indigo-600/30 transition-all font-bold tracking-wide z-10",
+            disabled=LabState.is_code_running,
+            class_name="absolute bottom-12 right-12 flex items-center bg-indigo-600 hover:bg-indigo-500 disabled:opacity-50 text-white px-8 py-4 rounded-2xl shadow-xl shadow-indigo-600/30 transition-all font-bold tracking-wide z-10",
         ),
         class_name="relative flex flex-1 bg-slate-950 min-h-[500px] overflow-hidden flex-col",
     )
@@ -149,12 +151,25 @@ def editor_view() -> rx.Component:
 def terminal_view() -> rx.Component:
     return rx.el.div(
         rx.el.div(
-            rx.foreach(
-                LabState.terminal_output,
-                lambda line: rx.el.p(
-                    line, class_name="font-mono text-xs text-emerald-400 py-0.5"
-                ),
+            rx.el.button(
+                rx.icon("eraser", class_name="h-3.5 w-3.5 mr-1.5"),
+                "Clear",
+                on_click=LabState.clear_terminal,
+                disabled=LabState.is_code_running,
+                class_name="flex items-center text-xs font-semibold text-slate-400 hover:text-white disabled:opacity-50 transition-colors",
+            ),
+            class_name="sticky top-0 flex justify-end px-6 pt-4 bg-black",
+        ),
+        virtual_list(
+            LabState.terminal_output,
+            lambda line: rx.el.p(
+                line, class_name="font-mono text-xs text-emerald-400 py-0.5"
             ),
+            row_height="1.25rem",
+            earlier_items=LabState.older_terminal_output,
+            has_earlier=LabState.has_older_terminal_output,
+            on_load_earlier=LabState.load_older_output,
+            load_earlier_label="Load older output",
             class_name="p-6",
         ),
         class_name="flex-1 bg-black overflow-auto",
@@ -1,7 +1,7 @@
 import reflex as rx
 from reflex_google_auth import google_login
 from app.states.onboarding import OnboardingState
-from app.states.i18n import I18nState
+from app.states.i18n import I18nState, t
 from app.states.auth import AuthState
 
 
@@ -43,15 +43,11 @@ def landing_page() -> rx.Component:
                     class_name="flex items-center justify-between mb-8",
                 ),
                 rx.el.h2(
-                    I18nState.translations[I18nState.current_language][
-                        "landing.hero_title"
-                    ],
+                    t("landing.hero_title"),
                     class_name="text-5xl md:text-7xl font-black text-white mb-6 leading-tight tracking-tight",
                 ),
                 rx.el.p(
-                    I18nState.translations[I18nState.current_language][
-                        "landing.hero_subtitle"
-                    ],
+                    t("landing.hero_subtitle"),
                     class_name="text-xl text-slate-400 mb-10 max-w-2xl",
                 ),
                 rx.el.div(google_login(), class_name="transform scale-110 origin-left"),
@@ -60,39 +56,23 @@ def landing_page() -> rx.Component:
             rx.el.div(
                 feature_card(
                     "brain-circuit",
-                    I18nState.translations[I18nState.current_language][
-                        "landing.feature_adaptive_title"
-                    ],
-                    I18nState.translations[I18nState.current_language][
-                        "landing.feature_adaptive_desc"
-                    ],
+                    t("landing.feature_adaptive_title"),
+                    t("landing.feature_adaptive_desc"),
                 ),
                 feature_card(
                     "message-circle",
-                    I18nState.translations[I18nState.current_language][
-                        "landing.feature_tutor_title"
-                    ],
-                    I18nState.translations[I18nState.current_language][
-                        "landing.feature_tutor_desc"
-                    ],
+                    t("landing.feature_tutor_title"),
+                    t("landing.feature_tutor_desc"),
                 ),
                 feature_card(
                     "target",
-                    I18nState.translations[I18nState.current_language][
-                        "landing.feature_quiz_title"
-                    ],
-                    I18nState.translations[I18nState.current_language][
-                        "landing.feature_quiz_desc"
-                    ],
+                    t("landing.feature_quiz_title"),
+                    t("landing.feature_quiz_desc"),
                 ),
                 feature_card(
                     "bar-chart-2",
-                    I18nState.translations[I18nState.current_language][
-                        "landing.feature_progress_title"
-                    ],
-                    I18nState.translations[I18nState.current_language][
-                        "landing.feature_progress_desc"
-                    ],
+                    t("landing.feature_progress_title"),
+                    t("landing.feature_progress_desc"),
                 ),
                 class_name="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-4 gap-6 w-full mt-12 mb-20",
             ),
@@ -111,9 +91,7 @@ def diagnostic_chat() -> rx.Component:
             ),
             rx.el.div(
                 rx.el.p(
-                    I18nState.translations[I18nState.current_language][
-                        "onboarding.skill_question"
-                    ],
+                    t("onboarding.skill_question"),
                     class_name="text-slate-200 text-sm leading-relaxed",
                 ),
                 class_name="bg-slate-800 border border-slate-700 p-4 rounded-2xl rounded-tl-none max-w-md shadow-xl",
@@ -122,9 +100,7 @@ def diagnostic_chat() -> rx.Component:
         ),
         rx.el.div(
             rx.el.button(
-                I18nState.translations[I18nState.current_language][
-                    "onboarding.beginner"
-                ],
+                t("onboarding.beginner"),
                 on_click=lambda: OnboardingState.select_skill("Beginner"),
                 class_name=rx.cond(
                     OnboardingState.skill_level == "Beginner",
@@ -133,9 +109,7 @@ def diagnostic_chat() -> rx.Component:
                 ),
             ),
             rx.el.button(
-                I18nState.translations[I18nState.current_language][
-                    "onboarding.intermediate"
-                ],
+                t("onboarding.intermediate"),
                 on_click=lambda: OnboardingState.select_skill("Intermediate"),
                 class_name=rx.cond(
                     OnboardingState.skill_level == "Intermediate",
@@ -144,9 +118,7 @@ def diagnostic_chat() -> rx.Component:
                 ),
             ),
             rx.el.button(
-                I18nState.translations[I18nState.current_language][
-                    "onboarding.advanced"
-                ],
+                t("onboarding.advanced"),
                 on_click=lambda: OnboardingState.select_skill("Advanced"),
                 class_name=rx.cond(
                     OnboardingState.skill_level == "Advanced",
@@ -168,9 +140,7 @@ def onboarding_view() -> rx.Component:
                 rx.el.div(
                     rx.el.div(
                         rx.el.h2(
-                            I18nState.translations[I18nState.current_language][
-                                "onboarding.title"
-                            ],
+                            t("onboarding.title"),
                             class_name="text-4xl md:text-5xl font-bold text-white mb-8 text-center tracking-tight",
                         ),
                         rx.el.form(
@@ -182,9 +152,7 @@ def onboarding_view() -> rx.Component:
                                     ),
                                     rx.el.input(
                                         name="search_query",
-                                        placeholder=I18nState.translations[
-                                            I18nState.current_language
-                                        ]["onboarding.placeholder"],
+                                        placeholder=t("onboarding.placeholder"),
                                         class_name="w-full bg-slate-800/50 border border-slate-700 text-white py-5 pl-16 pr-6 rounded-3xl focus:ring-2 focus:ring-indigo-500/50 focus:border-indigo-500 outline-none transition-all placeholder:text-slate-500 text-lg shadow-2xl",
                                         default_value=OnboardingState.search_query,
                                         key=OnboardingState.search_query,
@@ -232,15 +200,13 @@ def onboarding_view() -> rx.Component:
                                 class_name="h-12 w-12 text-indigo-500 animate-spin mb-4",
                             ),
                             rx.el.h3(
-                                I18nState.translations[I18nState.current_language][
-                                    "onboarding.preparing"
-                                ],
+                                t("onboarding.preparing"),
                                 class_name="text-xl font-semibold text-white animate-pulse",
                             ),
                             rx.el.p(
-                                I18nState.translations[I18nState.current_language][
-                                    "onboarding.generating_questions"
-                                ].replace("{topic}", OnboardingState.search_query),
+                                t("onboarding.generating_questions").replace(
+                                    "{topic}", OnboardingState.search_query
+                                ),
                                 class_name="text-slate-500 mt-2",
                             ),
                             class_name="flex flex-col items-center justify-center mt-12 animate-in fade-in duration-500",
@@ -1,7 +1,7 @@
 import reflex as rx
 from app.states.navigation import NavState
 from app.states.review import ReviewState
-from app.states.i18n import I18nState
+from app.states.i18n import I18nState, t
 
 
 def nav_item(item: dict[str, str]) -> rx.Component:
@@ -18,31 +18,23 @@ def nav_item(item: dict[str, str]) -> rx.Component:
                     item["id"],
                     (
                         "home",
-                        I18nState.translations[I18nState.current_language][
-                            "nav.explore"
-                        ],
+                        t("nav.explore"),
                     ),
                     (
                         "courses",
-                        I18nState.translations[I18nState.current_language][
-                            "nav.courses"
-                        ],
+                        t("nav.courses"),
                     ),
                     (
                         "lab",
-                        I18nState.translations[I18nState.current_language]["nav.lab"],
+                        t("nav.lab"),
                     ),
                     (
                         "reviews",
-                        I18nState.translations[I18nState.current_language][
-                            "nav.reviews"
-                        ],
+                        t("nav.reviews"),
                     ),
                     (
                         "settings",
-                        I18nState.translations[I18nState.current_language][
-                            "nav.settings"
-                        ],
+                        t("nav.settings"),
                     ),
                     item["label"],
                 ),
@@ -98,7 +90,7 @@ def sidebar() -> rx.Component:
             ),
             rx.el.div(
                 rx.el.p(
-                    I18nState.translations[I18nState.current_language]["nav.menu"],
+                    t("nav.menu"),
                     class_name="text-[10px] font-bold text-slate-500 tracking-widest mb-4 px-4",
                 ),
                 rx.el.nav(
@@ -1,5 +1,6 @@
 import reflex as rx
 from app.states.tutor import TutorState
+from app.components.virtual_list import virtual_list
 
 
 def style_button(label: str, value: str, icon: str) -> rx.Component:
@@ -77,7 +78,14 @@ def tutor_panel() -> rx.Component:
                 class_name="flex gap-2 p-4 bg-slate-900/50 border-b border-slate-800",
             ),
             rx.el.div(
-                rx.foreach(TutorState.messages, chat_bubble),
+                virtual_list(
+                    TutorState.messages,
+                    chat_bubble,
+                    row_height="6rem",
+                    has_earlier=TutorState.has_earlier_messages,
+                    on_load_earlier=TutorState.load_earlier_messages,
+                    load_earlier_label="Show earlier messages",
+                ),
                 rx.cond(
                     TutorState.is_loading,
                     rx.el.div(
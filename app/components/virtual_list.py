@@ -0,0 +1,45 @@
+import reflex as rx
+from typing import Callable
+
+
+def virtual_list(
+    items: rx.Var,
+    render_row: Callable[[rx.Var], rx.Component],
+    row_height: str = "3rem",
+    earlier_items: rx.Var | None = None,
+    has_earlier: rx.Var | bool = False,
+    on_load_earlier: rx.event.EventType | None = None,
+    load_earlier_label: str = "Show earlier",
+    class_name: str = "",
+) -> rx.Component:
+    """
+    List that renders a windowed slice of rows supplied by state.
+    State keeps only the most recent rows in `items` and pages older ones in
+    through `on_load_earlier`, either into `items` itself or into a separate
+    `earlier_items` list rendered above it. Each row is wrapped with CSS
+    `content-visibility: auto` so the browser skips layout and paint for rows
+    scrolled out of view; `row_height` is the placeholder size used for them.
+    """
+
+    def row(item: rx.Var) -> rx.Component:
+        return rx.el.div(
+            render_row(item),
+            style={
+                "content_visibility": "auto",
+                "contain_intrinsic_size": f"auto {row_height}",
+            },
+        )
+
+    return rx.el.div(
+        rx.cond(
+            has_earlier,
+            rx.el.button(
+                load_earlier_label,
+                on_click=on_load_earlier,
+                class_name="w-full mb-4 py-2 text-xs font-semibold text-slate-400 hover:text-white bg-slate-800/50 hover:bg-slate-800 rounded-xl transition-colors",
+            ),
+        ),
+        rx.foreach(earlier_items, row) if earlier_items is not None else rx.fragment(),
+        rx.foreach(items, row),
+        class_name=class_name,
+    )
@@ -0,0 +1,83 @@
+import os
+import numpy as np
+
+CAT_MIN_ITEMS = int(os.getenv("SKILLFORGE_CAT_MIN_ITEMS", "4"))
+CAT_MAX_ITEMS = int(os.getenv("SKILLFORGE_CAT_MAX_ITEMS", "8"))
+CAT_TARGET_SE = float(os.getenv("SKILLFORGE_CAT_TARGET_SE", "0.7"))
+DIFFICULTY_LOCATIONS = {"easy": -1.2, "medium": 0.0, "hard": 1.2}
+INFORMATION_TIE = 0.01
+_GRID = np.linspace(-4, 4, 81)
+_PRIOR = np.exp(-0.5 * _GRID**2)
+PRIOR_SE = float(np.sqrt(np.sum(_PRIOR * _GRID**2) / np.sum(_PRIOR)))
+
+
+def item_location(item: dict) -> float:
+    """
+    Rasch difficulty of an item on the ability scale. Uses the item's own
+    `b` parameter when it has been calibrated, otherwise its difficulty label.
+    """
+    if item.get("b") is not None:
+        return float(item["b"])
+    return DIFFICULTY_LOCATIONS.get(str(item.get("difficulty", "")).lower(), 0.0)
+
+
+def probability_correct(theta, b):
+    return 1.0 / (1.0 + np.exp(-(np.asarray(theta) - b)))
+
+
+def estimate_ability(responses: list[tuple[float, bool]]) -> tuple[float, float]:
+    """
+    Expected a posteriori ability estimate from (item location, correct)
+    pairs under a Rasch model with a standard normal prior.
+    Returns (theta, standard error).
+    """
+    posterior = _PRIOR.copy()
+    for b, correct in responses:
+        p = probability_correct(_GRID, b)
+        posterior *= p if correct else 1.0 - p
+    posterior /= posterior.sum()
+    theta = float(np.sum(posterior * _GRID))
+    se = float(np.sqrt(np.sum(posterior * (_GRID - theta) ** 2)))
+    return (theta, se)
+
+
+def select_next_item(
+    bank: list[dict], asked_ids: set[str], theta: float, asked_subtopics: list[str]
+) -> dict | None:
+    """
+    Picks the unasked item with the most Fisher information at `theta`.
+    Among items within INFORMATION_TIE of the best, the one whose subtopic
+    has been asked least wins, so the test still spreads across subtopics.
+    """
+    candidates = [item for item in bank if item["id"] not in asked_ids]
+    if not candidates:
+        return None
+    p = probability_correct(theta, np.array([item_location(i) for i in candidates]))
+    information = p * (1.0 - p)
+    best = information.max()
+    near_best = [
+        item
+        for item, info in zip(candidates, information)
+        if info >= best - INFORMATION_TIE
+    ]
+    return min(near_best, key=lambda item: asked_subtopics.count(item.get("subtopic", "")))
+
+
+def should_stop(answered: int, se: float, bank_size: int) -> bool:
+    if answered >= min(CAT_MAX_ITEMS, bank_size):
+        return True
+    return answered >= CAT_MIN_ITEMS and se <= CAT_TARGET_SE
+
+
+def progress_fraction(answered: int, se: float) -> float:
+    """How far the test is towards stopping, by item count or precision."""
+    by_count = answered / CAT_MAX_ITEMS
+    by_precision = (PRIOR_SE - se) / (PRIOR_SE - CAT_TARGET_SE)
+    if answered < CAT_MIN_ITEMS:
+        by_precision = min(by_precision, answered / CAT_MIN_ITEMS)
+    return float(np.clip(max(by_count, by_precision), 0.0, 1.0))
+
+
+def ability_to_score(theta: float) -> int:
+    """Chance, as a percentage, of answering a medium-difficulty item correctly."""
+    return int(round(100 * float(probability_correct(theta, 0.0))))
@@ -1,14 +1,22 @@
-import os
 import json
+import asyncio
 import logging
-from openai import AsyncOpenAI
+from typing import AsyncIterator
+from app.services.openai_client import get_client
+from app.services.content_cache import ContentCache, make_cache_key
+from app.services.single_flight import SingleFlight
+from app.services.question_bank import get_question_bank
+from app.services.translation import (
+    CANONICAL_LANGUAGE,
+    translate_content,
+    translate_curriculum,
+)
 
 MODEL = "gpt-4o-mini"
-
-
-def _get_client() -> AsyncOpenAI:
-    """Lazily initialize the OpenAI client."""
-    return AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+MODULE_PROMPT_VERSION = 2
+module_content_cache = ContentCache("module_content")
+curriculum_flight = SingleFlight("course_curriculum")
+module_section_flight = SingleFlight("module_section")
 
 
 def _extract_json_from_text(text: str) -> str:
@@ -38,8 +46,20 @@ async def generate_course_curriculum(
     """
     Generates a list of course modules based on the topic and skill level.
     Returns a list of dictionaries with keys: id, title, description, status, progress.
+    The curriculum is generated in the canonical language and translated;
+    each module's canonical title is kept in `source_title`. Concurrent identical requests share a single generation.
     """
-    client = _get_client()
+    modules = await curriculum_flight.do(
+        make_cache_key(topic, skill_level, CANONICAL_LANGUAGE),
+        lambda: _generate_course_curriculum(topic, skill_level, CANONICAL_LANGUAGE),
+    )
+    return await translate_curriculum(modules, language)
+
+
+async def _generate_course_curriculum(
+    topic: str, skill_level: str, language: str
+) -> list[dict]:
+    client = get_client()
     lang_name = _get_lang_name(language)
     prompt = f"\n    Create a structured course curriculum for learning '{topic}' at a '{skill_level}' level.\n    Generate all content in {lang_name}. The module titles and descriptions must be in {lang_name}.\n    The response must be a JSON object with a key 'modules' containing an array of exactly 6 module objects.\n    The first module should be 'completed' with 100% progress.\n    The second module should be 'active' with 0% progress.\n    The rest should be 'locked' with 0% progress.\n\n    Each module object must have:\n    - id: string (m1, m2, etc)\n    - title: string\n    - description: string (short, 1-2 sentences)\n    - status: string ('completed', 'active', or 'locked')\n    - progress: integer (0-100)\n    "
     raw_content = ""
@@ -87,6 +107,216 @@ async def generate_course_curriculum(
         ]
 
 
+MODULE_SECTIONS = ("content", "exercises", "flashcards", "quiz_questions")
+SECTION_RETRIES = 2
+
+
+def _section_prompt(
+    section: str, topic: str, module_title: str, lang_name: str
+) -> str:
+    intro = f"\n    For the module '{module_title}' within the topic '{topic}', generate the part of the lesson described below.\n    Generate all content in {lang_name}.\n\n    You MUST return a valid JSON object with exactly this key and structure:\n\n"
+    if section == "content":
+        return (
+            intro
+            + """    {
+        "content": "...Detailed markdown educational content here (headings, code examples, concepts)..."
+    }
+
+    The content must be a deep explanation of the module with headings and examples.
+    """
+        )
+    if section == "exercises":
+        return (
+            intro
+            + """    {
+        "exercises": [
+            {
+                "id": "e1",
+                "prompt": "Write a function that... (or Translate this sentence...)",
+                "expected_answer": "def my_func(): ... (or The translated sentence)"
+            },
+            ... (generate exactly 10 exercises)
+        ]
+    }
+
+    'exercises' must be an array of exactly 10 objects with keys 'id', 'prompt', 'expected_answer'.
+    """
+        )
+    if section == "flashcards":
+        return (
+            intro
+            + """    {
+        "flashcards": [
+            {
+                "id": "f1",
+                "front": "Polymorphism (or Word in target language)",
+                "back": "The ability of different classes to be treated as instances of the same class... (or Definition/Translation)"
+            },
+            ... (generate exactly 10 flashcards)
+        ]
+    }
+
+    'flashcards' must be an array of exactly 10 objects with keys 'id', 'front', 'back'.
+    """
+        )
+    return (
+        intro
+        + """    {
+        "quiz_questions": [
+            {
+                "id": "q1",
+                "question": "What is the main difference between Stack and Heap?",
+                "difficulty": "medium",
+                "explanation": "Stack is static memory allocation, while Heap is dynamic...",
+                "options": [
+                    {"id": "a", "text": "Stack is slower"},
+                    {"id": "b", "text": "Heap is static"},
+                    {"id": "c", "text": "Stack is static, Heap is dynamic"},
+                    {"id": "d", "text": "They are the same"}
+                ],
+                "correct_id": "c"
+            },
+            ... (generate exactly 10 quiz questions)
+        ]
+    }
+
+    IMPORTANT RULES:
+    1. 'quiz_questions' must be an array of exactly 10 objects. Each object must have 'id', 'question', 'difficulty' (easy/medium/hard), 'explanation', 'correct_id', and 'options'.
+    2. 'options' must be an array of objects with 'id' and 'text'. Do NOT use simple strings for options.
+    """
+    )
+
+
+def _fallback_section(section: str, module_title: str) -> str | list[dict]:
+    if section == "content":
+        return f"### {module_title}\n\nError generating content for this module."
+    if section == "exercises":
+        return [
+            {
+                "id": f"e{i}",
+                "prompt": "Error loading exercise",
+                "expected_answer": "error",
+            }
+            for i in range(10)
+        ]
+    if section == "flashcards":
+        return [
+            {"id": f"f{i}", "front": "Error", "back": "Error loading data"}
+            for i in range(10)
+        ]
+    return [
+        {
+            "id": f"q{i}",
+            "question": "Error loading quiz question",
+            "difficulty": "medium",
+            "explanation": "System error occurred.",
+            "options": [{"id": "a", "text": "Retry"}],
+            "correct_id": "a",
+        }
+        for i in range(10)
+    ]
+
+
+async def _generate_section(
+    topic: str, module_title: str, language: str, section: str
+) -> tuple[str, str | list[dict], bool]:
+    """
+    Generates one section of a module, retrying malformed responses.
+    Returns (section, value, ok); on repeated failure value is a placeholder.
+    """
+    client = get_client()
+    prompt = _section_prompt(section, topic, module_title, _get_lang_name(language))
+    for attempt in range(SECTION_RETRIES + 1):
+        raw_content = ""
+        try:
+            response = await client.chat.completions.create(
+                model=MODEL,
+                messages=[
+                    {
+                        "role": "system",
+                        "content": "You are an expert tutor and curriculum designer. You always output strictly valid JSON conforming to the requested schema.",
+                    },
+                    {"role": "user", "content": prompt},
+                ],
+                response_format={"type": "json_object"},
+                temperature=0.7,
+            )
+            raw_content = response.choices[0].message.content
+            cleaned_json = _extract_json_from_text(raw_content)
+            value = json.loads(cleaned_json)[section]
+            expected_type = str if section == "content" else list
+            if not isinstance(value, expected_type) or not value:
+                raise ValueError(f"Section '{section}' is empty or malformed")
+            return (section, value, True)
+        except Exception as e:
+            logging.exception(
+                f"Error generating module {section} (attempt {attempt + 1}). Raw content: {raw_content}"
+            )
+    return (section, _fallback_section(section, module_title), False)
+
+
+async def iter_module_sections(
+    topic: str, module_title: str, language: str = "en"
+) -> AsyncIterator[tuple[str, str | list[dict]]]:
+    """
+    Yields the module's (section, value) pairs in `language`, in completion
+    order. Sections are generated once in the canonical language and other
+    languages are derived from them with a cached translation pass, which
+    keeps ids and `correct_id` unchanged.
+    """
+    async for section, value in _iter_canonical_sections(topic, module_title):
+        yield (section, await translate_content(value, language))
+
+
+async def _iter_canonical_sections(
+    topic: str, module_title: str
+) -> AsyncIterator[tuple[str, str | list[dict]]]:
+    """
+    Generates the module's sections concurrently in the canonical language
+    and yields (section, value) pairs in completion order so callers can
+    render each part as it lands. Generated quiz questions are added to the
+    shared question bank and carry their bank id. The assembled module is
+    cached only if every section succeeded.
+    """
+    language = CANONICAL_LANGUAGE
+    cache_key = make_cache_key(
+        topic, module_title, language, MODEL, MODULE_PROMPT_VERSION
+    )
+    cached = await module_content_cache.get(cache_key)
+    if cached is not None:
+        for section in MODULE_SECTIONS:
+            yield (section, cached[section])
+        return
+    tasks = [
+        asyncio.create_task(
+            module_section_flight.do(
+                make_cache_key(topic, module_title, language, section),
+                lambda section=section: _generate_section(
+                    topic, module_title, language, section
+                ),
+            )
+        )
+        for section in MODULE_SECTIONS
+    ]
+    module_data = {}
+    all_ok = True
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            section, value, ok = await next_done
+            if ok and section == "quiz_questions":
+                value = await get_question_bank().ingest(
+                    value, "quiz", topic, module_title, language
+                )
+            module_data[section] = value
+            all_ok = all_ok and ok
+            yield (section, value)
+    finally:
+        for task in tasks:
+            task.cancel()
+    if all_ok:
+        await module_content_cache.set(cache_key, module_data)
+
+
 async def generate_module_content(
     topic: str, module_title: str, language: str = "en"
 ) -> dict:
@@ -102,55 +332,13 @@ async def generate_module_content(
     - exercises: array of exactly 10 objects [{"id": "e1", "prompt": "Task description", "expected_answer": "answer_code_or_text"}]
     - flashcards: array of exactly 10 objects [{"id": "f1", "front": "Term/Concept", "back": "Definition/Translation"}]
     - quiz_questions: array of exactly 10 objects [{"id": "q1", "question": "Question text", "difficulty": "easy/medium/hard", "explanation": "Brief explanation of the correct answer", "options": [{"id": "a", "text": "Option text"}], "correct_id": "a"}]
+
+    Each part is generated by its own request, so a malformed section only
+    falls back on its own. Successful generations are cached per
+    (topic, module_title) in the canonical language, so learners opening a
+    popular module reuse the first learner's result in any language.
     """
-    client = _get_client()
-    lang_name = _get_lang_name(language)
-    prompt = f"""\n    Generate detailed educational content and interactive activities for the module '{module_title}' within the topic '{topic}'. \n    Generate all content in {lang_name}. The module explanation, quiz questions, flashcards, and exercises must all be in {lang_name}.\n\n    You MUST return a valid JSON object with exactly these keys and structure:\n\n    {{\n        "content": "...Detailed markdown educational content here (headings, code examples, concepts)...",\n        "exercises": [\n            {{\n                "id": "e1",\n                "prompt": "Write a function that... (or Translate this sentence...)",\n                "expected_answer": "def my_func(): ... (or The translated sentence)"\n            }},\n            ... (generate exactly 10 exercises)\n        ],\n        "flashcards": [\n            {{\n                "id": "f1",\n                "front": "Polymorphism (or Word in target language)",\n                "back": "The ability of different classes to be treated as instances of the same class... (or Definition/Translation)"\n            }},\n            ... (generate exactly 10 flashcards)\n        ],\n        "quiz_questions": [\n            {{\n                "id": "q1",\n                "question": "What is the main difference between Stack and Heap?",\n                "difficulty": "medium",\n                "explanation": "Stack is static memory allocation, while Heap is dynamic...",\n                "options": [\n                    {{"id": "a", "text": "Stack is slower"}},\n                    {{"id": "b", "text": "Heap is static"}},\n                    {{"id": "c", "text": "Stack is static, Heap is dynamic"}},\n                    {{"id": "d", "text": "They are the same"}}\n                ],\n                "correct_id": "c"\n            }},\n            ... (generate exactly 10 quiz questions)\n        ]\n    }}\n\n    IMPORTANT RULES:\n    1. 'exercises': Must be an array of exactly 10 objects with keys 'id', 'prompt', 'expected_answer'.\n    2. 'flashcards': Must be an array of exactly 10 objects with keys 'id', 'front', 'back'.\n    3. 'quiz_questions': Must be an array of exactly 10 objects. Each object must have 'id', 'question', 'difficulty' (easy/medium/hard), 'explanation', 'correct_id', and 'options'.\n    4. 'options' inside 'quiz_questions' must be an array of objects with 'id' and 'text'. Do NOT use simple strings for options.\n    """
-    raw_content = ""
-    try:
-        response = await client.chat.completions.create(
-            model=MODEL,
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are an expert tutor and curriculum designer. You always output strictly valid JSON conforming to the requested schema.",
-                },
-                {"role": "user", "content": prompt},
-            ],
-            response_format={"type": "json_object"},
-            temperature=0.7,
-        )
-        raw_content = response.choices[0].message.content
-        cleaned_json = _extract_json_from_text(raw_content)
-        module_data = json.loads(cleaned_json)
-        return module_data
-    except Exception as e:
-        logging.exception(
-            f"Error generating module content. Raw content: {raw_content}"
-        )
-        return {
-            "content": f"### {module_title}\n\nError generating content for this module.",
-            "exercises": [
-                {
-                    "id": f"e{i}",
-                    "prompt": "Error loading exercise",
-                    "expected_answer": "error",
-                }
-                for i in range(10)
-            ],
-            "flashcards": [
-                {"id": f"f{i}", "front": "Error", "back": "Error loading data"}
-                for i in range(10)
-            ],
-            "quiz_questions": [
-                {
-                    "id": f"q{i}",
-                    "question": "Error loading quiz question",
-                    "difficulty": "medium",
-                    "explanation": "System error occurred.",
-                    "options": [{"id": "a", "text": "Retry"}],
-                    "correct_id": "a",
-                }
-                for i in range(10)
-            ],
-        }
\ No newline at end of file
+    module_data = {}
+    async for section, value in iter_module_sections(topic, module_title, language):
+        module_data[section] = value
+    return module_data
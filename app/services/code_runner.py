@@ -0,0 +1,243 @@
+import os
+import sys
+import json
+import time
+import shutil
+import asyncio
+import logging
+import tempfile
+from collections import deque
+from contextlib import aclosing, asynccontextmanager
+from typing import AsyncIterator
+
+SANDBOX_WORKERS = int(
+    os.getenv("SKILLFORGE_SANDBOX_WORKERS", str(os.cpu_count() or 2))
+)
+SANDBOX_WORKER_MAX_RUNS = int(os.getenv("SKILLFORGE_SANDBOX_WORKER_MAX_RUNS", "100"))
+SANDBOX_TIMEOUT_SECONDS = float(os.getenv("SKILLFORGE_SANDBOX_TIMEOUT_SECONDS", "5"))
+SANDBOX_MEMORY_MB = int(os.getenv("SKILLFORGE_SANDBOX_MEMORY_MB", "256"))
+SANDBOX_MAX_OUTPUT_BYTES = int(
+    os.getenv("SKILLFORGE_SANDBOX_MAX_OUTPUT_BYTES", "65536")
+)
+SANDBOX_UID = int(os.getenv("SKILLFORGE_SANDBOX_UID", "65534"))
+SANDBOX_GID = int(os.getenv("SKILLFORGE_SANDBOX_GID", "65534"))
+WORKER_SCRIPT = os.path.join(os.path.dirname(__file__), "sandbox_worker.py")
+WORKER_REPLY_GRACE_SECONDS = 5
+WORKER_ENV = {"PATH": "/usr/bin:/bin", "LANG": "C.UTF-8"}
+METRIC_SAMPLES = 1000
+_pool: "CodeRunnerPool | None" = None
+
+
+def _percentile(samples: deque, fraction: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+class _Worker:
+    def __init__(self, process: asyncio.subprocess.Process, workdir: str):
+        self.process = process
+        self.workdir = workdir
+        self.runs = 0
+
+
+class CodeRunnerPool:
+    """
+    Runs learner Python code in a pool of pre-started sandbox workers.
+    Each worker is a long-lived interpreter that forks a fresh child per run
+    with CPU, memory, file and process limits and network access blocked, so
+    a run costs a fork rather than an interpreter start. Workers get a
+    minimal environment and a private temporary directory, and runs may
+    only write inside it. Workers are retired
+    after `max_runs` runs. At most `size` runs execute at once; the rest wait
+    for a free worker, and that wait is recorded separately from execution
+    time.
+    """
+
+    def __init__(
+        self, size: int = SANDBOX_WORKERS, max_runs: int = SANDBOX_WORKER_MAX_RUNS
+    ):
+        self.size = size
+        self.max_runs = max_runs
+        self._idle: list[_Worker] = []
+        self._slots = asyncio.Semaphore(size)
+        self._reaping: set[asyncio.Task] = set()
+        self.runs = 0
+        self.timeouts = 0
+        self.recycled = 0
+        self.queue_wait_seconds: deque[float] = deque(maxlen=METRIC_SAMPLES)
+        self.execution_seconds: deque[float] = deque(maxlen=METRIC_SAMPLES)
+
+    async def _spawn(self) -> _Worker:
+        workdir = tempfile.mkdtemp(prefix="skillforge_sandbox_")
+        try:
+            os.chmod(workdir, 0o711)
+            process = await asyncio.create_subprocess_exec(
+                sys.executable,
+                "-I",
+                WORKER_SCRIPT,
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                limit=1024 * 1024,
+                cwd=workdir,
+                env={**WORKER_ENV, "TMPDIR": workdir},
+            )
+        except BaseException:
+            shutil.rmtree(workdir, ignore_errors=True)
+            raise
+        return _Worker(process, workdir)
+
+    async def start(self):
+        """Starts idle workers up to the pool size ahead of the first run."""
+        missing = self.size - len(self._idle)
+        if missing > 0:
+            self._idle.extend(
+                await asyncio.gather(*(self._spawn() for _ in range(missing)))
+            )
+
+    def _retire(self, worker: _Worker):
+        """
+        Closes the worker's stdin, which makes it kill any running child and
+        exit; the process is killed outright if it has not exited shortly after.
+        """
+        if worker.process.stdin and not worker.process.stdin.is_closing():
+            worker.process.stdin.close()
+        task = asyncio.create_task(self._reap(worker))
+        self._reaping.add(task)
+        task.add_done_callback(self._reaping.discard)
+
+    async def _reap(self, worker: _Worker):
+        try:
+            await asyncio.wait_for(worker.process.wait(), WORKER_REPLY_GRACE_SECONDS)
+        except asyncio.TimeoutError:
+            worker.process.kill()
+            await worker.process.wait()
+        finally:
+            shutil.rmtree(worker.workdir, ignore_errors=True)
+
+    def _release(self, worker: _Worker, healthy: bool):
+        if healthy and worker.runs < self.max_runs:
+            self._idle.append(worker)
+            return
+        if healthy:
+            self.recycled += 1
+        self._retire(worker)
+
+    async def stream(
+        self,
+        code: str,
+        stdin: str = "",
+        timeout: float = SANDBOX_TIMEOUT_SECONDS,
+        module_name: str = "__main__",
+    ) -> AsyncIterator[dict]:
+        """
+        Runs `code` and yields `{"type": "stdout" | "stderr", "data": ...}`
+        messages as output is produced, then one `{"type": "exit", ...}`
+        message with the exit code, limit flags and timings. Consume it with
+        `contextlib.aclosing` so an abandoned run releases its worker.
+        A `module_name` other than `__main__` skips the program's
+        `if __name__ == "__main__"` block.
+        """
+        queued_at = time.monotonic()
+        async with self._slots:
+            queue_wait = time.monotonic() - queued_at
+            worker = None
+            healthy = False
+            try:
+                worker = self._idle.pop() if self._idle else await self._spawn()
+                job = {
+                    "code": code,
+                    "stdin": stdin,
+                    "module_name": module_name,
+                    "timeout": timeout,
+                    "memory_mb": SANDBOX_MEMORY_MB,
+                    "max_output_bytes": SANDBOX_MAX_OUTPUT_BYTES,
+                    "uid": SANDBOX_UID,
+                    "gid": SANDBOX_GID,
+                }
+                worker.process.stdin.write(json.dumps(job).encode("utf-8") + b"\n")
+                await worker.process.stdin.drain()
+                while True:
+                    line = await asyncio.wait_for(
+                        worker.process.stdout.readline(),
+                        timeout + WORKER_REPLY_GRACE_SECONDS,
+                    )
+                    if not line:
+                        raise RuntimeError("Sandbox worker exited unexpectedly")
+                    message = json.loads(line)
+                    if message["type"] != "exit":
+                        yield message
+                        continue
+                    healthy = True
+                    worker.runs += 1
+                    self.runs += 1
+                    self.timeouts += message["timed_out"]
+                    self.queue_wait_seconds.append(queue_wait)
+                    self.execution_seconds.append(message["duration"])
+                    yield {**message, "queue_wait": queue_wait}
+                    return
+            finally:
+                if worker is not None:
+                    self._release(worker, healthy)
+
+    async def run(
+        self,
+        code: str,
+        stdin: str = "",
+        timeout: float = SANDBOX_TIMEOUT_SECONDS,
+        module_name: str = "__main__",
+    ) -> dict:
+        """Runs `code` to completion and returns its output and exit details."""
+        result = {"stdout": "", "stderr": ""}
+        stream = self.stream(code, stdin, timeout, module_name)
+        async with aclosing(stream) as messages:
+            async for message in messages:
+                if message["type"] == "exit":
+                    result.update(message)
+                else:
+                    result[message["type"]] += message["data"]
+        del result["type"]
+        return result
+
+    async def close(self):
+        """Shuts down idle workers. Runs in progress finish on their own."""
+        idle, self._idle = self._idle, []
+        for worker in idle:
+            self._retire(worker)
+        if self._reaping:
+            await asyncio.gather(*self._reaping, return_exceptions=True)
+
+    def stats(self) -> dict:
+        return {
+            "runs": self.runs,
+            "timeouts": self.timeouts,
+            "recycled": self.recycled,
+            "idle_workers": len(self._idle),
+            "queue_wait_p50": _percentile(self.queue_wait_seconds, 0.5),
+            "queue_wait_p95": _percentile(self.queue_wait_seconds, 0.95),
+            "execution_p50": _percentile(self.execution_seconds, 0.5),
+            "execution_p95": _percentile(self.execution_seconds, 0.95),
+        }
+
+
+def get_code_runner() -> CodeRunnerPool:
+    """Returns the process-wide sandbox worker pool."""
+    global _pool
+    if _pool is None:
+        _pool = CodeRunnerPool()
+    return _pool
+
+
+@asynccontextmanager
+async def code_runner_lifespan():
+    """App lifespan task that pre-starts sandbox workers and stops them on shutdown."""
+    try:
+        await get_code_runner().start()
+    except Exception as e:
+        logging.exception(f"Error starting sandbox workers: {e}")
+    try:
+        yield
+    finally:
+        if _pool is not None:
+            await _pool.close()
@@ -0,0 +1,184 @@
+import os
+import copy
+import json
+import time
+import hashlib
+import sqlite3
+import asyncio
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any
+
+CACHE_DB_PATH = os.getenv("SKILLFORGE_CACHE_PATH", "skillforge_cache.db")
+CACHE_MEMORY_ENTRIES = int(os.getenv("SKILLFORGE_CACHE_MEMORY_ENTRIES", "256"))
+CACHE_DISK_ENTRIES = int(os.getenv("SKILLFORGE_CACHE_DISK_ENTRIES", "5000"))
+CACHE_TTL_SECONDS = int(os.getenv("SKILLFORGE_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+
+
+def make_cache_key(*parts: Any) -> str:
+    """
+    Builds a content-addressed key from the given parts.
+    Strings are normalized (trimmed, lowercased, whitespace collapsed) so that
+    trivially different spellings of the same request share an entry.
+    """
+    normalized = []
+    for part in parts:
+        if isinstance(part, str):
+            normalized.append(" ".join(part.lower().split()))
+        else:
+            normalized.append(part)
+    payload = json.dumps(normalized, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ContentCache:
+    """
+    Two-tier cache for generated content: an in-memory LRU in front of a
+    SQLite table shared by every worker on the host. Entries expire after
+    `ttl_seconds`; both tiers are bounded and evict least recently used rows.
+    """
+
+    instances: list["ContentCache"] = []
+
+    def __init__(
+        self,
+        namespace: str,
+        db_path: str = CACHE_DB_PATH,
+        max_memory_entries: int = CACHE_MEMORY_ENTRIES,
+        max_disk_entries: int = CACHE_DISK_ENTRIES,
+        ttl_seconds: int = CACHE_TTL_SECONDS,
+    ):
+        self.namespace = namespace
+        self.db_path = db_path
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self.ttl_seconds = ttl_seconds
+        self._memory: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._db_ready = False
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        ContentCache.instances.append(self)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        if not self._db_ready:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache_entries ("
+                "namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, "
+                "created_at REAL NOT NULL, accessed_at REAL NOT NULL, "
+                "PRIMARY KEY (namespace, key))"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_cache_entries_accessed "
+                "ON cache_entries (namespace, accessed_at)"
+            )
+            conn.commit()
+            self._db_ready = True
+        return conn
+
+    def _disk_get(self, key: str) -> tuple[float, Any] | None:
+        with self._lock:
+            conn = self._connect()
+            try:
+                row = conn.execute(
+                    "SELECT value, created_at FROM cache_entries WHERE namespace = ? AND key = ?",
+                    (self.namespace, key),
+                ).fetchone()
+                if row is None:
+                    return None
+                value, created_at = row
+                if time.time() - created_at > self.ttl_seconds:
+                    conn.execute(
+                        "DELETE FROM cache_entries WHERE namespace = ? AND key = ?",
+                        (self.namespace, key),
+                    )
+                    conn.commit()
+                    return None
+                conn.execute(
+                    "UPDATE cache_entries SET accessed_at = ? WHERE namespace = ? AND key = ?",
+                    (time.time(), self.namespace, key),
+                )
+                conn.commit()
+                return (created_at, json.loads(value))
+            finally:
+                conn.close()
+
+    def _disk_set(self, key: str, value: Any, created_at: float):
+        with self._lock:
+            conn = self._connect()
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO cache_entries (namespace, key, value, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                    (
+                        self.namespace,
+                        key,
+                        json.dumps(value, ensure_ascii=False),
+                        created_at,
+                        created_at,
+                    ),
+                )
+                cursor = conn.execute(
+                    "DELETE FROM cache_entries WHERE namespace = ? AND key IN ("
+                    "SELECT key FROM cache_entries WHERE namespace = ? "
+                    "ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                    (self.namespace, self.namespace, self.max_disk_entries),
+                )
+                self.evictions += max(cursor.rowcount, 0)
+                conn.commit()
+            finally:
+                conn.close()
+
+    def _remember(self, key: str, created_at: float, value: Any):
+        self._memory[key] = (created_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    async def get(self, key: str) -> Any | None:
+        entry = self._memory.get(key)
+        if entry is not None:
+            created_at, value = entry
+            if time.time() - created_at <= self.ttl_seconds:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return copy.deepcopy(value)
+            del self._memory[key]
+        try:
+            entry = await asyncio.to_thread(self._disk_get, key)
+        except Exception as e:
+            logging.exception(f"Error reading {self.namespace} cache: {e}")
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        created_at, value = entry
+        self._remember(key, created_at, value)
+        self.disk_hits += 1
+        return copy.deepcopy(value)
+
+    async def set(self, key: str, value: Any):
+        created_at = time.time()
+        self._remember(key, created_at, copy.deepcopy(value))
+        try:
+            await asyncio.to_thread(self._disk_set, key, value, created_at)
+        except Exception as e:
+            logging.exception(f"Error writing {self.namespace} cache: {e}")
+
+    def stats(self) -> dict[str, int | float]:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "memory_entries": len(self._memory),
+            "hit_ratio": (self.memory_hits + self.disk_hits) / lookups
+            if lookups
+            else 0.0,
+        }
@@ -0,0 +1,49 @@
+import os
+from app.services.retrieval import estimate_tokens
+
+MEMORY_RECENT_MESSAGES = int(os.getenv("SKILLFORGE_TUTOR_RECENT_MESSAGES", "8"))
+MEMORY_FOLD_BATCH = int(os.getenv("SKILLFORGE_TUTOR_FOLD_BATCH", "6"))
+MEMORY_TOKEN_BUDGET = int(os.getenv("SKILLFORGE_TUTOR_HISTORY_TOKENS", "1200"))
+
+
+def messages_to_fold(
+    turns: list[dict],
+    keep: int = MEMORY_RECENT_MESSAGES,
+    batch: int = MEMORY_FOLD_BATCH,
+) -> list[dict]:
+    """
+    Returns the oldest messages that should be folded into the rolling
+    summary. Folding only happens once `batch` messages have accumulated
+    beyond the verbatim window, so the summary is refreshed every few turns
+    rather than on every message.
+    """
+    if len(turns) < keep + batch:
+        return []
+    return turns[: len(turns) - keep]
+
+
+def history_window(
+    summary: str, turns: list[dict], token_budget: int = MEMORY_TOKEN_BUDGET
+) -> list[dict]:
+    """
+    Builds the chat history sent to the model: the rolling summary (if any)
+    followed by as many of the most recent turns as fit in `token_budget`.
+    """
+    history = []
+    used = 0
+    if summary:
+        summary_message = {
+            "role": "system",
+            "content": f"Summary of the earlier conversation with this learner: {summary}",
+        }
+        used += estimate_tokens(summary_message["content"])
+        history.append(summary_message)
+    recent = []
+    for turn in reversed(turns):
+        cost = estimate_tokens(turn["content"])
+        if used + cost > token_budget:
+            break
+        recent.append({"role": turn["role"], "content": turn["content"]})
+        used += cost
+    history.extend(reversed(recent))
+    return history
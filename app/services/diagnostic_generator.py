@@ -1,14 +1,38 @@
 import os
+import copy
 import json
 import logging
-from openai import AsyncOpenAI
+from app.services.openai_client import get_client
+from app.services.content_cache import ContentCache, make_cache_key
+from app.services.single_flight import SingleFlight
+from app.services.question_bank import get_question_bank
+from app.services.translation import (
+    CANONICAL_LANGUAGE,
+    translate_content,
+    translate_curriculum,
+)
 
 MODEL = "gpt-4o-mini"
-
-
-def _get_client() -> AsyncOpenAI:
-    """Lazily initialize the OpenAI client."""
-    return AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+DIAGNOSTIC_PROMPT_VERSION = 2
+DIAGNOSTIC_BANK_SIZE = int(os.getenv("SKILLFORGE_DIAGNOSTIC_BANK_SIZE", "24"))
+diagnostic_flight = SingleFlight("diagnostic_questions")
+item_bank_cache = ContentCache("diagnostic_item_bank")
+FALLBACK_QUESTIONS = [
+    {
+        "id": "q1",
+        "question": "What is the primary function of this topic?",
+        "subtopic": "Basics",
+        "difficulty": "easy",
+        "options": [
+            {"id": "a", "text": "Function A"},
+            {"id": "b", "text": "Function B"},
+            {"id": "c", "text": "Function C"},
+            {"id": "d", "text": "Function D"},
+        ],
+        "correct_id": "a",
+        "explanation": "This is the fundamental concept.",
+    }
+]
 
 
 def _extract_json_from_text(text: str) -> str:
@@ -36,91 +60,130 @@ async def generate_diagnostic_questions(
     language: str = "en",
     current_level: str = "Beginner",
     target_level: str = "Beginner",
+    count: int = DIAGNOSTIC_BANK_SIZE,
 ) -> list[dict]:
     """
-    Generates 8 diagnostic questions covering different subtopics for the given main topic.
+    Generates a bank of diagnostic questions covering different subtopics and
+    difficulties for the given main topic. Adaptive tests draw a few items
+    from it per learner, so a bank is generated once and cached for everyone
+    taking the same assessment. Questions already in the shared question bank
+    are served without generating, and new ones are added to it, which gives
+    every question a stable id. The bank is kept in the canonical language
+    and translated for other languages, so question ids, and the answer
+    statistics behind them, are shared by learners in every language.
+    Each question keeps its canonical subtopic in `source_subtopic`.
+    Concurrent identical requests share a single generation.
     """
-    client = _get_client()
-    lang_name = _get_lang_name(language)
-    prompt = f"\n    Create a diagnostic assessment for the topic '{topic}'.\n    Generate all content in {lang_name}. The questions, options, and explanations must be in {lang_name}.\n    Generate exactly 8 diagnostic questions to assess if this {current_level} learner is ready for {target_level} content in {topic}.\n    Generate questions appropriate for someone transitioning from {current_level} to {target_level}.\n    \n    Return a JSON object with a key 'questions' containing an array of question objects.\n    Each question object must have:\n    - id: string (q1, q2, ...)\n    - question: string (The question text)\n    - subtopic: string (The specific concept being tested, e.g., 'Memory Management', 'Syntax', 'Networking')\n    - difficulty: string ('easy', 'medium', 'hard')\n    - options: array of objects [{{'id': 'a', 'text': 'Option A'}}, {{'id': 'b', 'text': 'Option B'}}, ...]\n    - correct_id: string (The id of the correct option)\n    - explanation: string (Brief explanation of why the answer is correct)\n    "
-    try:
-        response = await client.chat.completions.create(
-            model=MODEL,
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are an expert evaluator. You always output valid JSON objects.",
-                },
-                {"role": "user", "content": prompt},
-            ],
-            response_format={"type": "json_object"},
-            temperature=0.7,
+    questions = await _canonical_diagnostic_questions(
+        topic, current_level, target_level, count
+    )
+    translated = await translate_content(questions, language)
+    return [
+        {**question, "source_subtopic": source.get("subtopic", "")}
+        for question, source in zip(translated, questions)
+    ]
+
+
+async def _canonical_diagnostic_questions(
+    topic: str, current_level: str, target_level: str, count: int
+) -> list[dict]:
+    language = CANONICAL_LANGUAGE
+    cache_key = make_cache_key(
+        topic,
+        language,
+        current_level,
+        target_level,
+        count,
+        MODEL,
+        DIAGNOSTIC_PROMPT_VERSION,
+    )
+    cached = await item_bank_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    bank = get_question_bank()
+    level = f"{current_level}->{target_level}"
+    questions = await bank.draw("diagnostic", topic, level, language, count)
+    if len(questions) < count:
+        try:
+            generated = await diagnostic_flight.do(
+                cache_key,
+                lambda: _generate_diagnostic_questions(
+                    topic, language, current_level, target_level, count
+                ),
+            )
+        except Exception as e:
+            logging.exception(f"Error generating diagnostic questions: {e}")
+            return copy.deepcopy(FALLBACK_QUESTIONS)
+        questions = await bank.ingest(
+            generated, "diagnostic", topic, level, language
         )
-        raw_content = response.choices[0].message.content
-        cleaned_json = _extract_json_from_text(raw_content)
-        data = json.loads(cleaned_json)
-        return data.get("questions", [])
-    except Exception as e:
-        logging.exception(f"Error generating diagnostic questions: {e}")
-        return [
+    await item_bank_cache.set(cache_key, questions)
+    return questions
+
+
+def _valid_question(question: dict) -> bool:
+    option_ids = {o.get("id") for o in question.get("options", [])}
+    return (
+        bool(question.get("question"))
+        and len(option_ids) >= 2
+        and question.get("correct_id") in option_ids
+    )
+
+
+async def _generate_diagnostic_questions(
+    topic: str, language: str, current_level: str, target_level: str, count: int
+) -> list[dict]:
+    client = get_client()
+    lang_name = _get_lang_name(language)
+    prompt = f"\n    Create a diagnostic assessment for the topic '{topic}'.\n    Generate all content in {lang_name}. The questions, options, and explanations must be in {lang_name}.\n    Generate exactly {count} diagnostic questions to assess if this {current_level} learner is ready for {target_level} content in {topic}.\n    Generate questions appropriate for someone transitioning from {current_level} to {target_level}.\n    Spread the questions evenly across 'easy', 'medium' and 'hard' difficulty and across several subtopics.\n    \n    Return a JSON object with a key 'questions' containing an array of question objects.\n    Each question object must have:\n    - id: string (q1, q2, ...)\n    - question: string (The question text)\n    - subtopic: string (The specific concept being tested, e.g., 'Memory Management', 'Syntax', 'Networking')\n    - difficulty: string ('easy', 'medium', 'hard')\n    - options: array of objects [{{'id': 'a', 'text': 'Option A'}}, {{'id': 'b', 'text': 'Option B'}}, ...]\n    - correct_id: string (The id of the correct option)\n    - explanation: string (Brief explanation of why the answer is correct)\n    "
+    response = await client.chat.completions.create(
+        model=MODEL,
+        messages=[
             {
-                "id": "q1",
-                "question": "What is the primary function of this topic?",
-                "subtopic": "Basics",
-                "difficulty": "easy",
-                "options": [
-                    {"id": "a", "text": "Function A"},
-                    {"id": "b", "text": "Function B"},
-                    {"id": "c", "text": "Function C"},
-                    {"id": "d", "text": "Function D"},
-                ],
-                "correct_id": "a",
-                "explanation": "This is the fundamental concept.",
-            }
-        ]
-
-
-async def analyze_diagnostic_results(
-    questions: list[dict], answers: list[dict], language: str = "en"
-) -> dict:
+                "role": "system",
+                "content": "You are an expert evaluator. You always output valid JSON objects.",
+            },
+            {"role": "user", "content": prompt},
+        ],
+        response_format={"type": "json_object"},
+        temperature=0.7,
+    )
+    raw_content = response.choices[0].message.content
+    data = json.loads(_extract_json_from_text(raw_content))
+    questions = [q for q in data.get("questions", []) if _valid_question(q)]
+    if not questions:
+        raise ValueError("Diagnostic generation returned no usable questions")
+    return questions
+
+
+async def phrase_recommended_focus(
+    topic: str, results: dict, language: str = "en"
+) -> str:
     """
-    Analyzes the user's answers to identify strengths, weaknesses, and recommended focus areas.
+    Rewrites the locally computed recommended focus as one natural sentence.
+    Returns the original sentence if the call fails.
     """
-    client = _get_client()
+    client = get_client()
     lang_name = _get_lang_name(language)
-    analysis_input = {
-        "questions": [
-            {"id": q["id"], "subtopic": q["subtopic"], "difficulty": q["difficulty"]}
-            for q in questions
-        ],
-        "user_answers": answers,
-    }
-    prompt = f"\n    Analyze these diagnostic test results provided in JSON format: {json.dumps(analysis_input)}.\n    Generate all content in {lang_name}. The strengths, weaknesses, and recommended focus must be in {lang_name}.\n    \n    Identify the user's proficiency level based on the difficulty of questions answered correctly vs incorrectly.\n    Group the performance by subtopics.\n    \n    Return a JSON object with:\n    - overall_score: integer (0-100)\n    - proficiency_level: string (Beginner, Intermediate, Advanced)\n    - strengths: list of strings (Subtopics or concepts the user knows well)\n    - weaknesses: list of strings (Subtopics or concepts the user needs to focus on)\n    - recommended_focus: string (A sentence describing what the personalized course should focus on)\n    "
+    prompt = f"\n    A learner just finished a diagnostic test on '{topic}'.\n    Score: {results['overall_score']}/100 ({results['proficiency_level']})\n    Strengths: {', '.join(results['strengths']) or 'none'}\n    Weaknesses: {', '.join(results['weaknesses']) or 'none'}\n\n    Write one encouraging sentence in {lang_name} describing what their personalized course should focus on.\n    Reply with the sentence only.\n    "
     try:
         response = await client.chat.completions.create(
             model=MODEL,
             messages=[
                 {
                     "role": "system",
-                    "content": "You are an expert curriculum advisor. You always output valid JSON objects.",
+                    "content": "You are an expert curriculum advisor.",
                 },
                 {"role": "user", "content": prompt},
             ],
-            response_format={"type": "json_object"},
             temperature=0.7,
+            max_tokens=80,
         )
-        raw_content = response.choices[0].message.content
-        cleaned_json = _extract_json_from_text(raw_content)
-        return json.loads(cleaned_json)
+        focus = response.choices[0].message.content.strip()
+        return focus or results["recommended_focus"]
     except Exception as e:
-        logging.exception(f"Error analyzing diagnostic results: {e}")
-        return {
-            "overall_score": 0,
-            "proficiency_level": "Beginner",
-            "strengths": [],
-            "weaknesses": ["General Knowledge"],
-            "recommended_focus": "Start from the basics.",
-        }
+        logging.exception(f"Error phrasing recommended focus: {e}")
+        return results["recommended_focus"]
 
 
 async def generate_adaptive_curriculum(
@@ -131,9 +194,13 @@ async def generate_adaptive_curriculum(
 ) -> list[dict]:
     """
     Generates a personalized curriculum based on diagnostic analysis.
+    The curriculum is generated in the canonical language and translated;
+    each module's canonical title is kept in `source_title`.
+    `analysis_results` goes into the prompt as is, so it should be scored in
+    the canonical language (see diagnostic_scoring.canonical_subtopics).
     """
-    client = _get_client()
-    lang_name = _get_lang_name(language)
+    client = get_client()
+    lang_name = _get_lang_name(CANONICAL_LANGUAGE)
     strengths = ", ".join(analysis_results.get("strengths", []))
     weaknesses = ", ".join(analysis_results.get("weaknesses", []))
     focus = analysis_results.get("recommended_focus", "General mastery")
@@ -155,7 +222,8 @@ async def generate_adaptive_curriculum(
         raw_content = response.choices[0].message.content
         cleaned_json = _extract_json_from_text(raw_content)
         data = json.loads(cleaned_json)
-        return data.get("modules", [])
+        modules = data.get("modules", [])
     except Exception as e:
         logging.exception(f"Error generating adaptive curriculum: {e}")
-        return []
\ No newline at end of file
+        return []
+    return await translate_curriculum(modules, language)
\ No newline at end of file
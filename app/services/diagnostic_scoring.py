@@ -0,0 +1,115 @@
+from app.services.adaptive_testing import ability_to_score
+
+DIFFICULTY_WEIGHTS = {"easy": 1.0, "medium": 2.0, "hard": 3.0}
+LEVEL_THRESHOLDS = (("Advanced", 80), ("Intermediate", 50))
+STRENGTH_ACCURACY = 0.75
+WEAKNESS_ACCURACY = 0.5
+FOCUS_TEMPLATES = {
+    "en": {
+        "weak": "Focus on {weak}, building on your strength in {strong}.",
+        "weak_only": "Focus on {weak} before moving on to new material.",
+        "none": "Build on your strength in {strong} with more advanced material.",
+        "empty": "Start learning the basics.",
+    },
+    "es": {
+        "weak": "Concéntrate en {weak}, aprovechando tu dominio de {strong}.",
+        "weak_only": "Concéntrate en {weak} antes de avanzar a material nuevo.",
+        "none": "Aprovecha tu dominio de {strong} con material más avanzado.",
+        "empty": "Empieza por los fundamentos.",
+    },
+}
+
+
+def _weight(question: dict) -> float:
+    return DIFFICULTY_WEIGHTS.get(str(question.get("difficulty", "")).lower(), 2.0)
+
+
+def subtopic_accuracy(questions: list[dict], answers: list[dict]) -> dict[str, float]:
+    """
+    Difficulty-weighted accuracy per subtopic, over the questions that were
+    answered, in the order subtopics first appear.
+    """
+    by_id = {q["id"]: q for q in questions}
+    earned: dict[str, float] = {}
+    possible: dict[str, float] = {}
+    for answer in answers:
+        question = by_id.get(answer["question_id"])
+        if question is None:
+            continue
+        subtopic = question.get("subtopic") or "General"
+        weight = _weight(question)
+        possible[subtopic] = possible.get(subtopic, 0.0) + weight
+        earned[subtopic] = earned.get(subtopic, 0.0) + weight * answer["is_correct"]
+    return {s: earned[s] / possible[s] for s in possible}
+
+
+def canonical_subtopics(questions: list[dict]) -> list[dict]:
+    """Questions with their canonical `source_subtopic` as the subtopic, where known."""
+    return [
+        {**q, "subtopic": q.get("source_subtopic") or q.get("subtopic", "")}
+        for q in questions
+    ]
+
+
+def proficiency_for_score(score: int) -> str:
+    for level, threshold in LEVEL_THRESHOLDS:
+        if score >= threshold:
+            return level
+    return "Beginner"
+
+
+def default_focus(strengths: list[str], weaknesses: list[str], language: str) -> str:
+    templates = FOCUS_TEMPLATES.get(language, FOCUS_TEMPLATES["en"])
+    weak = ", ".join(weaknesses)
+    strong = ", ".join(strengths)
+    if weak and strong:
+        return templates["weak"].format(weak=weak, strong=strong)
+    if weak:
+        return templates["weak_only"].format(weak=weak)
+    if strong:
+        return templates["none"].format(strong=strong)
+    return templates["empty"]
+
+
+def score_diagnostic(
+    questions: list[dict],
+    answers: list[dict],
+    language: str = "en",
+    ability: float | None = None,
+) -> dict:
+    """
+    Scores a diagnostic from the answers alone.
+    The overall score is accuracy weighted by question difficulty (hard
+    questions count three times as much as easy ones), the proficiency level
+    follows fixed score thresholds, and subtopics are strengths or weaknesses
+    by their own weighted accuracy. `recommended_focus` is a template
+    sentence that can be rephrased later.
+    When an adaptive test supplies the learner's `ability` estimate, the
+    overall score comes from it instead, since adaptive item selection keeps
+    raw accuracy close to 50% for everyone.
+    """
+    by_id = {q["id"]: q for q in questions}
+    earned = possible = 0.0
+    for answer in answers:
+        question = by_id.get(answer["question_id"])
+        if question is None:
+            continue
+        weight = _weight(question)
+        possible += weight
+        earned += weight * answer["is_correct"]
+    overall_score = round(100 * earned / possible) if possible else 0
+    if ability is not None:
+        overall_score = ability_to_score(ability)
+    accuracy = subtopic_accuracy(questions, answers)
+    strengths = [s for s, a in accuracy.items() if a >= STRENGTH_ACCURACY]
+    weaknesses = sorted(
+        (s for s, a in accuracy.items() if a < WEAKNESS_ACCURACY),
+        key=lambda s: accuracy[s],
+    )
+    return {
+        "overall_score": overall_score,
+        "proficiency_level": proficiency_for_score(overall_score),
+        "strengths": strengths,
+        "weaknesses": weaknesses,
+        "recommended_focus": default_focus(strengths, weaknesses, language),
+    }
@@ -0,0 +1,58 @@
+import os
+import math
+from app.services.adaptive_testing import probability_correct
+
+QUIZ_TARGET_SUCCESS = float(os.getenv("SKILLFORGE_QUIZ_TARGET_SUCCESS", "0.7"))
+RATING_K_START = 0.8
+RATING_K_MIN = 0.15
+RATING_K_DECAY_ANSWERS = 20
+
+
+def expected_success(rating: float, location: float) -> float:
+    """Chance that a learner with `rating` answers an item at `location` correctly."""
+    return float(probability_correct(rating, location))
+
+
+def rating_k(answers: int) -> float:
+    """
+    Step size of a rating update. It starts large so a new learner's rating
+    settles quickly, and shrinks as answers accumulate.
+    """
+    decay = 1 + answers / RATING_K_DECAY_ANSWERS
+    return max(RATING_K_MIN, RATING_K_START / decay)
+
+
+def update_rating(
+    rating: float, answers: int, location: float, correct: bool
+) -> tuple[float, int]:
+    """
+    Elo-style update of a learner's rating after one answer, on the same
+    logit scale as item locations. Returns the new (rating, answer count).
+    Item difficulties are updated on the other side by the question bank,
+    whose answer statistics recalibrate each item's location.
+    """
+    surprise = float(correct) - expected_success(rating, location)
+    return (rating + rating_k(answers) * surprise, answers + 1)
+
+
+def select_question(
+    questions: list[dict],
+    answered_ids: set[str],
+    rating: float,
+    locations: dict[str, float],
+    target: float = QUIZ_TARGET_SUCCESS,
+) -> int | None:
+    """
+    Index of the unanswered question whose expected success for this learner
+    is closest to `target`, or None when every question has been answered.
+    """
+    ideal_location = rating - math.log(target / (1 - target))
+    best = None
+    best_gap = math.inf
+    for i, question in enumerate(questions):
+        if question["id"] in answered_ids:
+            continue
+        gap = abs(locations.get(question["id"], 0.0) - ideal_location)
+        if gap < best_gap:
+            best, best_gap = i, gap
+    return best
@@ -0,0 +1,302 @@
+import os
+import re
+import json
+import secrets
+import unicodedata
+from app.services.code_runner import SANDBOX_TIMEOUT_SECONDS, get_code_runner
+
+TEXT_TOLERANCE = float(os.getenv("SKILLFORGE_GRADER_TEXT_TOLERANCE", "0.2"))
+STDIN_CASES = ("", "5\n", "hello world\n3 4\n")
+CALLS_PER_FUNCTION = 8
+CHECK_OUTPUT_CHARS = 8000
+CHECK_TIMEOUT_SECONDS = SANDBOX_TIMEOUT_SECONDS * 2
+_PUNCTUATION_RE = re.compile(r"[^\w\s]", re.UNICODE)
+_FENCE_RE = re.compile(r"^```[\w+-]*\s*$", re.MULTILINE)
+_HARNESS = """
+import io, sys, copy, json, random, inspect, itertools, contextlib
+
+
+def _skillforge_checks():
+    config = json.loads(sys.stdin.read())
+    code = compile(config.pop("code"), "solution.py", "exec")
+    limit = config["output_chars"]
+
+    def execute(stdin, name):
+        namespace = {"__name__": name, "__builtins__": __builtins__}
+        out = io.StringIO()
+        status = 0
+        sys.stdin = io.StringIO(stdin)
+        try:
+            with contextlib.redirect_stdout(out), contextlib.redirect_stderr(io.StringIO()):
+                exec(code, namespace)
+        except SystemExit as e:
+            status = e.code if isinstance(e.code, int) else int(e.code is not None)
+        except BaseException:
+            status = 1
+        return (namespace, status, out.getvalue()[:limit])
+
+    pool = [0, 1, 2, 5, -3, 10, 3.5, True, "hello", "Python", ""]
+    pool += [[1, 2, 3], [5, 3, 8, 1], []]
+
+    def canon(value):
+        if isinstance(value, (set, frozenset)):
+            return sorted((canon(v) for v in value), key=repr)
+        if isinstance(value, dict):
+            return [[canon(k), canon(v)] for k, v in value.items()]
+        if isinstance(value, (list, tuple)):
+            return [canon(v) for v in value]
+        if isinstance(value, float):
+            return round(value, 6)
+        if value is None or isinstance(value, (bool, int, str)):
+            return value
+        return repr(value)
+
+    def probe(calls):
+        namespace, status, _ = execute("", "solution")
+        if status != 0:
+            return None
+        functions = {
+            name: fn
+            for name, fn in namespace.items()
+            if inspect.isfunction(fn)
+            and fn.__code__.co_filename == "solution.py"
+            and not name.startswith("_")
+        }
+        if calls is None:
+            calls = []
+            rng = random.Random(0)
+            for name, fn in sorted(functions.items()):
+                params = inspect.signature(fn).parameters.values()
+                required = [
+                    p for p in params
+                    if p.default is p.empty
+                    and p.kind in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD)
+                ]
+                if len(required) > 3:
+                    continue
+                candidates = list(itertools.product(pool, repeat=len(required)))
+                rng.shuffle(candidates)
+                calls.extend([name, list(args)] for args in candidates[:40])
+        results = []
+        for name, args in calls:
+            fn = functions.get(name)
+            if fn is None:
+                results.append({"status": "missing"})
+                continue
+            try:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    value = fn(*copy.deepcopy(args))
+                results.append({"status": "ok", "value": canon(value)})
+            except Exception as e:
+                results.append({"status": "error", "error": type(e).__name__})
+        return {"calls": calls, "results": results}
+
+    runs = []
+    for stdin in config["stdin_cases"]:
+        _, status, stdout = execute(stdin, "__main__")
+        runs.append({"exit_code": status, "stdout": stdout})
+    report = {"runs": runs, "probe": probe(config["calls"])}
+    sys.__stdout__.write(config["marker"] + json.dumps(report))
+    sys.__stdout__.flush()
+
+
+_skillforge_checks()
+"""
+
+
+def normalize_text(text: str) -> str:
+    """Folds accents and case, drops punctuation and collapses whitespace."""
+    decomposed = unicodedata.normalize("NFKD", text)
+    folded = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(_PUNCTUATION_RE.sub(" ", folded.casefold()).split())
+
+
+def _char_distance(a: str, b: str) -> int:
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(
+                min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb))
+            )
+        previous = current
+    return previous[-1]
+
+
+def _substitution_cost(a: str, b: str) -> float:
+    if a == b:
+        return 0.0
+    if min(len(a), len(b)) >= 4 and _char_distance(a, b) <= 1:
+        return 0.5
+    return 1.0
+
+
+def token_edit_distance(a: list[str], b: list[str]) -> float:
+    """
+    Levenshtein distance over tokens. A single-character typo in a word of
+    four or more letters costs half a substitution.
+    """
+    previous = [float(j) for j in range(len(b) + 1)]
+    for i, ta in enumerate(a, 1):
+        current = [float(i)]
+        for j, tb in enumerate(b, 1):
+            current.append(
+                min(
+                    previous[j] + 1,
+                    current[j - 1] + 1,
+                    previous[j - 1] + _substitution_cost(ta, tb),
+                )
+            )
+        previous = current
+    return previous[-1]
+
+
+def grade_text(answer: str, expected: str, tolerance: float = TEXT_TOLERANCE) -> dict:
+    """
+    Grades a free-text answer against the expected one. The answer passes
+    when its token edit distance is within `tolerance` times the length of
+    the expected answer. Returns `correct`, a 0-1 `score` and `details`.
+    """
+    answer_tokens = normalize_text(answer).split()
+    expected_tokens = normalize_text(expected).split()
+    if not expected_tokens:
+        return {"correct": None, "score": 0.0, "details": "No reference answer"}
+    distance = token_edit_distance(answer_tokens, expected_tokens)
+    length = max(len(answer_tokens), len(expected_tokens))
+    score = max(0.0, 1 - distance / length)
+    correct = distance <= tolerance * len(expected_tokens)
+    details = "Matches the expected answer" if correct else f"Expected: {expected}"
+    return {"correct": correct, "score": round(score, 3), "details": details}
+
+
+def strip_code_fences(code: str) -> str:
+    return _FENCE_RE.sub("", code).strip()
+
+
+def _normalize_output(stdout: str) -> str:
+    return "\n".join(line.rstrip() for line in stdout.strip().splitlines())
+
+
+def _format_call(name: str, args: list) -> str:
+    return f"{name}({', '.join(repr(a) for a in args)})"
+
+
+async def _run_checks(code: str, calls: list | None) -> dict | None:
+    """
+    Runs `code` once in the sandbox on every stdin case and probes its
+    functions with `calls` (or generated calls when None). Returns the
+    `runs` and `probe` report, or None if the run did not finish. The report
+    is marked with a per-run random nonce so output printed by the code
+    itself cannot pass for it.
+    """
+    marker = "\x1e" + secrets.token_hex(16)
+    config = {
+        "code": code,
+        "calls": calls,
+        "stdin_cases": list(STDIN_CASES),
+        "output_chars": CHECK_OUTPUT_CHARS,
+        "marker": marker,
+    }
+    result = await get_code_runner().run(
+        _HARNESS, json.dumps(config), CHECK_TIMEOUT_SECONDS
+    )
+    _, found, report = result["stdout"].rpartition(marker)
+    if result["exit_code"] != 0 or not found:
+        return None
+    try:
+        return json.loads(report)
+    except json.JSONDecodeError:
+        return None
+
+
+async def grade_code(code: str, expected_code: str) -> dict:
+    """
+    Grades learner code by running it and the expected solution in the
+    sandbox on the same inputs, in one sandbox run per program. Each
+    top-level function the solution defines is called with generated
+    arguments and the return values are compared, and both programs are run
+    on a few stdin inputs and their output compared wherever the solution
+    prints something. Returns `correct`
+    (None when the solution gives nothing to compare), `score`, `passed`,
+    `total` and `details` describing the first mismatch.
+    """
+    expected_code = strip_code_fences(expected_code)
+    reference = await _run_checks(expected_code, None)
+    if reference is None:
+        return {
+            "correct": None,
+            "score": 0.0,
+            "passed": 0,
+            "total": 0,
+            "details": "Nothing to compare against",
+        }
+    calls, expected_values = [], []
+    per_function: dict[str, int] = {}
+    if reference["probe"]:
+        for call, outcome in zip(
+            reference["probe"]["calls"], reference["probe"]["results"]
+        ):
+            name = call[0]
+            if outcome["status"] != "ok":
+                continue
+            if per_function.get(name, 0) >= CALLS_PER_FUNCTION:
+                continue
+            per_function[name] = per_function.get(name, 0) + 1
+            calls.append(call)
+            expected_values.append(outcome["value"])
+    learner = await _run_checks(code, calls)
+    expected_runs = reference["runs"]
+    learner_runs = (
+        learner["runs"]
+        if learner
+        else [{"exit_code": 1, "stdout": ""} for _ in STDIN_CASES]
+    )
+    passed = total = 0
+    failures = []
+    if calls:
+        probe = learner["probe"] if learner else None
+        learner_results = probe["results"] if probe else [None] * len(calls)
+        for (name, args), value, outcome in zip(calls, expected_values, learner_results):
+            total += 1
+            if outcome and outcome["status"] == "ok" and outcome["value"] == value:
+                passed += 1
+            elif outcome is None:
+                failures.append("Your code did not run to completion")
+            elif outcome["status"] == "missing":
+                failures.append(f"Function `{name}` is missing")
+            elif outcome["status"] == "error":
+                failures.append(f"`{_format_call(name, args)}` raised {outcome['error']}")
+            else:
+                failures.append(
+                    f"`{_format_call(name, args)}` returned {outcome['value']!r}, expected {value!r}"
+                )
+    for stdin, expected_run, learner_run in zip(
+        STDIN_CASES, expected_runs, learner_runs
+    ):
+        expected_output = _normalize_output(expected_run["stdout"])
+        if expected_run["exit_code"] != 0 or not expected_output:
+            continue
+        total += 1
+        if (
+            learner_run["exit_code"] == 0
+            and _normalize_output(learner_run["stdout"]) == expected_output
+        ):
+            passed += 1
+        else:
+            shown_input = stdin.strip().replace("\n", " / ") or "no input"
+            failures.append(f"Output differs from the expected output ({shown_input})")
+    if not total:
+        return {
+            "correct": None,
+            "score": 0.0,
+            "passed": 0,
+            "total": 0,
+            "details": "Nothing to compare against",
+        }
+    return {
+        "correct": passed == total,
+        "score": round(passed / total, 3),
+        "passed": passed,
+        "total": total,
+        "details": failures[0] if failures else "All checks passed",
+    }
@@ -0,0 +1,421 @@
+import os
+import hmac
+import time
+import inspect
+import functools
+from contextlib import aclosing, contextmanager
+from typing import Any, Callable, Iterable
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+METRICS_LOCAL_ONLY = os.getenv("SKILLFORGE_METRICS_LOCAL_ONLY", "1") == "1"
+METRICS_TOKEN = os.getenv("SKILLFORGE_METRICS_TOKEN", "")
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+_LOCAL_HOSTS = {"127.0.0.1", "::1", "localhost"}
+_metrics: list["_Metric"] = []
+_collectors: list[Callable[[], Iterable[tuple]]] = []
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(f'{k}="{_escape(str(v))}"' for k, v in labels.items())
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def _render_family(
+    name: str, kind: str, help_text: str, samples: Iterable[tuple[str, dict, float]]
+) -> list[str]:
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+    for sample_name, labels, value in samples:
+        lines.append(f"{sample_name}{_format_labels(labels)} {_format_value(value)}")
+    return lines
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self._values: dict[tuple[str, ...], Any] = {}
+        _metrics.append(self)
+
+    def _key(self, labels: dict[str, Any]) -> tuple[str, ...]:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def _labels(self, key: tuple[str, ...]) -> dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+    def samples(self) -> list[tuple[str, dict, float]]:
+        return [(self.name, self._labels(k), v) for k, v in self._values.items()]
+
+    def render(self) -> list[str]:
+        return _render_family(self.name, self.kind, self.help, self.samples())
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        state = self._values.get(key)
+        if state is None:
+            state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                state[0][i] += 1
+        state[1] += value
+        state[2] += 1
+
+    def samples(self) -> list[tuple[str, dict, float]]:
+        samples = []
+        for key, (counts, total, count) in self._values.items():
+            labels = self._labels(key)
+            for bound, bucket_count in zip(self.buckets, counts):
+                le = "+Inf" if bound == float("inf") else _format_value(bound)
+                samples.append(
+                    (f"{self.name}_bucket", {**labels, "le": le}, bucket_count)
+                )
+            samples.append((f"{self.name}_sum", labels, total))
+            samples.append((f"{self.name}_count", labels, count))
+        return samples
+
+
+EVENT_DURATION = Histogram(
+    "skillforge_event_duration_seconds",
+    "Time from the start to the end of an event handler.",
+    ("handler",),
+)
+EVENTS_IN_FLIGHT = Gauge(
+    "skillforge_events_in_flight",
+    "Event handlers currently running.",
+    ("handler",),
+)
+EVENT_ERRORS = Counter(
+    "skillforge_event_errors_total",
+    "Event handlers that raised an exception.",
+    ("handler",),
+)
+LLM_DURATION = Histogram(
+    "skillforge_llm_request_duration_seconds",
+    "Time until an LLM response, or the first byte of a streamed one, arrives.",
+    ("model", "stream"),
+)
+LLM_IN_FLIGHT = Gauge(
+    "skillforge_llm_requests_in_flight",
+    "LLM requests awaiting a response.",
+    ("model",),
+)
+LLM_ERRORS = Counter(
+    "skillforge_llm_errors_total",
+    "LLM requests that raised an exception.",
+    ("model",),
+)
+LLM_TOKENS = Counter(
+    "skillforge_llm_tokens_total",
+    "Tokens billed by the LLM provider.",
+    ("model", "kind"),
+)
+
+
+def register_collector(collector: Callable[[], Iterable[tuple]]):
+    """
+    Adds a callback run at scrape time. It returns (name, kind, help, samples)
+    families, where samples are (labels, value) pairs, for values that other
+    modules already count themselves.
+    """
+    _collectors.append(collector)
+
+
+@contextmanager
+def _timed_event(handler: str):
+    EVENTS_IN_FLIGHT.inc(handler=handler)
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        EVENT_ERRORS.inc(handler=handler)
+        raise
+    finally:
+        EVENTS_IN_FLIGHT.dec(handler=handler)
+        EVENT_DURATION.observe(time.perf_counter() - start, handler=handler)
+
+
+def instrumented(fn):
+    """
+    Records latency, in-flight count and errors of an event handler under
+    its qualified name. Goes below @rx.event and keeps the handler's kind
+    (plain, coroutine or generator) so Reflex processes it as before.
+    """
+    handler = fn.__qualname__
+    if inspect.isasyncgenfunction(fn):
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            with _timed_event(handler):
+                async with aclosing(fn(*args, **kwargs)) as updates:
+                    async for update in updates:
+                        yield update
+
+    elif inspect.iscoroutinefunction(fn):
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            with _timed_event(handler):
+                return await fn(*args, **kwargs)
+
+    elif inspect.isgeneratorfunction(fn):
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with _timed_event(handler):
+                yield from fn(*args, **kwargs)
+
+    else:
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with _timed_event(handler):
+                return fn(*args, **kwargs)
+
+    return wrapper
+
+
+def record_llm_usage(model: str, usage):
+    """Counts the prompt and completion tokens of an LLM response."""
+    if usage is None:
+        return
+    LLM_TOKENS.inc(
+        getattr(usage, "prompt_tokens", 0) or 0, model=model, kind="prompt"
+    )
+    LLM_TOKENS.inc(
+        getattr(usage, "completion_tokens", 0) or 0, model=model, kind="completion"
+    )
+
+
+def instrument_openai_client(client):
+    """
+    Wraps the client's chat completion call so every LLM request made by the
+    services is timed and its token usage counted. Streamed responses report
+    usage in their last chunk, which the caller passes to record_llm_usage.
+    """
+    completions = client.chat.completions
+    create = completions.create
+
+    @functools.wraps(create)
+    async def timed_create(*args, **kwargs):
+        model = kwargs.get("model", "")
+        stream = bool(kwargs.get("stream"))
+        LLM_IN_FLIGHT.inc(model=model)
+        start = time.perf_counter()
+        try:
+            response = await create(*args, **kwargs)
+        except Exception:
+            LLM_ERRORS.inc(model=model)
+            raise
+        finally:
+            LLM_IN_FLIGHT.dec(model=model)
+            LLM_DURATION.observe(
+                time.perf_counter() - start, model=model, stream=str(stream).lower()
+            )
+        if not stream:
+            record_llm_usage(model, getattr(response, "usage", None))
+        return response
+
+    completions.create = timed_create
+    return client
+
+
+def _service_families() -> Iterable[tuple]:
+    from app.services.content_cache import ContentCache
+    from app.services.single_flight import SingleFlight
+    from app.services import code_runner
+
+    lookups, ratios, evictions, entries = [], [], [], []
+    for cache in ContentCache.instances:
+        stats = cache.stats()
+        labels = {"cache": cache.namespace}
+        lookups.append(({**labels, "result": "memory_hit"}, stats["memory_hits"]))
+        lookups.append(({**labels, "result": "disk_hit"}, stats["disk_hits"]))
+        lookups.append(({**labels, "result": "miss"}, stats["misses"]))
+        ratios.append((labels, stats["hit_ratio"]))
+        evictions.append((labels, stats["evictions"]))
+        entries.append((labels, stats["memory_entries"]))
+    yield (
+        "skillforge_cache_lookups_total",
+        "counter",
+        "Content cache lookups by result.",
+        lookups,
+    )
+    yield (
+        "skillforge_cache_hit_ratio",
+        "gauge",
+        "Share of content cache lookups that hit either tier.",
+        ratios,
+    )
+    yield (
+        "skillforge_cache_evictions_total",
+        "counter",
+        "Entries evicted from a content cache.",
+        evictions,
+    )
+    yield (
+        "skillforge_cache_memory_entries",
+        "gauge",
+        "Entries held in a content cache's memory tier.",
+        entries,
+    )
+    calls, coalesced, in_flight = [], [], []
+    for flight in SingleFlight.instances:
+        stats = flight.stats()
+        labels = {"flight": flight.name}
+        calls.append((labels, stats["calls"]))
+        coalesced.append((labels, stats["coalesced"]))
+        in_flight.append((labels, stats["in_flight"]))
+    yield (
+        "skillforge_single_flight_calls_total",
+        "counter",
+        "Calls made through a single-flight group.",
+        calls,
+    )
+    yield (
+        "skillforge_single_flight_coalesced_total",
+        "counter",
+        "Calls that joined an identical call already in flight.",
+        coalesced,
+    )
+    yield (
+        "skillforge_single_flight_in_flight",
+        "gauge",
+        "Distinct calls currently in flight.",
+        in_flight,
+    )
+    pool = code_runner._pool
+    if pool is None:
+        return
+    stats = pool.stats()
+    yield (
+        "skillforge_sandbox_runs_total",
+        "counter",
+        "Learner programs run in the sandbox.",
+        [({}, stats["runs"])],
+    )
+    yield (
+        "skillforge_sandbox_timeouts_total",
+        "counter",
+        "Sandbox runs stopped by the time limit.",
+        [({}, stats["timeouts"])],
+    )
+    yield (
+        "skillforge_sandbox_idle_workers",
+        "gauge",
+        "Pre-started sandbox workers waiting for a job.",
+        [({}, stats["idle_workers"])],
+    )
+    yield (
+        "skillforge_sandbox_queue_wait_seconds",
+        "gauge",
+        "Recent time runs waited for a free sandbox worker, by quantile.",
+        [
+            ({"quantile": "0.5"}, stats["queue_wait_p50"]),
+            ({"quantile": "0.95"}, stats["queue_wait_p95"]),
+        ],
+    )
+    yield (
+        "skillforge_sandbox_execution_seconds",
+        "gauge",
+        "Recent sandbox run durations, by quantile.",
+        [
+            ({"quantile": "0.5"}, stats["execution_p50"]),
+            ({"quantile": "0.95"}, stats["execution_p95"]),
+        ],
+    )
+
+
+register_collector(_service_families)
+
+
+def render_metrics() -> str:
+    """All metrics in the Prometheus text exposition format."""
+    lines = []
+    for metric in _metrics:
+        lines.extend(metric.render())
+    for collector in _collectors:
+        for name, kind, help_text, samples in collector():
+            lines.extend(
+                _render_family(
+                    name, kind, help_text, ((name, l, v) for l, v in samples)
+                )
+            )
+    return "\n".join(lines) + "\n"
+
+
+def _metrics_allowed(request: Request) -> bool:
+    """
+    With METRICS_TOKEN set, scrapers must send it as a bearer token. Otherwise
+    only local clients are allowed, judged by the peer address, which a
+    reverse proxy on the same host makes look local for every request.
+    """
+    if METRICS_TOKEN:
+        expected = f"Bearer {METRICS_TOKEN}".encode("utf-8")
+        given = request.headers.get("authorization", "").encode("utf-8")
+        return hmac.compare_digest(given, expected)
+    host = request.client.host if request.client else ""
+    return not METRICS_LOCAL_ONLY or host in _LOCAL_HOSTS
+
+
+async def metrics_endpoint(request: Request) -> PlainTextResponse:
+    if not _metrics_allowed(request):
+        return PlainTextResponse("Forbidden", status_code=403)
+    return PlainTextResponse(
+        render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+metrics_api = Starlette(routes=[Route("/metrics", metrics_endpoint)])
@@ -0,0 +1,67 @@
+import os
+import logging
+import importlib.util
+from contextlib import asynccontextmanager
+import httpx
+from openai import AsyncOpenAI
+from app.services.metrics import instrument_openai_client
+
+OPENAI_MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", "100"))
+OPENAI_MAX_KEEPALIVE = int(os.getenv("OPENAI_MAX_KEEPALIVE", "20"))
+OPENAI_KEEPALIVE_EXPIRY = float(os.getenv("OPENAI_KEEPALIVE_EXPIRY", "30"))
+OPENAI_CONNECT_TIMEOUT = float(os.getenv("OPENAI_CONNECT_TIMEOUT", "5"))
+OPENAI_READ_TIMEOUT = float(os.getenv("OPENAI_READ_TIMEOUT", "120"))
+_client: AsyncOpenAI | None = None
+
+
+def _http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+def get_client() -> AsyncOpenAI:
+    """
+    Returns the process-wide OpenAI client.
+    All services share one keep-alive connection pool instead of paying for
+    DNS, TCP and TLS setup on every call, and every request is recorded in
+    the LLM metrics.
+    """
+    global _client
+    if _client is None:
+        http_client = httpx.AsyncClient(
+            http2=_http2_available(),
+            limits=httpx.Limits(
+                max_connections=OPENAI_MAX_CONNECTIONS,
+                max_keepalive_connections=OPENAI_MAX_KEEPALIVE,
+                keepalive_expiry=OPENAI_KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(OPENAI_READ_TIMEOUT, connect=OPENAI_CONNECT_TIMEOUT),
+        )
+        _client = instrument_openai_client(
+            AsyncOpenAI(
+                api_key=os.getenv("OPENAI_API_KEY"),
+                base_url=os.getenv("OPENAI_BASE_URL") or None,
+                http_client=http_client,
+            )
+        )
+    return _client
+
+
+async def close_client():
+    """Closes the shared client and its connection pool."""
+    global _client
+    if _client is None:
+        return
+    client, _client = _client, None
+    try:
+        await client.close()
+    except Exception as e:
+        logging.exception(f"Error closing OpenAI client: {e}")
+
+
+@asynccontextmanager
+async def openai_client_lifespan():
+    """App lifespan task that releases pooled connections on shutdown."""
+    try:
+        yield
+    finally:
+        await close_client()
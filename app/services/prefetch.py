@@ -0,0 +1,70 @@
+import os
+import asyncio
+import logging
+from app.services.ai_generator import generate_module_content
+from app.services.content_cache import make_cache_key
+
+PREFETCH_MAX_CONCURRENT = int(os.getenv("SKILLFORGE_PREFETCH_MAX_CONCURRENT", "8"))
+_tasks: dict[str, asyncio.Task] = {}
+_owners: dict[str, set[str]] = {}
+
+
+def _prefetch_key(topic: str, module_title: str, language: str) -> str:
+    return make_cache_key("prefetch", topic, module_title, language)
+
+
+def _forget(key: str, task: asyncio.Task):
+    if _tasks.get(key) is task:
+        del _tasks[key]
+        _owners.pop(key, None)
+    if not task.cancelled() and task.exception() is not None:
+        logging.error(f"Module prefetch failed: {task.exception()}")
+
+
+def prefetch_module_content(
+    session_id: str, topic: str, module_title: str, language: str = "en"
+) -> bool:
+    """
+    Starts generating a module in the background so the learner finds it
+    ready when they get there. Generation lands in the module content cache.
+    Returns False when the server-wide speculative job cap is reached.
+    """
+    key = _prefetch_key(topic, module_title, language)
+    if key in _tasks:
+        _owners[key].add(session_id)
+        return True
+    if len(_tasks) >= PREFETCH_MAX_CONCURRENT:
+        return False
+    task = asyncio.create_task(generate_module_content(topic, module_title, language))
+    _tasks[key] = task
+    _owners[key] = {session_id}
+    task.add_done_callback(lambda t: _forget(key, t))
+    return True
+
+
+async def wait_for_prefetch(
+    topic: str, module_title: str, language: str = "en"
+) -> dict | None:
+    """
+    Awaits an in-flight prefetch for this module instead of issuing a
+    duplicate call. Returns None if nothing is being prefetched.
+    """
+    task = _tasks.get(_prefetch_key(topic, module_title, language))
+    if task is None:
+        return None
+    try:
+        return await asyncio.shield(task)
+    except asyncio.CancelledError:
+        if task.cancelled():
+            return None
+        raise
+
+
+def cancel_session_prefetches(session_id: str):
+    """Cancels speculative jobs that no other session is waiting on."""
+    for key, owners in list(_owners.items()):
+        owners.discard(session_id)
+        if not owners:
+            task = _tasks.get(key)
+            if task is not None and not task.done():
+                task.cancel()
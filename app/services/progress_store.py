@@ -0,0 +1,271 @@
+import os
+import json
+import logging
+import time
+import sqlite3
+import asyncio
+import threading
+from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Iterable
+
+PROGRESS_SECTIONS = ("course", "diagnostic", "stats", "reviews", "lab")
+PROGRESS_STORE_BACKEND = os.getenv("SKILLFORGE_PROGRESS_STORE", "sqlite")
+PROGRESS_DB_PATH = os.getenv("SKILLFORGE_PROGRESS_DB_PATH", "skillforge_progress.db")
+PROGRESS_READ_THREADS = int(os.getenv("SKILLFORGE_PROGRESS_READ_THREADS", "4"))
+PROGRESS_SAVE_DELAY_SECONDS = float(
+    os.getenv("SKILLFORGE_PROGRESS_SAVE_DELAY_SECONDS", "2")
+)
+PROGRESS_SAVE_RETRY_MAX_SECONDS = 300
+
+
+def _json_default(value: Any) -> Any:
+    wrapped = getattr(value, "__wrapped__", None)
+    if wrapped is None:
+        raise TypeError(
+            f"Object of type {type(value).__name__} is not JSON serializable"
+        )
+    return wrapped
+
+
+def serialize_section(data: dict[str, Any]) -> str:
+    """Serializes a progress section, unwrapping state proxies."""
+    return json.dumps(data, default=_json_default)
+
+
+class ProgressStore(ABC):
+    """
+    Storage backend for user progress. Each user's progress is split into
+    independently stored sections (see PROGRESS_SECTIONS) so callers can read
+    or write only the parts they need.
+    """
+
+    @abstractmethod
+    async def load(
+        self, email: str, sections: Iterable[str] | None = None
+    ) -> dict[str, dict[str, Any]]:
+        """Returns the stored sections for a user, omitting missing ones."""
+
+    @abstractmethod
+    async def save_serialized(self, email: str, sections: dict[str, str]):
+        """Upserts already-serialized sections for a user."""
+
+    async def save(self, email: str, sections: dict[str, dict[str, Any]]):
+        """Upserts the given sections for a user."""
+        if not sections:
+            return
+        await self.save_serialized(
+            email,
+            {section: serialize_section(data) for section, data in sections.items()},
+        )
+
+
+class InMemoryProgressStore(ProgressStore):
+    """Process-local store, useful for development and tests."""
+
+    def __init__(self):
+        self._data: dict[str, dict[str, str]] = {}
+
+    async def load(
+        self, email: str, sections: Iterable[str] | None = None
+    ) -> dict[str, dict[str, Any]]:
+        stored = self._data.get(email, {})
+        wanted = PROGRESS_SECTIONS if sections is None else sections
+        return {s: json.loads(stored[s]) for s in wanted if s in stored}
+
+    async def save_serialized(self, email: str, sections: dict[str, str]):
+        self._data.setdefault(email, {}).update(sections)
+
+
+class SQLiteProgressStore(ProgressStore):
+    """
+    SQLite store in WAL mode with one row per (email, section).
+    Blocking database work runs off the event loop: reads on a small thread
+    pool, writes on a single thread so concurrent savers never contend for
+    the write lock.
+    """
+
+    def __init__(self, db_path: str = PROGRESS_DB_PATH):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._read_executor = ThreadPoolExecutor(
+            max_workers=PROGRESS_READ_THREADS, thread_name_prefix="progress-read"
+        )
+        self._write_executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="progress-write"
+        )
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS user_progress ("
+            "email TEXT NOT NULL, section TEXT NOT NULL, data TEXT NOT NULL, "
+            "updated_at REAL NOT NULL, PRIMARY KEY (email, section)) WITHOUT ROWID"
+        )
+        conn.commit()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    def _load_sync(self, email: str, sections: tuple[str, ...]) -> dict[str, Any]:
+        placeholders = ", ".join("?" for _ in sections)
+        rows = self._connection().execute(
+            f"SELECT section, data FROM user_progress WHERE email = ? AND section IN ({placeholders})",
+            (email, *sections),
+        )
+        return {section: json.loads(data) for section, data in rows}
+
+    def _save_sync(self, email: str, sections: dict[str, str]):
+        conn = self._connection()
+        now = time.time()
+        with conn:
+            conn.executemany(
+                "INSERT INTO user_progress (email, section, data, updated_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (email, section) DO UPDATE SET data = excluded.data, updated_at = excluded.updated_at",
+                [(email, section, data, now) for section, data in sections.items()],
+            )
+
+    async def load(
+        self, email: str, sections: Iterable[str] | None = None
+    ) -> dict[str, dict[str, Any]]:
+        wanted = tuple(PROGRESS_SECTIONS if sections is None else sections)
+        if not wanted:
+            return {}
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._read_executor, self._load_sync, email, wanted
+        )
+
+    async def save_serialized(self, email: str, sections: dict[str, str]):
+        if not sections:
+            return
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(
+            self._write_executor, self._save_sync, email, sections
+        )
+
+
+class WriteBehindQueue:
+    """
+    Debounced write-behind buffer in front of a ProgressStore.
+    Sections enqueued for a user within `delay` seconds of the first pending
+    change are merged and written together in a single save, and a failed
+    write is retried with exponential backoff. Callers enqueue only the
+    sections they changed; nothing is kept for a user once their writes
+    succeed.
+    """
+
+    def __init__(
+        self, store: ProgressStore, delay: float = PROGRESS_SAVE_DELAY_SECONDS
+    ):
+        self.store = store
+        self.delay = delay
+        self._pending: dict[str, dict[str, str]] = {}
+        self._timers: dict[str, asyncio.Task] = {}
+        self._failures: dict[str, int] = {}
+        self.enqueued = 0
+        self.writes = 0
+
+    def enqueue(self, email: str, sections: dict[str, str]) -> bool:
+        """Queues serialized sections for a user. Returns whether any were given."""
+        if not sections:
+            return False
+        self._pending.setdefault(email, {}).update(sections)
+        self.enqueued += 1
+        self._schedule(email, self.delay)
+        return True
+
+    def _schedule(self, email: str, delay: float):
+        if email not in self._timers:
+            self._timers[email] = asyncio.create_task(self._flush_later(email, delay))
+
+    async def _flush_later(self, email: str, delay: float):
+        await asyncio.sleep(delay)
+        self._timers.pop(email, None)
+        await self.flush(email)
+
+    async def flush(self, email: str):
+        timer = self._timers.pop(email, None)
+        if timer is not None and timer is not asyncio.current_task():
+            timer.cancel()
+        sections = self._pending.pop(email, None)
+        if not sections:
+            self._failures.pop(email, None)
+            return
+        try:
+            await self.store.save_serialized(email, sections)
+        except Exception as e:
+            logging.exception(f"Error saving progress for {email}: {e}")
+            for section, data in sections.items():
+                self._pending.setdefault(email, {}).setdefault(section, data)
+            failures = self._failures.get(email, 0) + 1
+            self._failures[email] = failures
+            self._schedule(
+                email,
+                min(self.delay * 2**failures, PROGRESS_SAVE_RETRY_MAX_SECONDS),
+            )
+            return
+        self.writes += 1
+        self._failures.pop(email, None)
+
+    async def flush_all(self):
+        """Writes everything pending once, without retrying; used on shutdown."""
+        for email in list(self._pending):
+            await self.flush(email)
+        for timer in self._timers.values():
+            timer.cancel()
+        self._timers.clear()
+
+    async def load(
+        self, email: str, sections: Iterable[str] | None = None
+    ) -> dict[str, dict[str, Any]]:
+        """Loads sections from the store, overlaid with not-yet-written changes."""
+        loaded = await self.store.load(email, sections)
+        wanted = PROGRESS_SECTIONS if sections is None else tuple(sections)
+        for section, data in self._pending.get(email, {}).items():
+            if section in wanted:
+                loaded[section] = json.loads(data)
+        return loaded
+
+
+_store: ProgressStore | None = None
+_writer: WriteBehindQueue | None = None
+
+
+def get_progress_store() -> ProgressStore:
+    """Returns the process-wide store selected by SKILLFORGE_PROGRESS_STORE."""
+    global _store
+    if _store is None:
+        if PROGRESS_STORE_BACKEND == "memory":
+            _store = InMemoryProgressStore()
+        elif PROGRESS_STORE_BACKEND == "sqlite":
+            _store = SQLiteProgressStore()
+        else:
+            raise ValueError(
+                f"Unknown progress store backend: {PROGRESS_STORE_BACKEND}"
+            )
+    return _store
+
+
+def get_progress_writer() -> WriteBehindQueue:
+    """Returns the process-wide write-behind queue for the progress store."""
+    global _writer
+    if _writer is None:
+        _writer = WriteBehindQueue(get_progress_store())
+    return _writer
+
+
+@asynccontextmanager
+async def progress_store_lifespan():
+    """App lifespan task that flushes pending progress writes on shutdown."""
+    try:
+        yield
+    finally:
+        if _writer is not None:
+            await _writer.flush_all()
@@ -0,0 +1,262 @@
+import os
+import json
+import math
+import time
+import copy
+import hashlib
+import logging
+import sqlite3
+import asyncio
+import threading
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
+from app.services.grader import normalize_text
+from app.services.adaptive_testing import DIFFICULTY_LOCATIONS
+
+QUESTION_BANK_PATH = os.getenv(
+    "SKILLFORGE_QUESTION_BANK_PATH", "skillforge_questions.db"
+)
+RESPONSE_FLUSH_SECONDS = float(
+    os.getenv("SKILLFORGE_QUESTION_STATS_DELAY_SECONDS", "2")
+)
+CALIBRATION_MIN_ATTEMPTS = 5
+CALIBRATION_PRIOR_WEIGHT = 5
+_bank: "QuestionBank | None" = None
+
+
+def _option_text(option) -> str:
+    return option if isinstance(option, str) else str(option.get("text", ""))
+
+
+def item_id(question: dict) -> str:
+    """
+    Stable id for a question: a hash of its normalized text and options, so
+    the same item generated twice, or in different sessions, is one item.
+    """
+    options = sorted(
+        normalize_text(_option_text(o)) for o in question.get("options", [])
+    )
+    key = json.dumps([normalize_text(question.get("question", "")), options])
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
+
+def empirical_difficulty(attempts: int, correct: int, difficulty: str) -> float:
+    """
+    Rasch difficulty implied by an item's observed success rate, assuming the
+    learners who saw it average ability 0. The rate is smoothed towards the
+    success rate implied by the item's difficulty label so that a handful of
+    responses cannot swing it to an extreme.
+    """
+    prior_b = DIFFICULTY_LOCATIONS.get(difficulty, 0.0)
+    prior_p = 1.0 / (1.0 + math.exp(prior_b))
+    p = (correct + CALIBRATION_PRIOR_WEIGHT * prior_p) / (
+        attempts + CALIBRATION_PRIOR_WEIGHT
+    )
+    p = min(max(p, 0.02), 0.98)
+    return math.log((1.0 - p) / p)
+
+
+def _normalize_topic(topic: str) -> str:
+    return " ".join(topic.lower().split())
+
+
+class QuestionBank:
+    """
+    SQLite store of generated questions shared across learners.
+    Items are keyed by item_id(), so duplicates collapse into one row, and
+    every row accumulates how often it was answered and answered correctly.
+    Response counts are buffered in memory and written in batches.
+    """
+
+    def __init__(
+        self, db_path: str = QUESTION_BANK_PATH, delay: float = RESPONSE_FLUSH_SECONDS
+    ):
+        self.db_path = db_path
+        self.delay = delay
+        self._local = threading.local()
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="question-bank"
+        )
+        self._known: set[str] = set()
+        self._pending: dict[str, list[int]] = {}
+        self._timer: asyncio.Task | None = None
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS question_bank ("
+            "item_id TEXT PRIMARY KEY, kind TEXT NOT NULL, topic TEXT NOT NULL, "
+            "level TEXT NOT NULL, language TEXT NOT NULL, subtopic TEXT NOT NULL, "
+            "difficulty TEXT NOT NULL, data TEXT NOT NULL, "
+            "attempts INTEGER NOT NULL DEFAULT 0, correct INTEGER NOT NULL DEFAULT 0, "
+            "created_at REAL NOT NULL) WITHOUT ROWID"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS question_bank_lookup "
+            "ON question_bank (kind, topic, level, language)"
+        )
+        conn.commit()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    async def _run(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, fn, *args)
+
+    def _insert_sync(self, rows: list[tuple]):
+        with self._connection() as conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO question_bank (item_id, kind, topic, level, "
+                "language, subtopic, difficulty, data, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    async def ingest(
+        self, items: list[dict], kind: str, topic: str, level: str, language: str
+    ) -> list[dict]:
+        """
+        Adds generated questions to the bank and returns copies carrying
+        their bank id as `id`, with duplicates removed.
+        """
+        unique: dict[str, dict] = {}
+        for item in items:
+            question = copy.deepcopy(item)
+            question["id"] = item_id(question)
+            unique.setdefault(question["id"], question)
+        new = [q for q in unique.values() if q["id"] not in self._known]
+        if new:
+            now = time.time()
+            rows = [
+                (
+                    q["id"],
+                    kind,
+                    _normalize_topic(topic),
+                    level,
+                    language,
+                    str(q.get("subtopic") or ""),
+                    str(q.get("difficulty") or "medium").lower(),
+                    json.dumps(q),
+                    now,
+                )
+                for q in new
+            ]
+            try:
+                await self._run(self._insert_sync, rows)
+                self._known.update(q["id"] for q in new)
+            except Exception as e:
+                logging.exception(f"Error adding questions to the bank: {e}")
+        return list(unique.values())
+
+    def _draw_sync(
+        self, kind: str, topic: str, level: str, language: str, limit: int
+    ) -> list[dict]:
+        rows = self._connection().execute(
+            "SELECT data FROM question_bank WHERE kind = ? AND topic = ? "
+            "AND level = ? AND language = ? ORDER BY created_at LIMIT ?",
+            (kind, topic, level, language, limit),
+        )
+        return [json.loads(data) for (data,) in rows]
+
+    async def draw(
+        self, kind: str, topic: str, level: str, language: str, limit: int
+    ) -> list[dict]:
+        """Returns up to `limit` stored questions for this topic and level."""
+        return await self._run(
+            self._draw_sync, kind, _normalize_topic(topic), level, language, limit
+        )
+
+    async def record_response(self, question_id: str, correct: bool):
+        """Counts one answer to a question; counts are written in batches."""
+        counts = self._pending.setdefault(question_id, [0, 0])
+        counts[0] += 1
+        counts[1] += int(correct)
+        if self._timer is None:
+            self._timer = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.delay)
+        self._timer = None
+        await self.flush()
+
+    def _record_sync(self, counts: dict[str, list[int]]):
+        with self._connection() as conn:
+            conn.executemany(
+                "UPDATE question_bank SET attempts = attempts + ?, "
+                "correct = correct + ? WHERE item_id = ?",
+                [(a, c, question_id) for question_id, (a, c) in counts.items()],
+            )
+
+    async def flush(self):
+        if self._timer is not None and self._timer is not asyncio.current_task():
+            self._timer.cancel()
+            self._timer = None
+        counts, self._pending = self._pending, {}
+        if not counts:
+            return
+        try:
+            await self._run(self._record_sync, counts)
+        except Exception as e:
+            logging.exception(f"Error recording question statistics: {e}")
+
+    def _statistics_sync(self, question_ids: list[str]):
+        placeholders = ", ".join("?" for _ in question_ids)
+        rows = self._connection().execute(
+            f"SELECT item_id, attempts, correct FROM question_bank WHERE item_id IN ({placeholders})",
+            question_ids,
+        )
+        return {question_id: [a, c] for question_id, a, c in rows}
+
+    async def statistics(self, question_ids: list[str]) -> dict[str, tuple[int, int]]:
+        """Returns (attempts, correct) per known question, including buffered counts."""
+        if not question_ids:
+            return {}
+        stored = await self._run(self._statistics_sync, list(question_ids))
+        for question_id, (a, c) in self._pending.items():
+            if question_id in stored:
+                stored[question_id][0] += a
+                stored[question_id][1] += c
+        return {question_id: (a, c) for question_id, (a, c) in stored.items()}
+
+    async def calibrate(self, items: list[dict]) -> list[dict]:
+        """
+        Returns copies of `items` with an empirical Rasch difficulty `b` on
+        those answered at least CALIBRATION_MIN_ATTEMPTS times.
+        """
+        try:
+            stats = await self.statistics([item["id"] for item in items])
+        except Exception as e:
+            logging.exception(f"Error reading question statistics: {e}")
+            return items
+        calibrated = []
+        for item in items:
+            attempts, correct = stats.get(item["id"], (0, 0))
+            if attempts >= CALIBRATION_MIN_ATTEMPTS:
+                difficulty = str(item.get("difficulty", "medium")).lower()
+                b = empirical_difficulty(attempts, correct, difficulty)
+                item = {**item, "b": round(b, 3)}
+            calibrated.append(item)
+        return calibrated
+
+
+def get_question_bank() -> QuestionBank:
+    """Returns the process-wide question bank."""
+    global _bank
+    if _bank is None:
+        _bank = QuestionBank()
+    return _bank
+
+
+@asynccontextmanager
+async def question_bank_lifespan():
+    """App lifespan task that writes buffered response counts on shutdown."""
+    try:
+        yield
+    finally:
+        if _bank is not None:
+            await _bank.flush()
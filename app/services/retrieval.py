@@ -0,0 +1,139 @@
+import os
+import re
+import math
+import hashlib
+from collections import Counter, OrderedDict
+
+CHUNK_MAX_CHARS = 1200
+TUTOR_CONTEXT_TOKENS = int(os.getenv("SKILLFORGE_TUTOR_CONTEXT_TOKENS", "600"))
+INDEX_CACHE_SIZE = 256
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+_indexes: OrderedDict[str, "ModuleIndex"] = OrderedDict()
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about 4 characters per token for English text)."""
+    return len(text) // 4 + 1
+
+
+def _tokenize(text: str) -> list[str]:
+    return [t for t in _TOKEN_RE.findall(text.lower()) if len(t) > 1]
+
+
+def chunk_markdown(content: str, max_chars: int = CHUNK_MAX_CHARS) -> list[str]:
+    """
+    Splits markdown into chunks at headings. Sections longer than `max_chars`
+    are split further at blank lines outside code fences, and every piece
+    keeps its section heading so it stays meaningful on its own.
+    """
+    sections: list[tuple[str, list[str]]] = [("", [])]
+    in_fence = False
+    for line in content.splitlines():
+        if line.lstrip().startswith("```"):
+            in_fence = not in_fence
+        if not in_fence and line.startswith("#"):
+            sections.append((line, []))
+        else:
+            sections[-1][1].append(line)
+    chunks = []
+    for heading, lines in sections:
+        paragraphs: list[str] = []
+        current: list[str] = []
+        in_fence = False
+        for line in lines:
+            if line.lstrip().startswith("```"):
+                in_fence = not in_fence
+            if not line.strip() and not in_fence:
+                if current:
+                    paragraphs.append("\n".join(current))
+                    current = []
+            else:
+                current.append(line)
+        if current:
+            paragraphs.append("\n".join(current))
+        piece = ""
+        for paragraph in paragraphs:
+            if piece and len(piece) + len(paragraph) > max_chars:
+                chunks.append(f"{heading}\n{piece}".strip())
+                piece = ""
+            piece = f"{piece}\n\n{paragraph}" if piece else paragraph
+        if piece or heading:
+            chunks.append(f"{heading}\n{piece}".strip())
+    return [c for c in chunks if c]
+
+
+class ModuleIndex:
+    """BM25 index over the heading-aware chunks of one module's content."""
+
+    K1 = 1.5
+    B = 0.75
+
+    def __init__(self, content: str):
+        self.chunks = chunk_markdown(content)
+        self.term_counts = [Counter(_tokenize(chunk)) for chunk in self.chunks]
+        self.lengths = [sum(tc.values()) for tc in self.term_counts]
+        self.avg_length = sum(self.lengths) / len(self.lengths) if self.lengths else 0
+        doc_freq = Counter()
+        for tc in self.term_counts:
+            doc_freq.update(tc.keys())
+        n = len(self.chunks)
+        self.idf = {
+            term: math.log(1 + (n - df + 0.5) / (df + 0.5))
+            for term, df in doc_freq.items()
+        }
+
+    def search(self, query: str) -> list[tuple[float, int]]:
+        """Returns (score, chunk index) pairs for matching chunks, best first."""
+        terms = [t for t in set(_tokenize(query)) if t in self.idf]
+        results = []
+        for i, tc in enumerate(self.term_counts):
+            score = 0.0
+            relative_length = self.lengths[i] / (self.avg_length or 1)
+            norm = self.K1 * (1 - self.B + self.B * relative_length)
+            for term in terms:
+                freq = tc.get(term)
+                if freq:
+                    score += self.idf[term] * freq * (self.K1 + 1) / (freq + norm)
+            if score > 0:
+                results.append((score, i))
+        results.sort(reverse=True)
+        return results
+
+
+def index_module_content(content: str) -> ModuleIndex:
+    """Returns the index for this content, building it once per distinct text."""
+    key = hashlib.sha1(content.encode("utf-8")).hexdigest()
+    index = _indexes.get(key)
+    if index is None:
+        index = ModuleIndex(content)
+        _indexes[key] = index
+        while len(_indexes) > INDEX_CACHE_SIZE:
+            _indexes.popitem(last=False)
+    else:
+        _indexes.move_to_end(key)
+    return index
+
+
+def select_context(
+    content: str, query: str, token_budget: int = TUTOR_CONTEXT_TOKENS
+) -> str:
+    """
+    Picks the chunks of `content` most relevant to `query` that fit within
+    `token_budget`, returned in document order. Falls back to the opening
+    chunks when nothing in the lesson matches the query.
+    """
+    if not content:
+        return ""
+    index = index_module_content(content)
+    ranked = [i for _, i in index.search(query)] or list(range(len(index.chunks)))
+    selected = []
+    used = 0
+    for i in ranked:
+        cost = estimate_tokens(index.chunks[i])
+        if used + cost > token_budget:
+            continue
+        selected.append(i)
+        used += cost
+    if not selected and index.chunks:
+        return index.chunks[ranked[0]][: token_budget * 4] + "..."
+    return "\n\n".join(index.chunks[i] for i in sorted(selected))
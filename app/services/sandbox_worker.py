@@ -0,0 +1,425 @@
+"""
+Long-lived sandbox worker started by app.services.code_runner.
+
+Reads one JSON job per line on stdin, forks a child per job with resource
+limits applied, and writes JSON messages back on stdout: `stdout` and
+`stderr` chunks as they are produced, then a single `exit` message. Any data
+received on stdin while a job is running cancels it; EOF on stdin kills the
+running child and shuts the worker down.
+
+Children may only write inside their own run directory and only read from it
+and from the Python installation; subprocesses, sockets, ctypes and SQLite
+are blocked by an audit hook. The hook is a second line of defence: the
+worker moves itself into an empty network namespace on startup and, when
+started as root, each child switches to the unprivileged uid and gid given in
+the job before it runs any learner code.
+
+The worker only imports the standard library so it starts quickly, and it
+imports the modules learners use most before the first fork so each child
+gets them for free. Children running as the unprivileged user can only import
+modules it can read, so the Python installation must be readable by it.
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import codecs
+import signal
+import shutil
+import resource
+import sysconfig
+import importlib
+import selectors
+import tempfile
+import traceback
+import types
+
+CHUNK_BYTES = 4096
+PRELOADED_MODULES = (
+    "bisect",
+    "collections",
+    "contextlib",
+    "copy",
+    "dataclasses",
+    "datetime",
+    "decimal",
+    "fractions",
+    "functools",
+    "heapq",
+    "inspect",
+    "itertools",
+    "json",
+    "math",
+    "operator",
+    "random",
+    "re",
+    "statistics",
+    "string",
+    "textwrap",
+    "typing",
+)
+CLONE_NEWUSER = 0x10000000
+CLONE_NEWNET = 0x40000000
+BLOCKED_AUDIT_EVENTS = (
+    "socket.",
+    "subprocess.",
+    "os.system",
+    "os.exec",
+    "os.fork",
+    "os.forkpty",
+    "os.posix_spawn",
+    "os.spawn",
+    "os.kill",
+    "os.killpg",
+    "ctypes.",
+    "pty.",
+    "sqlite3.",
+    "os.link",
+    "os.symlink",
+    "gc.get_",
+)
+BLOCKED_MODULES = ("_posixsubprocess", "_ctypes", "_sqlite3")
+READ_PATH_EVENTS = ("os.listdir", "os.scandir", "os.chdir")
+WRITE_PATH_EVENTS = (
+    "os.mkdir",
+    "os.remove",
+    "os.rmdir",
+    "os.chmod",
+    "os.chown",
+    "os.truncate",
+    "os.utime",
+    "shutil.rmtree",
+)
+WRITE_FLAGS = os.O_WRONLY | os.O_RDWR | os.O_APPEND | os.O_CREAT | os.O_TRUNC
+READABLE_ROOTS = tuple(
+    {os.path.realpath(path) for path in sysconfig.get_paths().values()}
+)
+
+
+def _send(message: dict):
+    sys.stdout.buffer.write(json.dumps(message).encode("utf-8") + b"\n")
+    sys.stdout.buffer.flush()
+
+
+def _sandbox_hook(workdir: str):
+    """
+    Audit hook that denies blocked events and modules, and file access outside
+    `workdir` except reads from the Python installation.
+
+    The policy is bound into the closure and paths are resolved with the C
+    functions from `posix`, so code in the sandbox cannot loosen it by
+    rebinding module globals. Arguments are copied to plain `str`, `bytes` and
+    `int` before they are inspected, so subclasses cannot lie about them.
+    """
+    import posix
+    import pathlib
+
+    getcwd, lstat, readlink = posix.getcwd, posix.lstat, posix.readlink
+    encoding = sys.getfilesystemencoding()
+    path_types = (pathlib.PurePosixPath, pathlib.PosixPath)
+    path_str = pathlib.PurePath.__str__
+    blocked_events = tuple(BLOCKED_AUDIT_EVENTS)
+    blocked_modules = frozenset(BLOCKED_MODULES)
+    read_events = frozenset(READ_PATH_EVENTS)
+    write_events = frozenset(WRITE_PATH_EVENTS)
+    write_flags = WRITE_FLAGS
+    readable = (workdir, *READABLE_ROOTS)
+    writable = (workdir,)
+
+    def resolve(path) -> str | None:
+        """Returns the real absolute path, or None if it cannot be checked."""
+        if isinstance(path, str):
+            path = str.__add__("", path)
+        elif isinstance(path, bytes):
+            path = bytes.__add__(b"", path).decode(encoding, "surrogateescape")
+        elif type(path) in path_types:
+            path = path_str(path)
+        else:
+            return None
+        if not path.startswith("/"):
+            path = getcwd() + "/" + path
+        parts, pending, hops = [], path.split("/")[::-1], 0
+        while pending:
+            part = pending.pop()
+            if part in ("", "."):
+                continue
+            if part == "..":
+                if parts:
+                    parts.pop()
+                continue
+            candidate = "/" + "/".join(parts + [part])
+            try:
+                is_link = lstat(candidate).st_mode & 0o170000 == 0o120000
+            except OSError:
+                is_link = False
+            if not is_link:
+                parts.append(part)
+                continue
+            hops += 1
+            if hops > 40:
+                return None
+            target = readlink(candidate)
+            if target.startswith("/"):
+                parts = []
+            pending.extend(target.split("/")[::-1])
+        return "/" + "/".join(parts)
+
+    def within(path, roots: tuple[str, ...]) -> bool:
+        if isinstance(path, int):
+            return True
+        path = resolve(path)
+        if path is None:
+            return False
+        return any(path == root or path.startswith(root + "/") for root in roots)
+
+    def opens_for_write(mode, flags) -> bool:
+        if isinstance(mode, str):
+            mode = str.__add__("", mode)
+            return any(c in mode for c in "wax+")
+        return bool(int.__and__(flags, write_flags))
+
+    def deny(event: str, args):
+        if event.startswith(blocked_events):
+            raise PermissionError(f"{event} is not allowed in the sandbox")
+        if event == "import":
+            name = args[0]
+            if not isinstance(name, str):
+                raise PermissionError("import is not allowed in the sandbox")
+            if str.partition(name, ".")[0] in blocked_modules:
+                raise PermissionError(f"import {name} is not allowed in the sandbox")
+            return
+        if event == "open":
+            path, mode, flags = args
+            roots = writable if opens_for_write(mode, flags) else readable
+            paths = (path,)
+        elif event == "os.rename":
+            roots, paths = writable, args[:2]
+        elif event in write_events:
+            roots, paths = writable, args[:1]
+        elif event in read_events:
+            roots, paths = readable, args[:1]
+        else:
+            return
+        for path in paths:
+            if path is not None and not within(path, roots):
+                raise PermissionError(f"{event} outside the sandbox is not allowed")
+
+    return deny
+
+
+def _isolate_network():
+    """
+    Moves the worker, and so every child it forks, into a new network namespace
+    with no interfaces. Without root this also needs a user namespace.
+    """
+    flags = CLONE_NEWNET if os.getuid() == 0 else CLONE_NEWUSER | CLONE_NEWNET
+    try:
+        if hasattr(os, "unshare"):
+            os.unshare(flags)
+        else:
+            import ctypes
+
+            libc = ctypes.CDLL(None, use_errno=True)
+            if libc.unshare(flags) != 0:
+                error = ctypes.get_errno()
+                raise OSError(error, os.strerror(error))
+    except (OSError, AttributeError) as e:
+        sys.stderr.write(f"sandbox worker: network isolation unavailable: {e}\n")
+    finally:
+        for name in ("ctypes", *BLOCKED_MODULES):
+            sys.modules.pop(name, None)
+
+
+def _drop_privileges(job: dict, workdir: str):
+    """Switches a child started as root to the sandbox uid and gid."""
+    if os.getuid() != 0:
+        return
+    uid, gid = int(job["uid"]), int(job["gid"])
+    os.chown(workdir, uid, gid)
+    os.setgroups([])
+    os.setgid(gid)
+    os.setuid(uid)
+
+
+def _apply_limits(job: dict):
+    cpu = max(int(job["timeout"]), 1)
+    memory = int(job["memory_mb"]) * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_CPU, (cpu, cpu + 1))
+    resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+    resource.setrlimit(resource.RLIMIT_FSIZE, (1024 * 1024, 1024 * 1024))
+    resource.setrlimit(resource.RLIMIT_NOFILE, (32, 32))
+    resource.setrlimit(resource.RLIMIT_NPROC, (0, 0))
+    resource.setrlimit(resource.RLIMIT_CORE, (0, 0))
+
+
+def _run_child(job: dict, workdir: str, out_w: int, err_w: int):
+    """Runs in the forked child; never returns."""
+    status = 0
+    try:
+        os.setsid()
+        devnull = os.open(os.devnull, os.O_RDONLY)
+        os.dup2(devnull, 0)
+        os.dup2(out_w, 1)
+        os.dup2(err_w, 2)
+        os.closerange(3, 1024)
+        sys.stdin = io.StringIO(job.get("stdin", ""))
+        sys.stdout = open(1, "w", encoding="utf-8", errors="backslashreplace")
+        sys.stderr = open(2, "w", encoding="utf-8", errors="backslashreplace")
+        _drop_privileges(job, workdir)
+        os.chdir(workdir)
+        os.environ["TMPDIR"] = tempfile.tempdir = workdir
+        _apply_limits(job)
+        sys.dont_write_bytecode = True
+        for name in BLOCKED_MODULES:
+            sys.modules.pop(name, None)
+        sys.addaudithook(_sandbox_hook(os.path.realpath(workdir)))
+        code = compile(job["code"], "main.py", "exec")
+        module = types.ModuleType(job.get("module_name", "__main__"))
+        sys.modules["__main__"] = module
+        exec(code, module.__dict__)
+    except SystemExit as e:
+        if isinstance(e.code, int):
+            status = e.code
+        elif e.code is not None:
+            print(e.code, file=sys.stderr)
+            status = 1
+    except BaseException as e:
+        tb = e.__traceback__
+        while tb is not None and tb.tb_frame.f_code.co_filename != "main.py":
+            tb = tb.tb_next
+        report = traceback.TracebackException(type(e), e, tb)
+        report.stack = traceback.StackSummary.from_list(
+            [frame for frame in report.stack if frame.filename != __file__]
+        )
+        sys.stderr.write("".join(report.format()))
+        status = 1
+    finally:
+        try:
+            sys.stdout.flush()
+            sys.stderr.flush()
+        except BaseException:
+            pass
+        os._exit(status & 0xFF)
+
+
+def _kill(pid: int):
+    """Kills the child's process group, or the child itself if it has none yet."""
+    try:
+        os.killpg(pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        try:
+            os.kill(pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
+
+def _run_job(job: dict) -> bool:
+    """
+    Forks a child for one job and relays its output until it exits.
+    Returns False when stdin reached EOF and the worker should stop.
+    """
+    workdir = tempfile.mkdtemp(prefix="skillforge_run_")
+    out_r, out_w = os.pipe()
+    err_r, err_w = os.pipe()
+    sys.stdout.flush()
+    started = time.monotonic()
+    pid = os.fork()
+    if pid == 0:
+        _run_child(job, workdir, out_w, err_w)
+    os.close(out_w)
+    os.close(err_w)
+    decoders = {
+        out_r: ("stdout", codecs.getincrementaldecoder("utf-8")("replace")),
+        err_r: ("stderr", codecs.getincrementaldecoder("utf-8")("replace")),
+    }
+    selector = selectors.DefaultSelector()
+    for fd in decoders:
+        selector.register(fd, selectors.EVENT_READ)
+    selector.register(0, selectors.EVENT_READ)
+    deadline = started + float(job["timeout"])
+    output_left = int(job["max_output_bytes"])
+    timed_out = truncated = cancelled = False
+    keep_running = True
+    open_pipes = len(decoders)
+    while open_pipes:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            timed_out = True
+            break
+        for key, _ in selector.select(remaining):
+            fd = key.fd
+            data = os.read(fd, CHUNK_BYTES)
+            if fd == 0:
+                cancelled = True
+                keep_running = bool(data)
+                break
+            if not data:
+                selector.unregister(fd)
+                open_pipes -= 1
+                continue
+            stream, decoder = decoders[fd]
+            if len(data) > output_left:
+                data = data[:output_left]
+                truncated = True
+            output_left -= len(data)
+            text = decoder.decode(data)
+            if text:
+                _send({"type": stream, "data": text})
+            if truncated:
+                break
+        if truncated or cancelled:
+            break
+    if open_pipes:
+        _kill(pid)
+    while True:
+        done, wait_status = os.waitpid(pid, os.WNOHANG)
+        if done:
+            break
+        if time.monotonic() >= deadline:
+            timed_out = True
+            _kill(pid)
+        time.sleep(0.005)
+    duration = time.monotonic() - started
+    selector.close()
+    os.close(out_r)
+    os.close(err_r)
+    shutil.rmtree(workdir, ignore_errors=True)
+    exit_code = os.waitstatus_to_exitcode(wait_status)
+    killed = exit_code in (-signal.SIGXCPU, -signal.SIGKILL)
+    if killed and not (truncated or cancelled):
+        timed_out = True
+    _send(
+        {
+            "type": "exit",
+            "exit_code": exit_code,
+            "timed_out": timed_out,
+            "truncated": truncated,
+            "cancelled": cancelled,
+            "duration": duration,
+        }
+    )
+    return keep_running
+
+
+def main():
+    _isolate_network()
+    for name in PRELOADED_MODULES:
+        importlib.import_module(name)
+    pending = b""
+    while True:
+        while b"\n" not in pending:
+            data = os.read(0, 65536)
+            if not data:
+                return
+            pending += data
+        line, pending = pending.split(b"\n", 1)
+        if not line.strip():
+            continue
+        if not _run_job(json.loads(line)):
+            return
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+import copy
+import asyncio
+from typing import Any, Awaitable, Callable
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical calls: the first caller for a key runs
+    the work, every caller that arrives while it is in flight awaits the
+    same future. Each waiter receives its own deep copy of the result so
+    sessions never share mutable content.
+    """
+
+    instances: list["SingleFlight"] = []
+
+    def __init__(self, name: str):
+        self.name = name
+        self._in_flight: dict[str, asyncio.Future] = {}
+        self.calls = 0
+        self.coalesced = 0
+        SingleFlight.instances.append(self)
+
+    async def do(self, key: str, work: Callable[[], Awaitable[Any]]) -> Any:
+        self.calls += 1
+        future = self._in_flight.get(key)
+        if future is not None:
+            self.coalesced += 1
+        while future is not None:
+            try:
+                return copy.deepcopy(await asyncio.shield(future))
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+            future = self._in_flight.get(key)
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            result = await work()
+        except BaseException as e:
+            if isinstance(e, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(e)
+                future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return copy.deepcopy(result)
+        finally:
+            self._in_flight.pop(key, None)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._in_flight),
+        }
@@ -0,0 +1,171 @@
+from datetime import datetime, timedelta
+import numpy as np
+
+DEFAULT_EASE = 2.5
+MIN_EASE = 1.3
+FIRST_INTERVAL_DAYS = 1
+SECOND_INTERVAL_DAYS = 6
+PASSING_QUALITY = 3
+
+
+def item_repetitions(item: dict) -> int:
+    """
+    The item's successful repetition count. Items saved before the count
+    was tracked get one inferred from their interval, so a mature card is
+    not treated as new and sent back to a one-day interval.
+    """
+    if "repetitions" in item:
+        return int(item["repetitions"])
+    interval = item.get("interval_days", 0)
+    if interval <= 0:
+        return 0
+    if interval <= FIRST_INTERVAL_DAYS:
+        return 1
+    if interval <= SECOND_INTERVAL_DAYS:
+        return 2
+    return 3
+
+
+def sm2_schedule(
+    intervals: np.ndarray,
+    eases: np.ndarray,
+    repetitions: np.ndarray,
+    qualities: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Applies one SM-2 review to every card at once.
+    Takes the cards' current interval (days), ease factor and successful
+    repetition count plus the 0-5 recall quality of this review, and
+    returns the new (intervals, eases, repetitions) arrays.
+    A failed recall (quality < 3) restarts the repetition sequence without
+    touching the ease factor, as in the original algorithm.
+    """
+    intervals = np.asarray(intervals, dtype=np.float64)
+    eases = np.asarray(eases, dtype=np.float64)
+    repetitions = np.asarray(repetitions, dtype=np.int64)
+    q = np.clip(np.asarray(qualities, dtype=np.float64), 0, 5)
+    passed = q >= PASSING_QUALITY
+    updated_eases = np.maximum(
+        eases + (0.1 - (5 - q) * (0.08 + (5 - q) * 0.02)), MIN_EASE
+    )
+    new_eases = np.where(passed, updated_eases, eases)
+    new_repetitions = np.where(passed, repetitions + 1, 0)
+    grown = np.ceil(np.maximum(intervals, 1) * new_eases)
+    new_intervals = np.select(
+        [~passed, new_repetitions == 1, new_repetitions == 2],
+        [FIRST_INTERVAL_DAYS, FIRST_INTERVAL_DAYS, SECOND_INTERVAL_DAYS],
+        default=grown,
+    ).astype(np.int64)
+    return (new_intervals, new_eases, new_repetitions)
+
+
+def deck_arrays(items: list[dict]) -> dict[str, np.ndarray]:
+    """Extracts the scheduling fields of review items into parallel arrays."""
+    return {
+        "intervals": np.fromiter(
+            (item.get("interval_days", 0) for item in items), np.int64, len(items)
+        ),
+        "eases": np.fromiter(
+            (item.get("ease_factor", DEFAULT_EASE) for item in items),
+            np.float64,
+            len(items),
+        ),
+        "repetitions": np.fromiter(
+            (item_repetitions(item) for item in items), np.int64, len(items)
+        ),
+        "due": np.fromiter(
+            (
+                datetime.fromisoformat(item["next_review_date"]).timestamp()
+                for item in items
+            ),
+            np.float64,
+            len(items),
+        ),
+    }
+
+
+def review_deck(
+    items: list[dict], qualities: np.ndarray, now: datetime | None = None
+) -> list[dict]:
+    """
+    Returns copies of `items` rescheduled as if each had just been reviewed
+    with the matching quality.
+    """
+    if not items:
+        return []
+    now = now or datetime.now()
+    arrays = deck_arrays(items)
+    intervals, eases, repetitions = sm2_schedule(
+        arrays["intervals"], arrays["eases"], arrays["repetitions"], qualities
+    )
+    return [
+        {
+            **item,
+            "interval_days": int(interval),
+            "ease_factor": round(float(ease), 4),
+            "repetitions": int(reps),
+            "next_review_date": (now + timedelta(days=int(interval))).isoformat(),
+        }
+        for item, interval, ease, reps in zip(items, intervals, eases, repetitions)
+    ]
+
+
+def shift_due_dates(items: list[dict], hours: float) -> list[dict]:
+    """Returns copies of `items` with every due date moved by `hours`."""
+    if not items:
+        return []
+    shifted = deck_arrays(items)["due"] + hours * 3600
+    return [
+        {**item, "next_review_date": datetime.fromtimestamp(due).isoformat()}
+        for item, due in zip(items, shifted)
+    ]
+
+
+def forecast_due_counts(
+    items: list[dict], days: int = 30, now: datetime | None = None
+) -> np.ndarray:
+    """
+    Counts how many cards fall due on each of the next `days` days.
+    Overdue cards are counted on day 0.
+    """
+    if not items:
+        return np.zeros(days, dtype=np.int64)
+    now = now or datetime.now()
+    start_of_today = datetime.combine(now.date(), datetime.min.time()).timestamp()
+    day_offsets = np.floor((deck_arrays(items)["due"] - start_of_today) / 86400)
+    day_offsets = np.clip(day_offsets, 0, None).astype(np.int64)
+    return np.bincount(day_offsets[day_offsets < days], minlength=days)
+
+
+def simulate_workload(
+    items: list[dict], days: int = 30, quality: int = 4, now: datetime | None = None
+) -> np.ndarray:
+    """
+    Projects the number of reviews per day over the next `days` days,
+    assuming every due card is reviewed on time with the given quality.
+    Each simulated day advances the whole deck in one vectorized step.
+    """
+    workload = np.zeros(days, dtype=np.int64)
+    if not items:
+        return workload
+    now = now or datetime.now()
+    arrays = deck_arrays(items)
+    start_of_today = datetime.combine(now.date(), datetime.min.time()).timestamp()
+    due_day = np.clip(np.floor((arrays["due"] - start_of_today) / 86400), 0, None)
+    intervals = arrays["intervals"]
+    eases = arrays["eases"]
+    repetitions = arrays["repetitions"]
+    for day in range(days):
+        mask = due_day <= day
+        count = int(mask.sum())
+        workload[day] = count
+        if not count:
+            continue
+        new_intervals, new_eases, new_reps = sm2_schedule(
+            intervals[mask], eases[mask], repetitions[mask], np.full(count, quality)
+        )
+        intervals[mask] = new_intervals
+        eases[mask] = new_eases
+        repetitions[mask] = new_reps
+        due_day[mask] = day + new_intervals
+    return workload
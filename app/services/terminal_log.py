@@ -0,0 +1,112 @@
+import os
+import time
+import asyncio
+import hashlib
+import logging
+import tempfile
+from contextlib import asynccontextmanager
+from itertools import islice
+
+TERMINAL_MAX_LINES = int(os.getenv("SKILLFORGE_TERMINAL_MAX_LINES", "200"))
+TERMINAL_MAX_LINE_BYTES = int(os.getenv("SKILLFORGE_TERMINAL_MAX_LINE_BYTES", "2000"))
+TERMINAL_SPILL_DIR = os.getenv(
+    "SKILLFORGE_TERMINAL_SPILL_DIR",
+    os.path.join(tempfile.gettempdir(), "skillforge_terminal"),
+)
+TERMINAL_SPILL_TTL_SECONDS = float(
+    os.getenv("SKILLFORGE_TERMINAL_SPILL_TTL_SECONDS", "3600")
+)
+SPILL_SWEEP_SECONDS = 600
+
+
+def clip_line(line: str, max_bytes: int = TERMINAL_MAX_LINE_BYTES) -> str:
+    """Caps a terminal line at `max_bytes` of UTF-8 and strips embedded newlines."""
+    line = line.replace("\r", "").replace("\n", " ")
+    encoded = line.encode("utf-8")
+    if len(encoded) <= max_bytes:
+        return line
+    return encoded[:max_bytes].decode("utf-8", errors="ignore") + " …[truncated]"
+
+
+def _spill_path(session_id: str) -> str:
+    name = hashlib.sha1(session_id.encode("utf-8")).hexdigest()
+    return os.path.join(TERMINAL_SPILL_DIR, f"{name}.log")
+
+
+def append_lines(
+    buffer: list[str],
+    lines: list[str],
+    session_id: str,
+    fresh: bool = False,
+    max_lines: int = TERMINAL_MAX_LINES,
+) -> tuple[list[str], int]:
+    """
+    Appends lines to a fixed-capacity terminal buffer. Lines pushed out of
+    the buffer are appended to the session's spill file on disk; `fresh`
+    truncates any spill file left over from an earlier state for the session.
+    Returns the new buffer and the number of lines spilled.
+    """
+    buffer = buffer + [clip_line(line) for line in lines]
+    overflow = len(buffer) - max_lines
+    if overflow <= 0:
+        return (buffer, 0)
+    os.makedirs(TERMINAL_SPILL_DIR, exist_ok=True)
+    with open(_spill_path(session_id), "w" if fresh else "a", encoding="utf-8") as f:
+        f.writelines(line + "\n" for line in buffer[:overflow])
+    return (buffer[overflow:], overflow)
+
+
+def read_spilled(session_id: str, start: int, end: int) -> list[str]:
+    """Returns spilled lines in [start, end), oldest first."""
+    try:
+        with open(_spill_path(session_id), encoding="utf-8") as f:
+            return [line.rstrip("\n") for line in islice(f, max(start, 0), end)]
+    except FileNotFoundError:
+        return []
+
+
+def clear_spill(session_id: str):
+    try:
+        os.remove(_spill_path(session_id))
+    except FileNotFoundError:
+        pass
+
+
+def sweep_spills(max_age: float = TERMINAL_SPILL_TTL_SECONDS) -> int:
+    """
+    Removes spill files not written to for `max_age` seconds, which belong to
+    sessions whose state has expired. Returns the number of files removed.
+    """
+    cutoff = time.time() - max_age
+    removed = 0
+    try:
+        entries = list(os.scandir(TERMINAL_SPILL_DIR))
+    except FileNotFoundError:
+        return 0
+    for entry in entries:
+        try:
+            if entry.name.endswith(".log") and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+                removed += 1
+        except FileNotFoundError:
+            pass
+    return removed
+
+
+@asynccontextmanager
+async def terminal_spill_lifespan():
+    """App lifespan task that removes expired sessions' spill files periodically."""
+
+    async def sweep_forever():
+        while True:
+            try:
+                await asyncio.to_thread(sweep_spills)
+            except Exception as e:
+                logging.exception(f"Error removing expired terminal spill files: {e}")
+            await asyncio.sleep(SPILL_SWEEP_SECONDS)
+
+    task = asyncio.create_task(sweep_forever())
+    try:
+        yield
+    finally:
+        task.cancel()
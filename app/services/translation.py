@@ -0,0 +1,223 @@
+import os
+import json
+import asyncio
+import hashlib
+import logging
+from typing import Any
+from app.services.openai_client import get_client
+from app.services.content_cache import ContentCache, make_cache_key
+from app.services.single_flight import SingleFlight
+
+MODEL = "gpt-4o-mini"
+TRANSLATION_PROMPT_VERSION = 1
+CANONICAL_LANGUAGE = os.getenv("SKILLFORGE_CANONICAL_LANGUAGE", "en")
+TRANSLATION_BATCH_CHARS = int(os.getenv("SKILLFORGE_TRANSLATION_BATCH_CHARS", "6000"))
+TRANSLATABLE_FIELDS = (
+    "content",
+    "title",
+    "description",
+    "prompt",
+    "front",
+    "back",
+    "question",
+    "explanation",
+    "text",
+    "subtopic",
+)
+translation_cache = ContentCache("translations")
+translation_flight = SingleFlight("translation")
+
+
+def _get_lang_name(code: str) -> str:
+    mapping = {"en": "English", "es": "Spanish (Español)"}
+    return mapping.get(code, "English")
+
+
+def content_hash(value: Any) -> str:
+    payload = json.dumps(value, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _collect_strings(value: Any, out: list[str]):
+    """Appends the translatable strings of `value` to `out` in walk order."""
+    if isinstance(value, dict):
+        for key, item in value.items():
+            if key in TRANSLATABLE_FIELDS and isinstance(item, str):
+                out.append(item)
+            elif isinstance(item, (dict, list)):
+                _collect_strings(item, out)
+    elif isinstance(value, list):
+        for item in value:
+            if isinstance(item, (dict, list)):
+                _collect_strings(item, out)
+
+
+def _replace_strings(value: Any, strings) -> Any:
+    """Rebuilds `value` taking translated strings from the iterator in walk order."""
+    if isinstance(value, dict):
+        rebuilt = {}
+        for key, item in value.items():
+            if key in TRANSLATABLE_FIELDS and isinstance(item, str):
+                rebuilt[key] = next(strings)
+            elif isinstance(item, (dict, list)):
+                rebuilt[key] = _replace_strings(item, strings)
+            else:
+                rebuilt[key] = item
+        return rebuilt
+    if isinstance(value, list):
+        return [
+            _replace_strings(item, strings) if isinstance(item, (dict, list)) else item
+            for item in value
+        ]
+    return value
+
+
+def _unit_strings(unit: Any) -> list[str]:
+    if isinstance(unit, str):
+        return [unit]
+    strings: list[str] = []
+    _collect_strings(unit, strings)
+    return strings
+
+
+def _rebuild_unit(unit: Any, strings: list[str]) -> Any:
+    if isinstance(unit, str):
+        return strings[0]
+    return _replace_strings(unit, iter(strings))
+
+
+async def _translate_strings(
+    strings: list[str], language: str
+) -> list[str | None]:
+    """
+    Translates a batch of strings in one request. Strings the model drops or
+    mangles come back as None.
+    """
+    client = get_client()
+    lang_name = _get_lang_name(language)
+    payload = json.dumps(
+        {"strings": {str(i): s for i, s in enumerate(strings)}}, ensure_ascii=False
+    )
+    prompt = f"\n    Translate every value in the 'strings' object below into {lang_name}.\n    Keep the same keys. Preserve Markdown formatting, code blocks, inline code, identifiers and placeholders in braces exactly as they are.\n    Leave unchanged any words or sentences that are themselves the subject being taught, such as vocabulary of a foreign language the learner is studying.\n\n    Return a JSON object with a single key 'strings' mapping each key to its translation.\n\n    {payload}\n    "
+    response = await client.chat.completions.create(
+        model=MODEL,
+        messages=[
+            {
+                "role": "system",
+                "content": "You are a professional translator of educational material. You always output valid JSON objects.",
+            },
+            {"role": "user", "content": prompt},
+        ],
+        response_format={"type": "json_object"},
+        temperature=0.2,
+    )
+    translated = json.loads(response.choices[0].message.content).get("strings", {})
+    return [
+        value if isinstance(value := translated.get(str(i)), str) and value else None
+        for i in range(len(strings))
+    ]
+
+
+def _batches(units: list[tuple[str, list[str]]]) -> list[list[tuple[str, list[str]]]]:
+    """Groups units so each request carries about TRANSLATION_BATCH_CHARS."""
+    batches: list[list[tuple[str, list[str]]]] = []
+    size = 0
+    for unit in units:
+        unit_size = sum(len(s) for s in unit[1])
+        if not batches or size + unit_size > TRANSLATION_BATCH_CHARS:
+            batches.append([])
+            size = 0
+        batches[-1].append(unit)
+        size += unit_size
+    return batches
+
+
+async def _translate_batch(
+    batch: list[tuple[str, list[str]]], language: str
+) -> dict[str, list[str]]:
+    strings = [s for _, unit_strings in batch for s in unit_strings]
+    flight_key = make_cache_key([key for key, _ in batch], language)
+    try:
+        translated = await translation_flight.do(
+            flight_key, lambda: _translate_strings(strings, language)
+        )
+    except Exception as e:
+        logging.exception(f"Error translating content: {e}")
+        return {}
+    results = {}
+    offset = 0
+    for key, unit_strings in batch:
+        unit_translated = translated[offset : offset + len(unit_strings)]
+        offset += len(unit_strings)
+        if None in unit_translated:
+            # Fall back to the canonical text for this request only, so the
+            # unit is translated again next time instead of cached as is.
+            results[key] = [
+                value if value is not None else s
+                for value, s in zip(unit_translated, unit_strings)
+            ]
+            continue
+        results[key] = unit_translated
+        await translation_cache.set(key, unit_translated)
+    return results
+
+
+async def translate_content(value: Any, language: str) -> Any:
+    """
+    Derives `value` in `language` from its canonical-language version.
+    Only user-facing text fields are translated, so ids, `correct_id`,
+    difficulties and expected answers stay as they are. A list is translated
+    item by item and each item is cached by (content hash, language), so the
+    same question reused in another section or quiz pool is never translated
+    twice; uncached items are sent in a few batched requests. Anything that
+    fails to translate is returned in the canonical language, uncached, so
+    it is retried on the next request.
+    """
+    if language == CANONICAL_LANGUAGE or not value:
+        return value
+    units = value if isinstance(value, list) else [value]
+    translated: list[list[str] | None] = []
+    missing: dict[str, list[str]] = {}
+    keys = []
+    for unit in units:
+        strings = _unit_strings(unit)
+        key = make_cache_key(
+            content_hash(strings), language, MODEL, TRANSLATION_PROMPT_VERSION
+        )
+        keys.append(key)
+        cached = await translation_cache.get(key) if strings else strings
+        if cached is None or len(cached) != len(strings):
+            missing[key] = strings
+        translated.append(cached)
+    if missing:
+        results: dict[str, list[str]] = {}
+        for batch_results in await asyncio.gather(
+            *(
+                _translate_batch(batch, language)
+                for batch in _batches(list(missing.items()))
+            )
+        ):
+            results.update(batch_results)
+        translated = [
+            results.get(key, missing[key]) if key in missing else strings
+            for key, strings in zip(keys, translated)
+        ]
+    rebuilt = [
+        _rebuild_unit(unit, strings) for unit, strings in zip(units, translated)
+    ]
+    return rebuilt if isinstance(value, list) else rebuilt[0]
+
+
+async def translate_curriculum(modules: list[dict], language: str) -> list[dict]:
+    """
+    Translates a canonical-language curriculum. Each module keeps its
+    canonical title in `source_title`; module content is generated and
+    cached under that title, so it is shared by learners in every language.
+    """
+    translated = await translate_content(modules, language)
+    if not isinstance(translated, list):
+        return translated
+    return [
+        {**module, "source_title": source.get("title", "")}
+        for module, source in zip(translated, modules)
+    ]
@@ -1,33 +1,34 @@
-import os
 import logging
-from openai import AsyncOpenAI
+from typing import AsyncIterator
+from app.services.openai_client import get_client
+from app.services.retrieval import select_context
+from app.services.conversation_memory import history_window
+from app.services.metrics import record_llm_usage
 
 MODEL = "gpt-4o-mini"
+FALLBACK_RESPONSE = "I'm having trouble connecting to my knowledge base right now. Please try again in a moment."
 
 
-def _get_client() -> AsyncOpenAI:
-    """Lazily initialize the OpenAI client."""
-    return AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+def _get_lang_name(language: str) -> str:
+    return "English" if language == "en" else "Spanish (Español)"
 
 
-async def generate_tutor_response(
-    message: str, context: dict, style: str, language: str = "en"
-) -> str:
-    """
-    Generates a contextual response from the AI Tutor based on the user's current learning state.
-    """
-    client = _get_client()
-    lang_name = "English" if language == "en" else "Spanish (Español)"
+def _build_prompt_messages(
+    message: str,
+    context: dict,
+    style: str,
+    language: str,
+    history: list[dict] | None = None,
+    summary: str = "",
+) -> list[dict]:
+    lang_name = _get_lang_name(language)
     style_instructions = {
         "simple": "Explain simply, like I am a beginner. Avoid complex jargon. Use analogies.",
         "example": "Focus on providing concrete examples, code snippets, or practical scenarios to illustrate the point.",
         "advanced": "Provide a technical deep dive. Discuss memory implications, performance, or edge cases. Assume I know the basics.",
     }
-    system_prompt = f"\n    You are an AI Tutor for a personalized learning platform called SkillForge.\n    Respond in {lang_name}. The user is learning in {lang_name}.\n    Your goal is to help the user master the topic: {context.get('topic', 'General')}.\n    \n    Current Context:\n    - Active Module: {context.get('module_title', 'Unknown')}\n    - User Level: {context.get('user_level', 'Beginner')}\n    - Known Weaknesses: {', '.join(context.get('weaknesses', []))}\n    - Recent Quiz Performance: {context.get('quiz_performance', 'N/A')}\n    \n    Response Style: {style.upper()}\n    {style_instructions.get(style, '')}\n    \n    The user is currently looking at this content:\n    "
-    module_content = context.get("module_content", "")
-    excerpt = (
-        module_content[:2000] + "..." if len(module_content) > 2000 else module_content
-    )
+    system_prompt = f"\n    You are an AI Tutor for a personalized learning platform called SkillForge.\n    Respond in {lang_name}. The user is learning in {lang_name}.\n    Your goal is to help the user master the topic: {context.get('topic', 'General')}.\n    \n    Current Context:\n    - Active Module: {context.get('module_title', 'Unknown')}\n    - User Level: {context.get('user_level', 'Beginner')}\n    - Known Weaknesses: {', '.join(context.get('weaknesses', []))}\n    - Recent Quiz Performance: {context.get('quiz_performance', 'N/A')}\n    \n    Response Style: {style.upper()}\n    {style_instructions.get(style, '')}\n    \n    The user is currently looking at this content (the lesson sections most relevant to their question):\n    "
+    excerpt = select_context(context.get("module_content", ""), message)
     prompt_messages = [
         {
             "role": "system",
@@ -36,13 +37,89 @@ async def generate_tutor_response(
 """
             + excerpt,
         },
+        *history_window(summary, history or []),
         {"role": "user", "content": message},
     ]
+    return prompt_messages
+
+
+def exchange_turns(message: str, reply: str) -> list[dict]:
+    """
+    Turns to keep in the tutor's memory for one exchange. The reply is left
+    out when streaming failed, so the model never sees the fallback message as
+    something it said.
+    """
+    turns = [{"role": "user", "content": message}]
+    if reply and reply != FALLBACK_RESPONSE:
+        turns.append({"role": "assistant", "content": reply})
+    return turns
+
+
+async def stream_tutor_response(
+    message: str,
+    context: dict,
+    style: str,
+    language: str = "en",
+    history: list[dict] | None = None,
+    summary: str = "",
+) -> AsyncIterator[str]:
+    """
+    Streams the AI Tutor's response as text deltas as soon as the model produces them.
+    Yields the fallback message if the request fails before any text arrives.
+    """
+    client = get_client()
+    prompt_messages = _build_prompt_messages(
+        message, context, style, language, history, summary
+    )
+    has_output = False
+    try:
+        stream = await client.chat.completions.create(
+            model=MODEL,
+            messages=prompt_messages,
+            temperature=0.7,
+            stream=True,
+            stream_options={"include_usage": True},
+        )
+        async for chunk in stream:
+            if getattr(chunk, "usage", None):
+                record_llm_usage(MODEL, chunk.usage)
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                has_output = True
+                yield delta
+    except Exception as e:
+        logging.exception(f"Error streaming tutor response: {e}")
+        if not has_output:
+            yield FALLBACK_RESPONSE
+
+
+async def summarize_conversation(
+    previous_summary: str, messages: list[dict], language: str = "en"
+) -> str | None:
+    """
+    Folds older chat messages into the rolling conversation summary.
+    Only the new messages and the previous summary are sent, so the cost of
+    each refresh stays constant as the conversation grows. Returns None when
+    the summary could not be produced.
+    """
+    client = get_client()
+    transcript = "\n".join(f"{m['role']}: {m['content']}" for m in messages)
+    prompt = f"\n    Update the running summary of a tutoring conversation.\n    Write the summary in {_get_lang_name(language)}, in at most 120 words.\n    Keep what the learner asked, what they struggled with and what was already explained.\n\n    Current summary:\n    {previous_summary or '(none)'}\n\n    New messages:\n    {transcript}\n    "
     try:
         response = await client.chat.completions.create(
-            model=MODEL, messages=prompt_messages, temperature=0.7
+            model=MODEL,
+            messages=[
+                {
+                    "role": "system",
+                    "content": "You maintain concise summaries of tutoring conversations.",
+                },
+                {"role": "user", "content": prompt},
+            ],
+            temperature=0.3,
         )
-        return response.choices[0].message.content
+        return response.choices[0].message.content.strip() or None
     except Exception as e:
-        logging.exception(f"Error generating tutor response: {e}")
-        return "I'm having trouble connecting to my knowledge base right now. Please try again in a moment."
\ No newline at end of file
+        logging.exception(f"Error summarizing tutor conversation: {e}")
+        return None
@@ -1,12 +1,30 @@
 import reflex as rx
 from reflex_google_auth import GoogleAuthState
-from typing import Any
-import json
+from app.services.progress_store import get_progress_writer, serialize_section
+from app.services.metrics import instrumented
 
+PROGRESS_FIELDS = {
+    "course": (
+        "course_topic",
+        "course_title",
+        "course_description",
+        "current_level",
+        "modules",
+    ),
+    "diagnostic": (
+        "overall_score",
+        "proficiency_level",
+        "strengths",
+        "weaknesses",
+        "recommended_focus",
+    ),
+    "stats": ("xp_total", "current_streak", "badges"),
+    "reviews": ("review_items",),
+    "lab": ("current_module_id", "quiz_rating", "quiz_rating_answers"),
+}
 
-class AuthState(GoogleAuthState):
-    user_data_store: dict[str, dict[str, str | int | list | dict]] = {}
 
+class AuthState(GoogleAuthState):
     @rx.var
     def is_authenticated(self) -> bool:
         return True
@@ -31,6 +49,7 @@ class AuthState(GoogleAuthState):
         return AuthState.load_user_progress()
 
     @rx.event
+    @instrumented
     async def save_user_progress(self):
         if not self.is_authenticated:
             return
@@ -40,41 +59,33 @@ class AuthState(GoogleAuthState):
         from app.states.review import ReviewState
         from app.states.lab import LabState
 
-        courses = await self.get_state(CourseState)
-        diagnostic = await self.get_state(DiagnosticState)
-        stats = await self.get_state(UserStatsState)
-        review = await self.get_state(ReviewState)
-        lab = await self.get_state(LabState)
-        user_data = {
-            "course_topic": courses.course_topic,
-            "course_title": courses.course_title,
-            "course_description": courses.course_description,
-            "current_level": courses.current_level,
-            "modules": courses.modules,
-            "diagnostic_results": {
-                "overall_score": diagnostic.overall_score,
-                "proficiency_level": diagnostic.proficiency_level,
-                "strengths": diagnostic.strengths,
-                "weaknesses": diagnostic.weaknesses,
-                "recommended_focus": diagnostic.recommended_focus,
-            },
-            "xp_total": stats.xp_total,
-            "current_streak": stats.current_streak,
-            "badges": stats.badges,
-            "review_items": review.review_items,
-            "current_module_id": lab.current_module_id,
+        owners = {
+            "course": await self.get_state(CourseState),
+            "diagnostic": await self.get_state(DiagnosticState),
+            "stats": await self.get_state(UserStatsState),
+            "reviews": await self.get_state(ReviewState),
+            "lab": await self.get_state(LabState),
         }
-        self.user_data_store[self.current_user_email] = user_data
+        serialized = {}
+        for section, state in owners.items():
+            if not state._progress_dirty:
+                continue
+            serialized[section] = serialize_section(
+                {name: getattr(state, name) for name in PROGRESS_FIELDS[section]}
+            )
+            state._progress_dirty = False
+        if not get_progress_writer().enqueue(self.current_user_email, serialized):
+            return
         yield rx.toast("Progress saved!", duration=2000)
 
     @rx.event
+    @instrumented
     async def load_user_progress(self):
         if not self.is_authenticated:
             return
-        email = self.current_user_email
-        if email not in self.user_data_store:
+        sections = await get_progress_writer().load(self.current_user_email)
+        if not sections:
             return
-        data = self.user_data_store[email]
         from app.states.courses import CourseState
         from app.states.diagnostic import DiagnosticState
         from app.states.user_stats import UserStatsState
@@ -88,26 +99,34 @@ class AuthState(GoogleAuthState):
         review = await self.get_state(ReviewState)
         lab = await self.get_state(LabState)
         nav = await self.get_state(NavState)
-        courses.course_topic = data.get("course_topic", "")
-        courses.course_title = data.get(
+        course_data = sections.get("course", {})
+        courses.course_topic = course_data.get("course_topic", "")
+        courses.course_title = course_data.get(
             "course_title", "Introduction to Systems Programming"
         )
-        courses.course_description = data.get(
+        courses.course_description = course_data.get(
             "course_description", "Master the fundamentals..."
         )
-        courses.current_level = data.get("current_level", "Beginner")
-        courses.modules = data.get("modules", courses.modules)
-        diag_data = data.get("diagnostic_results", {})
+        courses.current_level = course_data.get("current_level", "Beginner")
+        courses.modules = course_data.get("modules", courses.modules)
+        diag_data = sections.get("diagnostic", {})
         diagnostic.overall_score = diag_data.get("overall_score", 0)
         diagnostic.proficiency_level = diag_data.get("proficiency_level", "")
         diagnostic.strengths = diag_data.get("strengths", [])
         diagnostic.weaknesses = diag_data.get("weaknesses", [])
         diagnostic.recommended_focus = diag_data.get("recommended_focus", "")
-        stats.xp_total = data.get("xp_total", 1250)
-        stats.current_streak = data.get("current_streak", 4)
-        stats.badges = data.get("badges", stats.badges)
-        review.review_items = data.get("review_items", [])
-        lab.current_module_id = data.get("current_module_id", "")
+        stats_data = sections.get("stats", {})
+        stats.xp_total = stats_data.get("xp_total", 1250)
+        stats.current_streak = stats_data.get("current_streak", 4)
+        stats.badges = stats_data.get("badges", stats.badges)
+        review.review_items = sections.get("reviews", {}).get("review_items", [])
+        review._rebuild_due_index()
+        lab_data = sections.get("lab", {})
+        lab.current_module_id = lab_data.get("current_module_id", "")
+        lab.quiz_rating = lab_data.get("quiz_rating", 0.0)
+        lab.quiz_rating_answers = lab_data.get("quiz_rating_answers", 0)
+        for state in (courses, diagnostic, stats, review, lab):
+            state._progress_dirty = False
         if courses.course_topic:
             nav.current_page = "courses"
         yield rx.toast(f"Welcome back, {AuthState.current_user_name}! Progress loaded.")
\ No newline at end of file
@@ -1,6 +1,7 @@
 import reflex as rx
 from typing import TypedDict
 from app.states.navigation import NavState
+from app.services.metrics import instrumented
 
 
 class ModuleInfo(TypedDict):
@@ -9,6 +10,12 @@ class ModuleInfo(TypedDict):
     description: str
     status: str
     progress: int
+    source_title: str
+
+
+def module_source_title(module: ModuleInfo) -> str:
+    """The canonical-language title the module's content is generated under."""
+    return module.get("source_title") or module["title"]
 
 
 class CourseState(rx.State):
@@ -16,6 +23,7 @@ class CourseState(rx.State):
     course_title: str = "Introduction to Systems Programming"
     course_description: str = "Master the fundamentals of low-level programming, memory management, and concurrency using Rust and C++."
     current_level: str = "Beginner"
+    _progress_dirty: bool = False
     level_progression: list[str] = [
         "Beginner",
         "Intermediate",
@@ -101,29 +109,35 @@ class CourseState(rx.State):
             return "Intermediate"
 
     @rx.event
+    @instrumented
     async def action_module(self, module_id: str, status: str):
         if status == "locked":
             yield rx.toast(
                 "This module is locked. Complete previous modules first!", duration=3000
             )
         else:
-            module_title = next(
-                (m["title"] for m in self.modules if m["id"] == module_id),
-                "Unknown Module",
+            module = next(
+                (m for m in self.modules if m["id"] == module_id),
+                {"id": module_id, "title": "Unknown Module"},
             )
             from app.states.lab import LabState
 
             lab = await self.get_state(LabState)
             lab.is_loading = True
             lab.current_module_id = module_id
+            lab._progress_dirty = True
             nav = await self.get_state(NavState)
             nav.current_page = "lab"
             async for update in lab.load_module_content(
-                self.course_topic, module_title, module_id
+                self.course_topic,
+                module_source_title(module),
+                module_id,
+                module["title"],
             ):
                 yield update
 
     @rx.event
+    @instrumented
     async def mark_module_completed(self, module_id: str):
         for i, module in enumerate(self.modules):
             if module["id"] == module_id:
@@ -132,6 +146,7 @@ class CourseState(rx.State):
                 if i + 1 < len(self.modules):
                     if self.modules[i + 1]["status"] == "locked":
                         self.modules[i + 1]["status"] = "active"
+                self._progress_dirty = True
                 break
         from app.states.auth import AuthState
 
@@ -144,6 +159,7 @@ class CourseState(rx.State):
             self.show_level_up_modal = True
 
     @rx.event
+    @instrumented
     async def start_level_up(self):
         self.show_level_up_modal = False
         from app.states.diagnostic import DiagnosticState
@@ -167,6 +183,7 @@ class CourseState(rx.State):
             idx = self.level_progression.index(self.current_level)
             if idx + 1 < len(self.level_progression):
                 self.current_level = self.level_progression[idx + 1]
+                self._progress_dirty = True
         except ValueError:
             pass
         self.show_level_up_modal = False
\ No newline at end of file
@@ -2,9 +2,23 @@ import reflex as rx
 from typing import TypedDict, Optional
 from app.services.diagnostic_generator import (
     generate_diagnostic_questions,
-    analyze_diagnostic_results,
+    phrase_recommended_focus,
     generate_adaptive_curriculum,
 )
+from app.services.diagnostic_scoring import canonical_subtopics, score_diagnostic
+from app.services.translation import CANONICAL_LANGUAGE
+from app.services.question_bank import get_question_bank
+from app.services.adaptive_testing import (
+    PRIOR_SE,
+    CAT_MAX_ITEMS,
+    item_location,
+    estimate_ability,
+    select_next_item,
+    should_stop,
+    progress_fraction,
+)
+from app.services.prefetch import cancel_session_prefetches
+from app.services.metrics import instrumented
 from app.states.i18n import I18nState
 import logging
 
@@ -22,6 +36,7 @@ class DiagnosticQuestion(TypedDict):
     options: list[DiagnosticOption]
     correct_id: str
     explanation: str
+    source_subtopic: str
 
 
 class UserAnswer(TypedDict):
@@ -43,6 +58,11 @@ class DiagnosticState(rx.State):
     strengths: list[str] = []
     weaknesses: list[str] = []
     recommended_focus: str = ""
+    max_questions: int = 0
+    ability_estimate: float = 0.0
+    ability_se: float = PRIOR_SE
+    _item_bank: list[dict] = []
+    _progress_dirty: bool = False
 
     @rx.var
     def current_question(self) -> DiagnosticQuestion:
@@ -55,30 +75,57 @@ class DiagnosticState(rx.State):
                 "options": [],
                 "correct_id": "",
                 "explanation": "",
+                "source_subtopic": "",
             }
         return self.questions[self.current_question_index]
 
     @rx.var
     def progress(self) -> int:
-        if not self.questions:
-            return 0
-        return int(self.current_question_index / len(self.questions) * 100)
+        return int(progress_fraction(len(self.user_answers), self.ability_se) * 100)
 
     @rx.var
     def total_questions(self) -> int:
-        return len(self.questions)
+        return self.max_questions
 
-    @rx.event
-    async def start_diagnostic(self, topic: str, language: str = "en"):
-        self.topic = topic
-        self.is_loading = True
+    def _reset_adaptive_test(self):
         self.questions = []
         self.user_answers = []
         self.current_question_index = 0
         self.is_complete = False
+        self._item_bank = []
+        self.max_questions = 0
+        self.ability_estimate = 0.0
+        self.ability_se = PRIOR_SE
+
+    def _begin_adaptive_test(self, bank: list[dict]):
+        self._item_bank = bank
+        self.max_questions = min(CAT_MAX_ITEMS, len(bank))
+        self._ask_next_question()
+
+    def _ask_next_question(self) -> bool:
+        """Appends the most informative unasked item from the bank."""
+        item = select_next_item(
+            self._item_bank,
+            {q["id"] for q in self.questions},
+            self.ability_estimate,
+            [q.get("subtopic", "") for q in self.questions],
+        )
+        if item is None:
+            return False
+        self.questions.append(item)
+        self.current_question_index = len(self.questions) - 1
+        return True
+
+    @rx.event
+    @instrumented
+    async def start_diagnostic(self, topic: str, language: str = "en"):
+        self.topic = topic
+        self.is_loading = True
+        self._reset_adaptive_test()
         yield
         try:
-            self.questions = await generate_diagnostic_questions(topic, language)
+            bank = await generate_diagnostic_questions(topic, language)
+            self._begin_adaptive_test(await get_question_bank().calibrate(bank))
         except Exception as e:
             logging.exception("Failed to start diagnostic")
             yield rx.toast("Error generating diagnostic questions.")
@@ -86,8 +133,9 @@ class DiagnosticState(rx.State):
             self.is_loading = False
 
     @rx.event
-    def answer_question(self, option_id: str):
-        if not self.questions:
+    @instrumented
+    async def answer_question(self, option_id: str):
+        if not self.questions or len(self.user_answers) >= len(self.questions):
             return
         current_q = self.questions[self.current_question_index]
         is_correct = option_id == current_q["correct_id"]
@@ -98,54 +146,89 @@ class DiagnosticState(rx.State):
                 "is_correct": is_correct,
             }
         )
-        if self.current_question_index < len(self.questions) - 1:
-            self.current_question_index += 1
-        else:
+        await get_question_bank().record_response(current_q["id"], is_correct)
+        self.ability_estimate, self.ability_se = estimate_ability(
+            [
+                (item_location(q), a["is_correct"])
+                for q, a in zip(self.questions, self.user_answers)
+            ]
+        )
+        if should_stop(
+            len(self.user_answers), self.ability_se, len(self._item_bank)
+        ) or not self._ask_next_question():
             return DiagnosticState.complete_diagnostic
 
     @rx.event
+    @instrumented
     async def complete_diagnostic(self):
-        self.is_loading = True
-        yield
         try:
             i18n = await self.get_state(I18nState)
-            results = await analyze_diagnostic_results(
-                self.questions, self.user_answers, i18n.current_language
-            )
-            self.overall_score = results.get("overall_score", 0)
-            self.proficiency_level = results.get("proficiency_level", "Beginner")
-            self.strengths = results.get("strengths", [])
-            self.weaknesses = results.get("weaknesses", [])
-            self.recommended_focus = results.get(
-                "recommended_focus", "Start learning basics."
+            results = score_diagnostic(
+                self.questions,
+                self.user_answers,
+                i18n.current_language,
+                self.ability_estimate,
             )
+            self.overall_score = results["overall_score"]
+            self.proficiency_level = results["proficiency_level"]
+            self.strengths = results["strengths"]
+            self.weaknesses = results["weaknesses"]
+            self.recommended_focus = results["recommended_focus"]
+            self._progress_dirty = True
             self.is_complete = True
             from app.states.auth import AuthState
 
             yield AuthState.save_user_progress
+            yield DiagnosticState.refine_recommended_focus
         except Exception as e:
             logging.exception("Error completing diagnostic")
             yield rx.toast("Error analyzing results.")
-        finally:
-            self.is_loading = False
 
-    @rx.event
-    async def generate_personalized_path(self):
-        self.is_loading = True
-        yield rx.toast("Designing your personalized curriculum...", duration=3000)
-        try:
-            analysis_data = {
+    @rx.event(background=True)
+    @instrumented
+    async def refine_recommended_focus(self):
+        async with self:
+            results = {
                 "overall_score": self.overall_score,
                 "proficiency_level": self.proficiency_level,
                 "strengths": self.strengths,
                 "weaknesses": self.weaknesses,
                 "recommended_focus": self.recommended_focus,
             }
+            topic = self.topic
+            i18n = await self.get_state(I18nState)
+            language = i18n.current_language
+        focus = await phrase_recommended_focus(topic, results, language)
+        async with self:
+            if (
+                focus == results["recommended_focus"]
+                or self.recommended_focus != results["recommended_focus"]
+            ):
+                return
+            self.recommended_focus = focus
+            self._progress_dirty = True
+        from app.states.auth import AuthState
+
+        yield AuthState.save_user_progress
+
+    @rx.event
+    @instrumented
+    async def generate_personalized_path(self):
+        self.is_loading = True
+        yield rx.toast("Designing your personalized curriculum...", duration=3000)
+        try:
+            analysis_data = score_diagnostic(
+                canonical_subtopics(self.questions),
+                self.user_answers,
+                CANONICAL_LANGUAGE,
+                self.ability_estimate,
+            )
             i18n = await self.get_state(I18nState)
             from app.states.courses import CourseState
             from app.states.navigation import NavState
 
             courses = await self.get_state(CourseState)
+            cancel_session_prefetches(self.router.session.client_token)
             courses.advance_to_next_level()
             modules = await generate_adaptive_curriculum(
                 self.topic, analysis_data, i18n.current_language, courses.current_level
@@ -155,6 +238,7 @@ class DiagnosticState(rx.State):
             courses.course_description = self.recommended_focus
             if modules:
                 courses.modules = modules
+            courses._progress_dirty = True
             nav = await self.get_state(NavState)
             nav.current_page = "courses"
         except Exception as e:
@@ -164,21 +248,20 @@ class DiagnosticState(rx.State):
             self.is_loading = False
 
     @rx.event
+    @instrumented
     async def start_level_up_diagnostic(
         self, topic: str, current_level: str, target_level: str, language: str = "en"
     ):
         self.topic = topic
         self.target_level = target_level
         self.is_loading = True
-        self.questions = []
-        self.user_answers = []
-        self.current_question_index = 0
-        self.is_complete = False
+        self._reset_adaptive_test()
         yield
         try:
-            self.questions = await generate_diagnostic_questions(
+            bank = await generate_diagnostic_questions(
                 topic, language, current_level, target_level
             )
+            self._begin_adaptive_test(await get_question_bank().calibrate(bank))
         except Exception as e:
             logging.exception("Failed to start level up diagnostic")
             yield rx.toast("Error generating assessment.")
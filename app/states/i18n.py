@@ -1,188 +1,209 @@
 import reflex as rx
 
+DEFAULT_LANGUAGE = "en"
+AVAILABLE_LANGUAGES: list[dict[str, str]] = [
+    {"code": "en", "name": "English", "flag": "🇺🇸"},
+    {"code": "es", "name": "Español", "flag": "🇪🇸"},
+]
+TRANSLATIONS: dict[str, dict[str, str]] = {
+    "en": {
+        "landing.hero_title": "Master Any Skill with AI-Powered Learning",
+        "landing.hero_subtitle": "Personalized curriculum, adaptive quizzes, and an always-available AI tutor. Start your learning journey today.",
+        "landing.feature_adaptive_title": "Adaptive Learning",
+        "landing.feature_adaptive_desc": "Curriculum that evolves with your skills and fills knowledge gaps.",
+        "landing.feature_tutor_title": "AI Tutor",
+        "landing.feature_tutor_desc": "Get instant, context-aware help whenever you get stuck.",
+        "landing.feature_quiz_title": "Smart Quizzes",
+        "landing.feature_quiz_desc": "Dynamic difficulty adjustment to keep you challenged.",
+        "landing.feature_progress_title": "Progress Tracking",
+        "landing.feature_progress_desc": "Visual analytics to track your streak, XP, and mastery.",
+        "landing.sign_in": "Sign in with Google",
+        "nav.explore": "Explore",
+        "nav.courses": "My Courses",
+        "nav.lab": "Active Lab",
+        "nav.reviews": "Reviews",
+        "nav.settings": "Settings",
+        "nav.menu": "MENU",
+        "onboarding.title": "What do you want to learn today?",
+        "onboarding.placeholder": "Master Rust, learn Neural Networks, or explore AWS...",
+        "onboarding.skill_question": "Great! Let's get you started. To personalize your learning path, how much experience do you have with this topic?",
+        "onboarding.beginner": "Beginner",
+        "onboarding.intermediate": "Intermediate",
+        "onboarding.advanced": "Advanced",
+        "onboarding.preparing": "Preparing your diagnostic assessment...",
+        "onboarding.generating_questions": "We are generating questions to test your knowledge of {topic}",
+        "course.progress": "Course Progress",
+        "course.completed": "COMPLETED",
+        "course.locked": "LOCKED",
+        "course.active": "ACTIVE",
+        "course.modules_completed": "{completed} of {total} Modules Completed",
+        "course.start_learning": "Start Learning",
+        "course.review_module": "Review Module",
+        "lab.active_module": "Active Module",
+        "lab.next_module": "Next Module",
+        "lab.editor": "Editor",
+        "lab.terminal": "Terminal",
+        "lab.quiz": "Quiz",
+        "lab.practice": "Practice",
+        "lab.flashcards": "Flashcards",
+        "lab.run_code": "Run Code",
+        "lab.check_answer": "Check Answer",
+        "lab.submit_answer": "Submit Answer",
+        "lab.next_question": "Next Question",
+        "lab.term": "TERM",
+        "lab.definition": "DEFINITION",
+        "quiz.correct": "Correct!",
+        "quiz.incorrect": "Not quite.",
+        "quiz.score": "Score",
+        "quiz.explanation": "Explanation",
+        "quiz.review_material": "Review Lesson Material",
+        "review.due_for_review": "{count} Concepts Due for Review",
+        "review.start_session": "Start Review Session",
+        "review.all_caught_up": "All Caught Up!",
+        "review.click_to_reveal": "Click card to reveal definition",
+        "review.again": "Again",
+        "review.hard": "Hard",
+        "review.good": "Good",
+        "review.easy": "Easy",
+        "review.how_well": "How well did you know this?",
+        "tutor.ai_coach": "AI Coach",
+        "tutor.context_help": "Context-Aware Help",
+        "tutor.simple": "Simple",
+        "tutor.example": "Example",
+        "tutor.advanced": "Deep Dive",
+        "tutor.ask_placeholder": "Ask about this module...",
+        "stats.day_streak": "Day Streak",
+        "stats.next_level": "Next level",
+        "stats.xp": "XP",
+        "common.loading": "Loading...",
+        "common.error": "Error",
+        "common.success": "Success",
+        "diagnostic.complete": "Assessment Complete",
+        "diagnostic.analyzed": "We've analyzed your skills in {topic}.",
+        "diagnostic.strengths": "Strengths",
+        "diagnostic.focus_areas": "Focus Areas",
+        "diagnostic.recommendation": "Our Recommendation",
+        "diagnostic.generate": "Generate Personalized Course",
+        "course.level_complete": "Congratulations! You've mastered {level} {topic}!",
+        "course.ready_advance": "Ready to advance to {next_level}?",
+        "course.take_assessment": "Take Advancement Assessment",
+        "course.stay_current": "Stay at Current Level",
+    },
+    "es": {
+        "landing.hero_title": "Domina Cualquier Habilidad con Aprendizaje Impulsado por IA",
+        "landing.hero_subtitle": "Currículum personalizado, cuestionarios adaptativos y un tutor de IA siempre disponible. Comienza tu viaje de aprendizaje hoy.",
+        "landing.feature_adaptive_title": "Aprendizaje Adaptativo",
+        "landing.feature_adaptive_desc": "Currículum que evoluciona con tus habilidades y llena vacíos de conocimiento.",
+        "landing.feature_tutor_title": "Tutor IA",
+        "landing.feature_tutor_desc": "Obtén ayuda instantánea y contextual cuando te atasques.",
+        "landing.feature_quiz_title": "Cuestionarios Inteligentes",
+        "landing.feature_quiz_desc": "Ajuste dinámico de dificultad para mantenerte desafiado.",
+        "landing.feature_progress_title": "Seguimiento de Progreso",
+        "landing.feature_progress_desc": "Analíticas visuales para seguir tu racha, XP y dominio.",
+        "landing.sign_in": "Iniciar sesión con Google",
+        "nav.explore": "Explorar",
+        "nav.courses": "Mis Cursos",
+        "nav.lab": "Laboratorio",
+        "nav.reviews": "Repasos",
+        "nav.settings": "Ajustes",
+        "nav.menu": "MENÚ",
+        "onboarding.title": "¿Qué quieres aprender hoy?",
+        "onboarding.placeholder": "Domina Rust, aprende Redes Neuronales o explora AWS...",
+        "onboarding.skill_question": "¡Genial! Empecemos. Para personalizar tu ruta de aprendizaje, ¿cuánta experiencia tienes en este tema?",
+        "onboarding.beginner": "Principiante",
+        "onboarding.intermediate": "Intermedio",
+        "onboarding.advanced": "Avanzado",
+        "onboarding.preparing": "Preparando tu evaluación diagnóstica...",
+        "onboarding.generating_questions": "Estamos generando preguntas para probar tus conocimientos sobre {topic}",
+        "course.progress": "Progreso del Curso",
+        "course.completed": "COMPLETADO",
+        "course.locked": "BLOQUEADO",
+        "course.active": "ACTIVO",
+        "course.modules_completed": "{completed} de {total} Módulos Completados",
+        "course.start_learning": "Empezar a Aprender",
+        "course.review_module": "Repasar Módulo",
+        "lab.active_module": "Módulo Activo",
+        "lab.next_module": "Siguiente Módulo",
+        "lab.editor": "Editor",
+        "lab.terminal": "Terminal",
+        "lab.quiz": "Cuestionario",
+        "lab.practice": "Práctica",
+        "lab.flashcards": "Tarjetas",
+        "lab.run_code": "Ejecutar",
+        "lab.check_answer": "Comprobar",
+        "lab.submit_answer": "Enviar Respuesta",
+        "lab.next_question": "Siguiente Pregunta",
+        "lab.term": "TÉRMINO",
+        "lab.definition": "DEFINICIÓN",
+        "quiz.correct": "¡Correcto!",
+        "quiz.incorrect": "No del todo.",
+        "quiz.score": "Puntuación",
+        "quiz.explanation": "Explicación",
+        "quiz.review_material": "Repasar Material de la Lección",
+        "review.due_for_review": "{count} Conceptos por Repasar",
+        "review.start_session": "Iniciar Sesión de Repaso",
+        "review.all_caught_up": "¡Todo al día!",
+        "review.click_to_reveal": "Haz clic para revelar la definición",
+        "review.again": "Otra vez",
+        "review.hard": "Difícil",
+        "review.good": "Bien",
+        "review.easy": "Fácil",
+        "review.how_well": "¿Qué tan bien lo sabías?",
+        "tutor.ai_coach": "Entrenador IA",
+        "tutor.context_help": "Ayuda Contextual",
+        "tutor.simple": "Simple",
+        "tutor.example": "Ejemplo",
+        "tutor.advanced": "A Fondo",
+        "tutor.ask_placeholder": "Pregunta sobre este módulo...",
+        "stats.day_streak": "Días de Racha",
+        "stats.next_level": "Siguiente nivel",
+        "stats.xp": "XP",
+        "common.loading": "Cargando...",
+        "common.error": "Error",
+        "common.success": "Éxito",
+        "diagnostic.complete": "Evaluación Completada",
+        "diagnostic.analyzed": "Hemos analizado tus habilidades en {topic}.",
+        "diagnostic.strengths": "Fortalezas",
+        "diagnostic.focus_areas": "Áreas de Enfoque",
+        "diagnostic.recommendation": "Nuestra Recomendación",
+        "diagnostic.generate": "Generar Curso Personalizado",
+        "course.level_complete": "¡Felicidades! Has dominado el nivel {level} {topic}!",
+        "course.ready_advance": "¿Listo para avanzar a {next_level}?",
+        "course.take_assessment": "Tomar Evaluación de Avance",
+        "course.stay_current": "Quedarme en el Nivel Actual",
+    },
+}
+
 
 class I18nState(rx.State):
-    current_language: str = "en"
-    available_languages: list[dict[str, str]] = [
-        {"code": "en", "name": "English", "flag": "🇺🇸"},
-        {"code": "es", "name": "Español", "flag": "🇪🇸"},
-    ]
-    translations: dict[str, dict[str, str]] = {
-        "en": {
-            "landing.hero_title": "Master Any Skill with AI-Powered Learning",
-            "landing.hero_subtitle": "Personalized curriculum, adaptive quizzes, and an always-available AI tutor. Start your learning journey today.",
-            "landing.feature_adaptive_title": "Adaptive Learning",
-            "landing.feature_adaptive_desc": "Curriculum that evolves with your skills and fills knowledge gaps.",
-            "landing.feature_tutor_title": "AI Tutor",
-            "landing.feature_tutor_desc": "Get instant, context-aware help whenever you get stuck.",
-            "landing.feature_quiz_title": "Smart Quizzes",
-            "landing.feature_quiz_desc": "Dynamic difficulty adjustment to keep you challenged.",
-            "landing.feature_progress_title": "Progress Tracking",
-            "landing.feature_progress_desc": "Visual analytics to track your streak, XP, and mastery.",
-            "landing.sign_in": "Sign in with Google",
-            "nav.explore": "Explore",
-            "nav.courses": "My Courses",
-            "nav.lab": "Active Lab",
-            "nav.reviews": "Reviews",
-            "nav.settings": "Settings",
-            "nav.menu": "MENU",
-            "onboarding.title": "What do you want to learn today?",
-            "onboarding.placeholder": "Master Rust, learn Neural Networks, or explore AWS...",
-            "onboarding.skill_question": "Great! Let's get you started. To personalize your learning path, how much experience do you have with this topic?",
-            "onboarding.beginner": "Beginner",
-            "onboarding.intermediate": "Intermediate",
-            "onboarding.advanced": "Advanced",
-            "onboarding.preparing": "Preparing your diagnostic assessment...",
-            "onboarding.generating_questions": "We are generating questions to test your knowledge of {topic}",
-            "course.progress": "Course Progress",
-            "course.completed": "COMPLETED",
-            "course.locked": "LOCKED",
-            "course.active": "ACTIVE",
-            "course.modules_completed": "{completed} of {total} Modules Completed",
-            "course.start_learning": "Start Learning",
-            "course.review_module": "Review Module",
-            "lab.active_module": "Active Module",
-            "lab.next_module": "Next Module",
-            "lab.editor": "Editor",
-            "lab.terminal": "Terminal",
-            "lab.quiz": "Quiz",
-            "lab.practice": "Practice",
-            "lab.flashcards": "Flashcards",
-            "lab.run_code": "Run Code",
-            "lab.check_answer": "Check Answer",
-            "lab.submit_answer": "Submit Answer",
-            "lab.next_question": "Next Question",
-            "lab.term": "TERM",
-            "lab.definition": "DEFINITION",
-            "quiz.correct": "Correct!",
-            "quiz.incorrect": "Not quite.",
-            "quiz.score": "Score",
-            "quiz.explanation": "Explanation",
-            "quiz.review_material": "Review Lesson Material",
-            "review.due_for_review": "{count} Concepts Due for Review",
-            "review.start_session": "Start Review Session",
-            "review.all_caught_up": "All Caught Up!",
-            "review.click_to_reveal": "Click card to reveal definition",
-            "review.again": "Again",
-            "review.hard": "Hard",
-            "review.good": "Good",
-            "review.easy": "Easy",
-            "review.how_well": "How well did you know this?",
-            "tutor.ai_coach": "AI Coach",
-            "tutor.context_help": "Context-Aware Help",
-            "tutor.simple": "Simple",
-            "tutor.example": "Example",
-            "tutor.advanced": "Deep Dive",
-            "tutor.ask_placeholder": "Ask about this module...",
-            "stats.day_streak": "Day Streak",
-            "stats.next_level": "Next level",
-            "stats.xp": "XP",
-            "common.loading": "Loading...",
-            "common.error": "Error",
-            "common.success": "Success",
-            "diagnostic.complete": "Assessment Complete",
-            "diagnostic.analyzed": "We've analyzed your skills in {topic}.",
-            "diagnostic.strengths": "Strengths",
-            "diagnostic.focus_areas": "Focus Areas",
-            "diagnostic.recommendation": "Our Recommendation",
-            "diagnostic.generate": "Generate Personalized Course",
-            "course.level_complete": "Congratulations! You've mastered {level} {topic}!",
-            "course.ready_advance": "Ready to advance to {next_level}?",
-            "course.take_assessment": "Take Advancement Assessment",
-            "course.stay_current": "Stay at Current Level",
-        },
-        "es": {
-            "landing.hero_title": "Domina Cualquier Habilidad con Aprendizaje Impulsado por IA",
-            "landing.hero_subtitle": "Currículum personalizado, cuestionarios adaptativos y un tutor de IA siempre disponible. Comienza tu viaje de aprendizaje hoy.",
-            "landing.feature_adaptive_title": "Aprendizaje Adaptativo",
-            "landing.feature_adaptive_desc": "Currículum que evoluciona con tus habilidades y llena vacíos de conocimiento.",
-            "landing.feature_tutor_title": "Tutor IA",
-            "landing.feature_tutor_desc": "Obtén ayuda instantánea y contextual cuando te atasques.",
-            "landing.feature_quiz_title": "Cuestionarios Inteligentes",
-            "landing.feature_quiz_desc": "Ajuste dinámico de dificultad para mantenerte desafiado.",
-            "landing.feature_progress_title": "Seguimiento de Progreso",
-            "landing.feature_progress_desc": "Analíticas visuales para seguir tu racha, XP y dominio.",
-            "landing.sign_in": "Iniciar sesión con Google",
-            "nav.explore": "Explorar",
-            "nav.courses": "Mis Cursos",
-            "nav.lab": "Laboratorio",
-            "nav.reviews": "Repasos",
-            "nav.settings": "Ajustes",
-            "nav.menu": "MENÚ",
-            "onboarding.title": "¿Qué quieres aprender hoy?",
-            "onboarding.placeholder": "Domina Rust, aprende Redes Neuronales o explora AWS...",
-            "onboarding.skill_question": "¡Genial! Empecemos. Para personalizar tu ruta de aprendizaje, ¿cuánta experiencia tienes en este tema?",
-            "onboarding.beginner": "Principiante",
-            "onboarding.intermediate": "Intermedio",
-            "onboarding.advanced": "Avanzado",
-            "onboarding.preparing": "Preparando tu evaluación diagnóstica...",
-            "onboarding.generating_questions": "Estamos generando preguntas para probar tus conocimientos sobre {topic}",
-            "course.progress": "Progreso del Curso",
-            "course.completed": "COMPLETADO",
-            "course.locked": "BLOQUEADO",
-            "course.active": "ACTIVO",
-            "course.modules_completed": "{completed} de {total} Módulos Completados",
-            "course.start_learning": "Empezar a Aprender",
-            "course.review_module": "Repasar Módulo",
-            "lab.active_module": "Módulo Activo",
-            "lab.next_module": "Siguiente Módulo",
-            "lab.editor": "Editor",
-            "lab.terminal": "Terminal",
-            "lab.quiz": "Cuestionario",
-            "lab.practice": "Práctica",
-            "lab.flashcards": "Tarjetas",
-            "lab.run_code": "Ejecutar",
-            "lab.check_answer": "Comprobar",
-            "lab.submit_answer": "Enviar Respuesta",
-            "lab.next_question": "Siguiente Pregunta",
-            "lab.term": "TÉRMINO",
-            "lab.definition": "DEFINICIÓN",
-            "quiz.correct": "¡Correcto!",
-            "quiz.incorrect": "No del todo.",
-            "quiz.score": "Puntuación",
-            "quiz.explanation": "Explicación",
-            "quiz.review_material": "Repasar Material de la Lección",
-            "review.due_for_review": "{count} Conceptos por Repasar",
-            "review.start_session": "Iniciar Sesión de Repaso",
-            "review.all_caught_up": "¡Todo al día!",
-            "review.click_to_reveal": "Haz clic para revelar la definición",
-            "review.again": "Otra vez",
-            "review.hard": "Difícil",
-            "review.good": "Bien",
-            "review.easy": "Fácil",
-            "review.how_well": "¿Qué tan bien lo sabías?",
-            "tutor.ai_coach": "Entrenador IA",
-            "tutor.context_help": "Ayuda Contextual",
-            "tutor.simple": "Simple",
-            "tutor.example": "Ejemplo",
-            "tutor.advanced": "A Fondo",
-            "tutor.ask_placeholder": "Pregunta sobre este módulo...",
-            "stats.day_streak": "Días de Racha",
-            "stats.next_level": "Siguiente nivel",
-            "stats.xp": "XP",
-            "common.loading": "Cargando...",
-            "common.error": "Error",
-            "common.success": "Éxito",
-            "diagnostic.complete": "Evaluación Completada",
-            "diagnostic.analyzed": "Hemos analizado tus habilidades en {topic}.",
-            "diagnostic.strengths": "Fortalezas",
-            "diagnostic.focus_areas": "Áreas de Enfoque",
-            "diagnostic.recommendation": "Nuestra Recomendación",
-            "diagnostic.generate": "Generar Curso Personalizado",
-            "course.level_complete": "¡Felicidades! Has dominado el nivel {level} {topic}!",
-            "course.ready_advance": "¿Listo para avanzar a {next_level}?",
-            "course.take_assessment": "Tomar Evaluación de Avance",
-            "course.stay_current": "Quedarme en el Nivel Actual",
-        },
-    }
+    current_language: str = DEFAULT_LANGUAGE
 
     @rx.event
     def set_language(self, lang_code: str):
+        from app.states.lab import LabState
+
         self.current_language = lang_code
+        return LabState.switch_content_language(lang_code)
 
     @rx.var
     def current_flag(self) -> str:
-        for lang in self.available_languages:
+        for lang in AVAILABLE_LANGUAGES:
             if lang["code"] == self.current_language:
                 return lang["flag"]
-        return "🇺🇸"
\ No newline at end of file
+        return "🇺🇸"
+
+
+def t(key: str) -> rx.Var:
+    """
+    Text for a translation key in the learner's current language.
+    Every language's string for the key is compiled into the page, so the
+    tables are not part of per-session state and only `current_language`
+    is. Keys missing from a language fall back to English.
+    """
+    default = TRANSLATIONS[DEFAULT_LANGUAGE][key]
+    cases = [
+        (code, bundle.get(key, default))
+        for code, bundle in TRANSLATIONS.items()
+        if code != DEFAULT_LANGUAGE
+    ]
+    return rx.match(I18nState.current_language, *cases, default).to(str)
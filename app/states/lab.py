@@ -1,8 +1,34 @@
 import reflex as rx
 from typing import TypedDict
-from app.services.ai_generator import generate_module_content
+from app.services.ai_generator import iter_module_sections, MODULE_SECTIONS
+from app.services.retrieval import index_module_content
+from app.services.prefetch import (
+    prefetch_module_content,
+    wait_for_prefetch,
+    cancel_session_prefetches,
+)
+from app.services.code_runner import get_code_runner, SANDBOX_TIMEOUT_SECONDS
+from app.services.grader import grade_code, grade_text
+from app.services.question_bank import get_question_bank
+from app.services.translation import CANONICAL_LANGUAGE, translate_content
+from app.services.adaptive_testing import item_location
+from app.services.difficulty_engine import (
+    expected_success,
+    update_rating,
+    select_question,
+)
+from app.services.terminal_log import (
+    TERMINAL_MAX_LINES,
+    append_lines,
+    clear_spill,
+    read_spilled,
+)
+from app.services.metrics import instrumented
 from app.states.i18n import I18nState
+from contextlib import aclosing
+import asyncio
 import logging
+import time
 
 
 class QuizOption(TypedDict):
@@ -11,6 +37,7 @@ class QuizOption(TypedDict):
 
 
 class QuizQuestion(TypedDict):
+    id: str
     question: str
     options: list[QuizOption]
     correct_id: str
@@ -39,6 +66,12 @@ class ModuleData(TypedDict):
     quiz_questions: list[QuizQuestion]
 
 
+TERMINAL_PAGE_LINES = 200
+TERMINAL_FLUSH_SECONDS = 0.1
+QUIZ_POOL_LIMIT = 30
+REVIEW_SUGGESTION_SUCCESS = 0.6
+
+
 class LabState(rx.State):
     active_tab: str = "editor"
     topic_type: str = "programming"
@@ -49,6 +82,13 @@ class LabState(rx.State):
 if __name__ == "__main__":
     main()"""
     terminal_output: list[str] = ["$ python main.py"]
+    older_terminal_output: list[str] = []
+    has_older_terminal_output: bool = False
+    _terminal_spilled_lines: int = 0
+    _older_output_start: int = 0
+    is_code_running: bool = False
+    _graded_code: str = ""
+    _grade_generation: int = 0
     selected_quiz_answer: str = ""
     is_quiz_submitted: bool = False
     quiz_result: str = ""
@@ -64,13 +104,17 @@ if __name__ == "__main__":
     quiz_performance: dict[str, int | dict[str, int]] = {
         "correct": 0,
         "total": 0,
-        "streak": 0,
-        "incorrect_streak": 0,
         "by_difficulty": {"easy": 0, "medium": 0, "hard": 0},
     }
     show_explanation: bool = False
-    current_difficulty: str = "medium"
     should_review: bool = False
+    quiz_rating: float = 0.0
+    quiz_rating_answers: int = 0
+    _quiz_locations: dict[str, float] = {}
+    _answered_quiz_ids: list[str] = []
+    _quiz_history: list[int] = []
+    _source_module_data: dict[str, str | list[dict]] = {}
+    _progress_dirty: bool = False
     current_module_data: ModuleData = {
         "id": "placeholder",
         "title": "Loading...",
@@ -100,6 +144,7 @@ if __name__ == "__main__":
     def current_quiz_question(self) -> QuizQuestion:
         if not self.current_module_data["quiz_questions"]:
             return {
+                "id": "",
                 "question": "None",
                 "options": [],
                 "correct_id": "",
@@ -212,6 +257,7 @@ if __name__ == "__main__":
                 correct_id = clean_options[0]["id"]
             normalized.append(
                 {
+                    "id": str(q.get("id") or f"q{i}"),
                     "question": question_text,
                     "options": clean_options,
                     "correct_id": correct_id,
@@ -221,44 +267,168 @@ if __name__ == "__main__":
             )
         return normalized
 
+    def _apply_module_section(self, section: str, value, reset: bool = True):
+        if section == "content":
+            self.current_module_data["content"] = value or "### Content not available."
+            index_module_content(self.current_module_data["content"])
+        elif section == "exercises":
+            exercises = self._normalize_exercises(value or [])
+            self.current_module_data["exercises"] = exercises
+            if reset:
+                self.current_exercise_index = 0
+                self.current_code = exercises[0]["prompt"] if exercises else ""
+        elif section == "flashcards":
+            self.current_module_data["flashcards"] = self._normalize_flashcards(
+                value or []
+            )
+            if reset:
+                self.current_flashcard_index = 0
+        elif section == "quiz_questions":
+            self.current_module_data["quiz_questions"] = (
+                self._normalize_quiz_questions(value or [])
+            )
+            if reset:
+                self.current_quiz_index = 0
+
+    async def _apply_source_section(self, section: str, value, language: str):
+        """
+        Keeps the canonical-language version of a section, so the module can
+        be shown in another language later, and shows it in `language`.
+        """
+        if section == "exercises":
+            value = self._normalize_exercises(value or [])
+        elif section == "flashcards":
+            value = self._normalize_flashcards(value or [])
+        elif section == "quiz_questions":
+            value = self._normalize_quiz_questions(value or [])
+        self._source_module_data[section] = value
+        self._apply_module_section(section, await translate_content(value, language))
+
+    async def _prepare_quiz_pool(self, topic: str, module_title: str, language: str):
+        """
+        Extends the module's quiz with other banked questions for the same
+        module, looks up each question's calibrated difficulty and shows the
+        best-matched first question.
+        """
+        bank = get_question_bank()
+        questions = self._source_module_data.get("quiz_questions", [])
+        known = {q["id"] for q in questions}
+        try:
+            banked = await bank.draw(
+                "quiz", topic, module_title, CANONICAL_LANGUAGE, QUIZ_POOL_LIMIT
+            )
+            extra = [q for q in banked if q["id"] not in known]
+            if extra:
+                questions = questions + self._normalize_quiz_questions(extra)
+            calibrated = await bank.calibrate(questions)
+        except Exception as e:
+            logging.exception(f"Error preparing quiz pool: {e}")
+            calibrated = questions
+        self._source_module_data["quiz_questions"] = questions
+        self.current_module_data["quiz_questions"] = await translate_content(
+            questions, language
+        )
+        self._quiz_locations = {q["id"]: item_location(q) for q in calibrated}
+        self._answered_quiz_ids = []
+        self._quiz_history = []
+        self._show_next_quiz_question()
+
+    def _show_next_quiz_question(self) -> bool:
+        index = select_question(
+            self.current_module_data["quiz_questions"],
+            set(self._answered_quiz_ids),
+            self.quiz_rating,
+            self._quiz_locations,
+        )
+        if index is None:
+            return False
+        self.current_quiz_index = index
+        self._quiz_history.append(index)
+        self.selected_quiz_answer = ""
+        self.is_quiz_submitted = False
+        self.should_review = False
+        return True
+
+    async def _prefetch_next_module(self, topic: str, module_id: str):
+        """
+        Prefetches the module after `module_id` when the learner can open it
+        next: it is already unlocked, or it is the one that finishing the
+        active module `module_id` unlocks.
+        """
+        from app.states.courses import CourseState, module_source_title
+
+        courses = await self.get_state(CourseState)
+        for i, m in enumerate(courses.modules):
+            if m["id"] == module_id:
+                if i + 1 < len(courses.modules) and (
+                    courses.modules[i + 1]["status"] != "locked"
+                    or m["status"] == "active"
+                ):
+                    prefetch_module_content(
+                        self.router.session.client_token,
+                        topic,
+                        module_source_title(courses.modules[i + 1]),
+                        CANONICAL_LANGUAGE,
+                    )
+                break
+
     @rx.event
-    async def load_module_content(self, topic: str, module_title: str, module_id: str):
+    @instrumented
+    async def load_module_content(
+        self, topic: str, module_title: str, module_id: str, display_title: str = ""
+    ):
+        """
+        Loads a module generated under its canonical `module_title` and shows
+        it in the learner's language, headed by `display_title`.
+        """
         self.is_loading = True
+        if self.course_topic_stored and self.course_topic_stored != topic:
+            cancel_session_prefetches(self.router.session.client_token)
         self.course_topic_stored = topic
         self.topic_type = self._detect_topic_type(topic)
         self.current_exercise_index = 0
         self.current_flashcard_index = 0
         self.current_quiz_index = 0
         self.is_flashcard_flipped = False
+        self._grade_generation += 1
+        self._reset_terminal()
         yield
         try:
             i18n = await self.get_state(I18nState)
-            generated_data = await generate_module_content(
-                topic, module_title, i18n.current_language
-            )
-            exercises = self._normalize_exercises(generated_data.get("exercises", []))
-            flashcards = self._normalize_flashcards(
-                generated_data.get("flashcards", [])
-            )
-            quiz_questions = self._normalize_quiz_questions(
-                generated_data.get("quiz_questions", [])
-            )
+            language = i18n.current_language
+            self._source_module_data = {}
             self.current_module_data = {
                 "id": module_id,
-                "title": module_title,
-                "content": generated_data.get("content", "### Content not available."),
-                "exercises": exercises,
-                "flashcards": flashcards,
-                "quiz_questions": quiz_questions,
+                "title": display_title or module_title,
+                "content": "### Preparing your personalized lesson...",
+                "exercises": [],
+                "flashcards": [],
+                "quiz_questions": [],
             }
             self.current_code = ""
-            if exercises:
-                self.current_code = exercises[0]["prompt"]
             self.active_tab = "practice" if self.topic_type == "language" else "editor"
             self.is_feedback_visible = False
             self.selected_quiz_answer = ""
             self.is_quiz_submitted = False
             self.quiz_result = ""
+            generated_data = await wait_for_prefetch(
+                topic, module_title, CANONICAL_LANGUAGE
+            )
+            if generated_data is not None:
+                for section in MODULE_SECTIONS:
+                    await self._apply_source_section(
+                        section, generated_data.get(section), language
+                    )
+            else:
+                async for section, value in iter_module_sections(
+                    topic, module_title, CANONICAL_LANGUAGE
+                ):
+                    await self._apply_source_section(section, value, language)
+                    if section == "content":
+                        self.is_loading = False
+                    yield
+            await self._prepare_quiz_pool(topic, module_title, language)
+            await self._prefetch_next_module(topic, module_id)
         except Exception as e:
             logging.exception("Unexpected error loading module")
             yield rx.toast("Failed to load module content. Please try again.")
@@ -266,6 +436,26 @@ if __name__ == "__main__":
             self.is_loading = False
             yield
 
+    @rx.event
+    @instrumented
+    async def switch_content_language(self, language: str):
+        """
+        Shows the loaded module in `language` without regenerating it or
+        losing the learner's place. Translations of the canonical sections
+        are cached, so switching back and forth is near-instant.
+        """
+        if not self._source_module_data:
+            return
+        sections = list(self._source_module_data)
+        translated = await asyncio.gather(
+            *(
+                translate_content(self._source_module_data[section], language)
+                for section in sections
+            )
+        )
+        for section, value in zip(sections, translated):
+            self._apply_module_section(section, value, reset=False)
+
     @rx.event
     def next_exercise(self):
         if self.current_exercise_index < len(self.current_module_data["exercises"]) - 1:
@@ -294,6 +484,7 @@ if __name__ == "__main__":
             self.is_flashcard_flipped = False
 
     @rx.event
+    @instrumented
     async def schedule_for_review(self, concept: str, definition: str):
         from app.states.review import ReviewState
 
@@ -306,6 +497,7 @@ if __name__ == "__main__":
         )
 
     @rx.event
+    @instrumented
     async def flip_flashcard(self):
         self.is_flashcard_flipped = not self.is_flashcard_flipped
         from app.states.user_stats import UserStatsState
@@ -318,22 +510,19 @@ if __name__ == "__main__":
 
     @rx.event
     def next_quiz_question(self):
-        if (
-            self.current_quiz_index
-            < len(self.current_module_data["quiz_questions"]) - 1
-        ):
-            self.current_quiz_index += 1
-            self.selected_quiz_answer = ""
-            self.is_quiz_submitted = False
+        if not self._show_next_quiz_question():
+            return rx.toast("You've answered every question in this module!")
 
     @rx.event
     def prev_quiz_question(self):
-        if self.current_quiz_index > 0:
-            self.current_quiz_index -= 1
+        if len(self._quiz_history) > 1:
+            self._quiz_history.pop()
+            self.current_quiz_index = self._quiz_history[-1]
             self.selected_quiz_answer = ""
             self.is_quiz_submitted = False
 
     @rx.event
+    @instrumented
     async def submit_quiz(self):
         if not self.selected_quiz_answer:
             yield rx.toast("Please select an answer first!")
@@ -342,43 +531,37 @@ if __name__ == "__main__":
         self.show_explanation = True
         current_q = self.current_module_data["quiz_questions"][self.current_quiz_index]
         is_correct = self.selected_quiz_answer == current_q["correct_id"]
-        difficulty = current_q.get("difficulty", "medium")
-        self.quiz_performance["total"] = self.quiz_performance["total"] + 1
+        first_attempt = current_q["id"] not in self._answered_quiz_ids
+        expected = 0.0
+        if first_attempt:
+            location = self._quiz_locations.get(
+                current_q["id"], item_location(current_q)
+            )
+            expected = expected_success(self.quiz_rating, location)
+            self.quiz_rating, self.quiz_rating_answers = update_rating(
+                self.quiz_rating, self.quiz_rating_answers, location, is_correct
+            )
+            self._progress_dirty = True
+            self._answered_quiz_ids.append(current_q["id"])
+            await get_question_bank().record_response(current_q["id"], is_correct)
+            self.quiz_performance["total"] = self.quiz_performance["total"] + 1
         from app.states.user_stats import UserStatsState
 
         stats = await self.get_state(UserStatsState)
         if is_correct:
-            yield stats.add_xp(10, "Quiz Answer")
+            if first_attempt:
+                yield stats.add_xp(10, "Quiz Answer")
+                self.quiz_performance["correct"] = (
+                    self.quiz_performance["correct"] + 1
+                )
             self.quiz_result = "correct"
             self.feedback_message = "Correct! Well done."
             self.feedback_type = "success"
-            self.quiz_performance["correct"] = self.quiz_performance["correct"] + 1
-            self.quiz_performance["streak"] = self.quiz_performance["streak"] + 1
-            self.quiz_performance["incorrect_streak"] = 0
-            if self.quiz_performance["streak"] >= 3:
-                if self.current_difficulty == "easy":
-                    self.current_difficulty = "medium"
-                    self.quiz_performance["streak"] = 0
-                elif self.current_difficulty == "medium":
-                    self.current_difficulty = "hard"
-                    self.quiz_performance["streak"] = 0
         else:
             self.quiz_result = "incorrect"
             self.feedback_message = f"Not quite."
             self.feedback_type = "error"
-            self.quiz_performance["streak"] = 0
-            self.quiz_performance["incorrect_streak"] = (
-                self.quiz_performance["incorrect_streak"] + 1
-            )
-            if self.quiz_performance["incorrect_streak"] >= 2:
-                if self.current_difficulty == "hard":
-                    self.current_difficulty = "medium"
-                    self.quiz_performance["incorrect_streak"] = 0
-                elif self.current_difficulty == "medium":
-                    self.current_difficulty = "easy"
-                    self.quiz_performance["incorrect_streak"] = 0
-                if self.quiz_performance["incorrect_streak"] >= 2:
-                    self.should_review = True
+            self.should_review = expected >= REVIEW_SUGGESTION_SUCCESS
         if not is_correct:
             yield LabState.schedule_for_review(
                 current_q["question"], current_q["explanation"]
@@ -386,8 +569,9 @@ if __name__ == "__main__":
         self.is_feedback_visible = True
 
     @rx.event
+    @instrumented
     async def next_module(self):
-        from app.states.courses import CourseState
+        from app.states.courses import CourseState, module_source_title
         from app.states.user_stats import UserStatsState
         from app.states.navigation import NavState
 
@@ -406,10 +590,14 @@ if __name__ == "__main__":
             if current_idx + 1 < len(courses.modules):
                 if courses.modules[current_idx + 1]["status"] == "locked":
                     courses.modules[current_idx + 1]["status"] = "active"
+            courses._progress_dirty = True
             if current_idx + 1 < len(courses.modules):
                 next_m = courses.modules[current_idx + 1]
                 async for update in self.load_module_content(
-                    courses.course_topic, next_m["title"], next_m["id"]
+                    courses.course_topic,
+                    module_source_title(next_m),
+                    next_m["id"],
+                    next_m["title"],
                 ):
                     yield update
             else:
@@ -436,24 +624,178 @@ if __name__ == "__main__":
     def check_practice_answer(self):
         if not self.current_code.strip():
             return rx.toast("Please type your answer first!")
-        self.feedback_message = "Excellent! Your answer has been submitted for review."
-        self.feedback_type = "success"
+        grade = grade_text(self.current_code, self.current_exercise["expected_answer"])
         self.is_feedback_visible = True
+        if grade["correct"] is None:
+            self.feedback_message = (
+                "Excellent! Your answer has been submitted for review."
+            )
+            self.feedback_type = "success"
+        elif grade["correct"]:
+            self.feedback_message = "Excellent! That's correct."
+            self.feedback_type = "success"
+        else:
+            self.feedback_message = f"Not quite. {grade['details']}"
+            self.feedback_type = "error"
+
+    def _append_terminal(self, *lines: str):
+        """
+        Appends to the fixed-capacity terminal buffer, spilling the oldest
+        lines to disk. Any older output paged back in is dropped so the view
+        returns to the live tail.
+        """
+        self.terminal_output, spilled = append_lines(
+            self.terminal_output,
+            list(lines),
+            self.router.session.client_token,
+            fresh=self._terminal_spilled_lines == 0,
+        )
+        self._terminal_spilled_lines += spilled
+        self.older_terminal_output = []
+        self._older_output_start = self._terminal_spilled_lines
+        self.has_older_terminal_output = self._terminal_spilled_lines > 0
+
+    def _reset_terminal(self):
+        """Empties the terminal and removes the session's spill file."""
+        clear_spill(self.router.session.client_token)
+        self.terminal_output = ["$ python main.py"]
+        self.older_terminal_output = []
+        self.has_older_terminal_output = False
+        self._terminal_spilled_lines = 0
+        self._older_output_start = 0
+
+    @rx.event
+    def clear_terminal(self):
+        if not self.is_code_running:
+            self._reset_terminal()
 
     @rx.event
-    def run_code(self):
+    @instrumented
+    async def run_code(self):
         if self.topic_type == "language":
             yield LabState.check_practice_answer
             return
+        if self.is_code_running:
+            return
         self.active_tab = "terminal"
-        self.terminal_output.append("Running...")
-        if "print" in self.current_code:
-            self.terminal_output.append("Output: (Simulated Output)")
-        else:
-            self.terminal_output.append("Output: Done")
-        self.feedback_message = "Great job! Your code executed successfully."
-        self.feedback_type = "success"
+        self.is_code_running = True
+        self._grade_generation += 1
+        self._graded_code = self.current_code
+        yield
+        partial = {"stdout": "", "stderr": ""}
+        result = {}
+        last_flush = time.monotonic()
+        try:
+            async with aclosing(
+                get_code_runner().stream(self.current_code)
+            ) as messages:
+                async for message in messages:
+                    if message["type"] == "exit":
+                        result = message
+                        continue
+                    text = partial[message["type"]] + message["data"]
+                    *lines, partial[message["type"]] = text.split("\n")
+                    if lines:
+                        self._append_terminal(*lines)
+                    if time.monotonic() - last_flush >= TERMINAL_FLUSH_SECONDS:
+                        last_flush = time.monotonic()
+                        yield
+        except Exception as e:
+            logging.exception(f"Error running code: {e}")
+        finally:
+            self.is_code_running = False
+        self._append_terminal(*[text for text in partial.values() if text])
         self.is_feedback_visible = True
+        if not result:
+            self.feedback_message = "We couldn't run your code. Please try again."
+            self.feedback_type = "error"
+            return
+        if result["truncated"]:
+            self._append_terminal("[Output truncated]")
+        if result["timed_out"]:
+            self._append_terminal(
+                f"[Stopped after {SANDBOX_TIMEOUT_SECONDS:g}s time limit]"
+            )
+            self.feedback_message = "Your code took too long to run. Check for infinite loops."
+            self.feedback_type = "error"
+            return
+        self._append_terminal(
+            f"[Exited with code {result['exit_code']} in {result['duration']:.2f}s]"
+        )
+        if result["exit_code"] != 0:
+            self.feedback_message = "Your code raised an error. Check the terminal output."
+            self.feedback_type = "error"
+            return
+        if not self.current_exercise["expected_answer"].strip():
+            self.feedback_message = "Great job! Your code executed successfully."
+            self.feedback_type = "success"
+            return
+        self.feedback_message = "Your code runs. Checking it against the solution..."
+        self.feedback_type = "info"
+        yield LabState.grade_submission
+
+    @rx.event(background=True)
+    @instrumented
+    async def grade_submission(self):
+        """
+        Grades the code from the last run against the exercise's solution.
+        Runs in the background so the session stays responsive during the
+        sandbox checks; the result is dropped if the learner has run code
+        again, switched exercise or loaded another module meanwhile.
+        """
+        async with self:
+            generation = self._grade_generation
+            exercise_index = self.current_exercise_index
+            code = self._graded_code
+            expected = self.current_exercise["expected_answer"]
+        grade = {"correct": None}
+        try:
+            grade = await grade_code(code, expected)
+        except Exception as e:
+            logging.exception(f"Error grading code: {e}")
+        async with self:
+            if (
+                generation != self._grade_generation
+                or exercise_index != self.current_exercise_index
+            ):
+                return
+            self.is_feedback_visible = True
+            if grade["correct"] is None:
+                self.feedback_message = "Great job! Your code executed successfully."
+                self.feedback_type = "success"
+                return
+            self._append_terminal(
+                f"[Checks passed: {grade['passed']}/{grade['total']}]"
+            )
+            if grade["correct"]:
+                self.feedback_message = "Great job! Your solution passes every check."
+                self.feedback_type = "success"
+            else:
+                self.feedback_message = f"Your code runs, but not every check passes: {grade['details']}"
+                self.feedback_type = "error"
+
+    @rx.event
+    @instrumented
+    async def load_older_output(self):
+        """
+        Pages the previous TERMINAL_PAGE_LINES spilled lines back in from disk.
+        Paging stops once TERMINAL_MAX_LINES older lines are held in state, so
+        the older output always runs on without a gap into the live output.
+        """
+        end = self._older_output_start
+        room = TERMINAL_MAX_LINES - len(self.older_terminal_output)
+        start = max(end - min(TERMINAL_PAGE_LINES, room), 0)
+        if end <= 0 or room <= 0:
+            self.has_older_terminal_output = False
+            return
+        page = await asyncio.to_thread(
+            read_spilled, self.router.session.client_token, start, end
+        )
+        self.older_terminal_output = page + self.older_terminal_output
+        self._older_output_start = start
+        self.has_older_terminal_output = (
+            start > 0 and len(self.older_terminal_output) < TERMINAL_MAX_LINES
+        )
 
     @rx.event
     def dismiss_feedback(self):
@@ -1,6 +1,7 @@
 import reflex as rx
 from typing import Optional
 from app.services.ai_generator import generate_course_curriculum
+from app.services.metrics import instrumented
 from app.states.i18n import I18nState
 import logging
 
@@ -16,6 +17,7 @@ class OnboardingState(rx.State):
         self.search_query = value
 
     @rx.event
+    @instrumented
     async def submit_topic(self, form_data: dict[str, str]):
         query = form_data.get("search_query", "")
         self.search_query = query
@@ -31,6 +33,7 @@ class OnboardingState(rx.State):
         self.is_diagnostic_shown = True
 
     @rx.event
+    @instrumented
     async def select_skill(self, level: str):
         self.skill_level = level
         self.is_processing = True
@@ -1,7 +1,9 @@
 import reflex as rx
 from typing import TypedDict
 from datetime import datetime, timedelta
+import bisect
 import uuid
+from app.services.srs_scheduler import sm2_schedule, item_repetitions, DEFAULT_EASE
 
 
 class ReviewItem(TypedDict):
@@ -13,6 +15,17 @@ class ReviewItem(TypedDict):
     next_review_date: str
     interval_days: int
     ease_factor: float
+    repetitions: int
+
+
+def _due_epoch(item: ReviewItem) -> int:
+    """Due date as epoch microseconds, so same-day items keep insertion order."""
+    return int(datetime.fromisoformat(item["next_review_date"]).timestamp() * 1e6)
+
+
+def _end_of_today_epoch() -> int:
+    tomorrow = datetime.now().date() + timedelta(days=1)
+    return int(datetime.combine(tomorrow, datetime.min.time()).timestamp() * 1e6)
 
 
 class ReviewState(rx.State):
@@ -21,24 +34,56 @@ class ReviewState(rx.State):
     is_reviewing: bool = False
     current_index: int = 0
     is_flipped: bool = False
+    _due_index: list[tuple[int, str]] = []
+    _item_positions: dict[str, int] = {}
+    _progress_dirty: bool = False
+
+    def _rebuild_due_index(self):
+        """Re-derives the due-date index after review_items is replaced wholesale."""
+        self._item_positions = {
+            item["id"]: i for i, item in enumerate(self.review_items)
+        }
+        self._due_index = sorted(
+            ((_due_epoch(item), item["id"]) for item in self.review_items)
+        )
+
+    def _sorted_due(self) -> list[tuple[int, str]]:
+        if len(self._due_index) != len(self.review_items):
+            return sorted(
+                ((_due_epoch(item), item["id"]) for item in self.review_items)
+            )
+        return self._due_index
+
+    def _pending_total(self) -> int:
+        return bisect.bisect_left(self._sorted_due(), (_end_of_today_epoch(),))
+
+    def _item_by_id(self, item_id: str) -> ReviewItem:
+        pos = self._item_positions.get(item_id)
+        if pos is None or pos >= len(self.review_items):
+            return next(item for item in self.review_items if item["id"] == item_id)
+        return self.review_items[pos]
+
+    def _positions(self) -> dict[str, int]:
+        """Id-to-position map, derived afresh when review_items was replaced."""
+        if len(self._item_positions) != len(self.review_items):
+            return {item["id"]: i for i, item in enumerate(self.review_items)}
+        return self._item_positions
 
     @rx.var
     def pending_reviews(self) -> list[ReviewItem]:
-        today = datetime.now().date()
-        return [
-            item
-            for item in self.review_items
-            if datetime.fromisoformat(item["next_review_date"]).date() <= today
-        ]
+        index = self._sorted_due()
+        end = bisect.bisect_left(index, (_end_of_today_epoch(),))
+        items = self.review_items
+        positions = self._positions()
+        return [items[positions[item_id]] for _, item_id in index[:end]]
 
     @rx.var
     def pending_count(self) -> int:
-        return len(self.pending_reviews)
+        return self._pending_total()
 
     @rx.var
     def current_item(self) -> ReviewItem:
-        pending = self.pending_reviews
-        if not pending or self.current_index >= len(pending):
+        if self.current_index >= self._pending_total():
             return {
                 "id": "",
                 "concept": "",
@@ -47,9 +92,10 @@ class ReviewState(rx.State):
                 "module_id": "",
                 "next_review_date": "",
                 "interval_days": 0,
-                "ease_factor": 2.5,
+                "ease_factor": DEFAULT_EASE,
+                "repetitions": 0,
             }
-        return pending[self.current_index]
+        return self._item_by_id(self._sorted_due()[self.current_index][1])
 
     @rx.event
     def add_to_review(self, concept: str, definition: str, topic: str, module_id: str):
@@ -63,49 +109,53 @@ class ReviewState(rx.State):
             "topic": topic,
             "module_id": module_id,
             "next_review_date": datetime.now().isoformat(),
-            "interval_days": 1,
-            "ease_factor": 2.5,
+            "interval_days": 0,
+            "ease_factor": DEFAULT_EASE,
+            "repetitions": 0,
         }
         self.review_items.append(new_item)
+        self._progress_dirty = True
+        self._item_positions[new_item["id"]] = len(self.review_items) - 1
+        index = list(self._due_index)
+        bisect.insort(index, (_due_epoch(new_item), new_item["id"]))
+        self._due_index = index
 
     @rx.event
     def complete_review(self, quality: int):
-        if not self.pending_reviews:
+        if len(self._due_index) != len(self.review_items):
+            self._rebuild_due_index()
+        if self._pending_total() == 0:
             return
         item_id = self.current_item["id"]
-        for i, item in enumerate(self.review_items):
-            if item["id"] == item_id:
-                if quality < 3:
-                    item["interval_days"] = 1
-                elif quality == 3:
-                    item["interval_days"] = max(1, item["interval_days"])
-                else:
-                    intervals = [1, 3, 7, 14, 30, 60, 90]
-                    current_val = item["interval_days"]
-                    next_val = 1
-                    for idx, val in enumerate(intervals):
-                        if val > current_val:
-                            next_val = val
-                            break
-                        if val == current_val:
-                            if idx + 1 < len(intervals):
-                                next_val = intervals[idx + 1]
-                            else:
-                                next_val = val * 2
-                            break
-                    item["interval_days"] = next_val
-                item["next_review_date"] = (
-                    datetime.now() + timedelta(days=item["interval_days"])
-                ).isoformat()
-                self.review_items[i] = item
-                break
+        i = self._item_positions.get(item_id)
+        if i is not None:
+            item = self.review_items[i]
+            old_entry = (_due_epoch(item), item_id)
+            intervals, eases, repetitions = sm2_schedule(
+                [item["interval_days"]],
+                [item.get("ease_factor", DEFAULT_EASE)],
+                [item_repetitions(item)],
+                [quality],
+            )
+            item["interval_days"] = int(intervals[0])
+            item["ease_factor"] = round(float(eases[0]), 4)
+            item["repetitions"] = int(repetitions[0])
+            item["next_review_date"] = (
+                datetime.now() + timedelta(days=item["interval_days"])
+            ).isoformat()
+            self.review_items[i] = item
+            self._progress_dirty = True
+            index = list(self._due_index)
+            pos = bisect.bisect_left(index, old_entry)
+            if pos < len(index) and index[pos] == old_entry:
+                del index[pos]
+            bisect.insort(index, (_due_epoch(item), item_id))
+            self._due_index = index
         self.completed_today += 1
         self.is_flipped = False
-        if self.current_index >= len(self.pending_reviews) - 1:
+        if self.current_index >= self._pending_total() - 1:
             self.is_reviewing = False
             self.current_index = 0
-        else:
-            pass
 
     @rx.event
     def start_session(self):
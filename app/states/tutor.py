@@ -1,8 +1,14 @@
 import reflex as rx
 from typing import TypedDict
-from app.services.tutor_generator import generate_tutor_response
+from app.services.tutor_generator import (
+    exchange_turns,
+    stream_tutor_response,
+    summarize_conversation,
+)
+from app.services.conversation_memory import messages_to_fold
+from app.services.metrics import instrumented
 from app.states.i18n import I18nState
-import asyncio
+import time
 
 
 class ChatMessage(TypedDict):
@@ -10,6 +16,15 @@ class ChatMessage(TypedDict):
     content: str
 
 
+STREAM_FLUSH_CHUNKS = 12
+STREAM_FLUSH_SECONDS = 0.15
+VISIBLE_MESSAGES = 30
+MESSAGE_PAGE_SIZE = 20
+ARCHIVED_MESSAGES_LIMIT = 200
+FOLD_RETRY_SECONDS = 30
+FOLD_RETRY_MAX_SECONDS = 600
+
+
 class TutorState(rx.State):
     is_open: bool = False
     messages: list[ChatMessage] = [
@@ -21,6 +36,24 @@ class TutorState(rx.State):
     current_input: str = ""
     is_loading: bool = False
     explanation_style: str = "simple"
+    has_earlier_messages: bool = False
+    _archived_messages: list[ChatMessage] = []
+    _memory_turns: list[ChatMessage] = []
+    _memory_summary: str = ""
+    _is_folding_memory: bool = False
+    _memory_generation: int = 0
+    _fold_failures: int = 0
+    _fold_retry_at: float = 0.0
+
+    def _trim_visible_messages(self):
+        """Moves messages beyond the visible window into the server-side archive."""
+        overflow = len(self.messages) - VISIBLE_MESSAGES
+        if overflow <= 0:
+            return
+        archived = self._archived_messages + self.messages[:overflow]
+        self._archived_messages = archived[-ARCHIVED_MESSAGES_LIMIT:]
+        self.messages = self.messages[overflow:]
+        self.has_earlier_messages = True
 
     @rx.event
     def toggle_tutor(self):
@@ -42,13 +75,68 @@ class TutorState(rx.State):
                 "content": "Chat cleared. What else can I help you with?",
             }
         ]
+        self.has_earlier_messages = False
+        self._archived_messages = []
+        self._memory_turns = []
+        self._memory_summary = ""
+        self._memory_generation += 1
+        self._fold_failures = 0
+        self._fold_retry_at = 0.0
+
+    @rx.event
+    def load_earlier_messages(self):
+        if not self._archived_messages:
+            self.has_earlier_messages = False
+            return
+        page = self._archived_messages[-MESSAGE_PAGE_SIZE:]
+        self._archived_messages = self._archived_messages[:-MESSAGE_PAGE_SIZE]
+        self.messages = page + self.messages
+        self.has_earlier_messages = bool(self._archived_messages)
+
+    @rx.event(background=True)
+    @instrumented
+    async def fold_memory(self):
+        """
+        Folds the oldest turns into the rolling summary. After a failed
+        summary the next attempt is delayed with exponential backoff, and a
+        fold that finishes after the chat was cleared is discarded.
+        """
+        async with self:
+            if self._is_folding_memory or time.time() < self._fold_retry_at:
+                return
+            to_fold = messages_to_fold(self._memory_turns)
+            if not to_fold:
+                return
+            self._is_folding_memory = True
+            generation = self._memory_generation
+            previous_summary = self._memory_summary
+            i18n = await self.get_state(I18nState)
+            language = i18n.current_language
+        new_summary = await summarize_conversation(
+            previous_summary, to_fold, language
+        )
+        async with self:
+            self._is_folding_memory = False
+            if generation != self._memory_generation:
+                return
+            if new_summary is None:
+                self._fold_failures += 1
+                delay = FOLD_RETRY_SECONDS * 2 ** (self._fold_failures - 1)
+                self._fold_retry_at = time.time() + min(delay, FOLD_RETRY_MAX_SECONDS)
+                return
+            self._fold_failures = 0
+            self._fold_retry_at = 0.0
+            self._memory_summary = new_summary
+            self._memory_turns = self._memory_turns[len(to_fold) :]
 
     @rx.event
+    @instrumented
     async def send_message(self, form_data: dict[str, str]):
         user_msg = form_data.get("message", "").strip()
         if not user_msg:
             return
         self.messages.append({"role": "user", "content": user_msg})
+        self._trim_visible_messages()
         self.current_input = ""
         self.is_loading = True
         yield
@@ -68,8 +156,35 @@ class TutorState(rx.State):
             "weaknesses": diag_state.weaknesses,
             "quiz_performance": f"Correct: {lab_state.quiz_performance['correct']}, Total: {lab_state.quiz_performance['total']}",
         }
-        response_text = await generate_tutor_response(
-            user_msg, context, self.explanation_style, i18n.current_language
+        self.messages.append({"role": "assistant", "content": ""})
+        response_text = ""
+        pending_chunks = 0
+        last_flush = 0.0
+        try:
+            async for delta in stream_tutor_response(
+                user_msg,
+                context,
+                self.explanation_style,
+                i18n.current_language,
+                self._memory_turns,
+                self._memory_summary,
+            ):
+                response_text += delta
+                pending_chunks += 1
+                if (
+                    pending_chunks >= STREAM_FLUSH_CHUNKS
+                    or time.monotonic() - last_flush >= STREAM_FLUSH_SECONDS
+                ):
+                    self.messages[-1] = {"role": "assistant", "content": response_text}
+                    self.is_loading = False
+                    pending_chunks = 0
+                    last_flush = time.monotonic()
+                    yield
+        finally:
+            self.messages[-1] = {"role": "assistant", "content": response_text}
+            self.is_loading = False
+        self._memory_turns = self._memory_turns + exchange_turns(
+            user_msg, response_text
         )
-        self.messages.append({"role": "assistant", "content": response_text})
-        self.is_loading = False
\ No newline at end of file
+        if messages_to_fold(self._memory_turns) and time.time() >= self._fold_retry_at:
+            yield TutorState.fold_memory
\ No newline at end of file
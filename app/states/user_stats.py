@@ -20,6 +20,7 @@ class UserStatsState(rx.State):
     courses_completed: int = 1
     quizzes_completed: int = 12
     lessons_completed: int = 45
+    _progress_dirty: bool = False
     badges: list[Badge] = [
         {
             "id": "b1",
@@ -64,6 +65,7 @@ class UserStatsState(rx.State):
     def add_xp(self, amount: int, source: str):
         old_level = self.level_name
         self.xp_total += amount
+        self._progress_dirty = True
         self.xp_today += amount
         new_level = self.level_name
         if old_level != new_level:
@@ -83,6 +85,7 @@ class UserStatsState(rx.State):
                 "%Y-%m-%d"
             )
             self.current_streak += 1
+            self._progress_dirty = True
             if self.current_streak > self.longest_streak:
                 self.longest_streak = self.current_streak
             self.last_activity_date = today
@@ -113,6 +116,7 @@ class UserStatsState(rx.State):
                 "earned_date": datetime.now().strftime("%Y-%m-%d"),
             }
             self.badges.append(new_badge)
+            self._progress_dirty = True
             yield rx.toast(
                 f"🏆 New Badge: {new_badge['name']}!", duration=5000, close_button=True
             )
\ No newline at end of file
@@ -0,0 +1,12 @@
+import pytest
+from benchmarks.helpers import make_modules, make_review_items
+
+
+@pytest.fixture(params=[50, 5_000], ids=["realistic", "large"])
+def review_items(request) -> list[dict]:
+    return make_review_items(request.param)
+
+
+@pytest.fixture(params=[6, 500], ids=["realistic", "large"])
+def modules(request) -> list[dict]:
+    return make_modules(request.param)
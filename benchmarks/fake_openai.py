@@ -0,0 +1,271 @@
+"""
+Deterministic stand-in for the OpenAI chat completions API.
+
+Answers POST /v1/chat/completions with canned payloads shaped like the
+ones the generators in app/services ask for, after a latency drawn from a
+seeded log-normal distribution. Streamed requests are answered with
+server-sent events, one chunk per word.
+
+    python -m benchmarks.fake_openai --port 8001 --latency-ms 800
+
+Point the app at it with OPENAI_BASE_URL=http://127.0.0.1:8001/v1.
+"""
+
+import re
+import json
+import time
+import random
+import asyncio
+import hashlib
+import argparse
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+LESSON_PARAGRAPH = (
+    "This section explains the idea step by step, shows where it is used in "
+    "practice and points out the mistakes learners make most often. "
+)
+TUTOR_REPLY = (
+    "Good question. Think of it as a contract between the caller and the "
+    "function: the inputs you pass decide what comes back. Here is a short "
+    "example, then try changing one argument and predict the result before "
+    "running it again."
+)
+
+
+class LatencyModel:
+    """Log-normal latency with a given median, seeded for repeatable runs."""
+
+    def __init__(self, median_ms: float, sigma: float, token_ms: float, seed: int):
+        self.median_ms = median_ms
+        self.sigma = sigma
+        self.token_ms = token_ms
+        self._rng = random.Random(seed)
+
+    def first_byte(self) -> float:
+        if self.median_ms <= 0:
+            return 0.0
+        return self._rng.lognormvariate(0.0, self.sigma) * self.median_ms / 1000
+
+    def per_token(self) -> float:
+        return self.token_ms / 1000
+
+
+def _rng_for(prompt: str) -> random.Random:
+    digest = hashlib.sha256(prompt.encode("utf-8")).digest()
+    return random.Random(int.from_bytes(digest[:8], "big"))
+
+
+def _count(prompt: str, default: int) -> int:
+    match = re.search(r"exactly (\d+)", prompt)
+    return int(match.group(1)) if match else default
+
+
+def _options(rng: random.Random, prefix: str) -> tuple[list[dict], str]:
+    options = [{"id": o, "text": f"{prefix} option {o.upper()}"} for o in "abcd"]
+    return (options, rng.choice("abcd"))
+
+
+def _quiz_questions(rng: random.Random, count: int) -> list[dict]:
+    questions = []
+    for i in range(count):
+        options, correct = _options(rng, f"Quiz {i + 1}")
+        questions.append(
+            {
+                "id": f"q{i + 1}",
+                "question": f"Which statement about idea {rng.randint(1, 999)} holds?",
+                "difficulty": ("easy", "medium", "hard")[i % 3],
+                "explanation": "The correct option follows from the definition.",
+                "options": options,
+                "correct_id": correct,
+            }
+        )
+    return questions
+
+
+def _diagnostic_questions(rng: random.Random, count: int) -> list[dict]:
+    subtopics = ["Syntax", "Data Structures", "Control Flow", "Functions", "Testing"]
+    questions = _quiz_questions(rng, count)
+    for i, question in enumerate(questions):
+        question["subtopic"] = subtopics[i % len(subtopics)]
+    return questions
+
+
+def _modules(rng: random.Random) -> list[dict]:
+    statuses = ["completed", "active", "locked", "locked", "locked", "locked"]
+    return [
+        {
+            "id": f"m{i + 1}",
+            "title": f"Module {i + 1}: Topic {rng.randint(1, 99)}",
+            "description": "A short description of what this module covers.",
+            "status": status,
+            "progress": 100 if status == "completed" else 0,
+        }
+        for i, status in enumerate(statuses)
+    ]
+
+
+def _lesson(rng: random.Random) -> str:
+    sections = []
+    for i in range(6):
+        body = LESSON_PARAGRAPH * rng.randint(3, 6)
+        sections.append(f"## Part {i + 1}\n\n{body}")
+        sections.append("```python\ndef example(x):\n    return x * 2\n```\n")
+    return "\n\n".join(sections)
+
+
+def _translation(prompt: str) -> dict:
+    match = re.search(r"(\{\"strings\".*\})\s*$", prompt, re.DOTALL)
+    strings = json.loads(match.group(1))["strings"] if match else {}
+    return {"strings": {key: f"[es] {value}" for key, value in strings.items()}}
+
+
+def completion_text(messages: list[dict]) -> str:
+    """The canned reply for a conversation, picked by what its prompt asks for."""
+    prompt = messages[-1].get("content", "") if messages else ""
+    rng = _rng_for(prompt)
+    if "Translate every value in the 'strings' object" in prompt:
+        return json.dumps(_translation(prompt), ensure_ascii=False)
+    if "diagnostic assessment" in prompt:
+        questions = _diagnostic_questions(rng, _count(prompt, 24))
+        return json.dumps({"questions": questions})
+    if "key 'modules'" in prompt:
+        return json.dumps({"modules": _modules(rng)})
+    if '"quiz_questions": [' in prompt:
+        return json.dumps({"quiz_questions": _quiz_questions(rng, 10)})
+    if '"exercises": [' in prompt:
+        exercises = [
+            {
+                "id": f"e{i + 1}",
+                "prompt": f"Write a function double(x) that returns x * 2 ({i + 1}).",
+                "expected_answer": "def double(x):\n    return x * 2",
+            }
+            for i in range(10)
+        ]
+        return json.dumps({"exercises": exercises})
+    if '"flashcards": [' in prompt:
+        flashcards = [
+            {"id": f"f{i + 1}", "front": f"Term {i + 1}", "back": "Its definition."}
+            for i in range(10)
+        ]
+        return json.dumps({"flashcards": flashcards})
+    if '"content":' in prompt:
+        return json.dumps({"content": _lesson(rng)})
+    if "running summary of a tutoring conversation" in prompt:
+        return "The learner asked about functions and practised with examples."
+    if "encouraging sentence" in prompt:
+        return "Focus on the areas you missed while building on what you know."
+    return TUTOR_REPLY
+
+
+def _usage(messages: list[dict], text: str) -> dict:
+    prompt_tokens = sum(len(m.get("content", "")) for m in messages) // 4
+    completion_tokens = len(text) // 4
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+    }
+
+
+def create_app(latency: LatencyModel) -> Starlette:
+    counter = {"requests": 0}
+
+    async def chat_completions(request: Request):
+        body = await request.json()
+        counter["requests"] += 1
+        request_id = f"chatcmpl-{counter['requests']}"
+        model = body.get("model", "fake")
+        messages = body.get("messages", [])
+        text = completion_text(messages)
+        await asyncio.sleep(latency.first_byte())
+        created = int(time.time())
+        if not body.get("stream"):
+            return JSONResponse(
+                {
+                    "id": request_id,
+                    "object": "chat.completion",
+                    "created": created,
+                    "model": model,
+                    "choices": [
+                        {
+                            "index": 0,
+                            "message": {"role": "assistant", "content": text},
+                            "finish_reason": "stop",
+                        }
+                    ],
+                    "usage": _usage(messages, text),
+                }
+            )
+        include_usage = (body.get("stream_options") or {}).get("include_usage")
+
+        def chunk(delta: dict, finish_reason: str | None = None) -> str:
+            payload = {
+                "id": request_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [
+                    {"index": 0, "delta": delta, "finish_reason": finish_reason}
+                ],
+            }
+            return f"data: {json.dumps(payload)}\n\n"
+
+        async def events():
+            yield chunk({"role": "assistant", "content": ""})
+            for word in re.findall(r"\S+\s*", text):
+                await asyncio.sleep(latency.per_token())
+                yield chunk({"content": word})
+            yield chunk({}, "stop")
+            if include_usage:
+                payload = {
+                    "id": request_id,
+                    "object": "chat.completion.chunk",
+                    "created": created,
+                    "model": model,
+                    "choices": [],
+                    "usage": _usage(messages, text),
+                }
+                yield f"data: {json.dumps(payload)}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    async def stats(request: Request):
+        return JSONResponse(counter)
+
+    return Starlette(
+        routes=[
+            Route("/v1/chat/completions", chat_completions, methods=["POST"]),
+            Route("/stats", stats),
+        ]
+    )
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument(
+        "--latency-ms", type=float, default=800, help="median time to first byte"
+    )
+    parser.add_argument(
+        "--sigma", type=float, default=0.4, help="log-normal spread of the latency"
+    )
+    parser.add_argument(
+        "--token-ms", type=float, default=15, help="delay between streamed chunks"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    latency = LatencyModel(args.latency_ms, args.sigma, args.token_ms, args.seed)
+    uvicorn.run(
+        create_app(latency), host=args.host, port=args.port, log_level="warning"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+import random
+from datetime import datetime, timedelta
+
+SEED = 1234
+
+
+def make_state(state_cls, **values):
+    """A standalone state instance, outside any app or session, with `values` set."""
+    state = state_cls(_reflex_internal_init=True)
+    for name, value in values.items():
+        setattr(state, name, value)
+    return state
+
+
+def compute(state, var_name: str):
+    """Evaluates a computed var from scratch, bypassing Reflex's cached value."""
+    return type(state).computed_vars[var_name].fget(state)
+
+
+def make_review_items(count: int, due_fraction: float = 0.3) -> list[dict]:
+    rng = random.Random(SEED)
+    now = datetime.now()
+    items = []
+    for i in range(count):
+        if rng.random() < due_fraction:
+            due = now - timedelta(days=rng.randint(0, 30), minutes=rng.randint(0, 600))
+        else:
+            due = now + timedelta(days=rng.randint(1, 120))
+        items.append(
+            {
+                "id": f"r{i}",
+                "concept": f"Concept {i}",
+                "definition": f"Definition of concept {i}. " * 4,
+                "topic": f"Topic {i % 12}",
+                "module_id": f"m{i % 8}",
+                "next_review_date": due.isoformat(),
+                "interval_days": rng.randint(0, 60),
+                "ease_factor": round(rng.uniform(1.3, 2.8), 2),
+                "repetitions": rng.randint(0, 8),
+            }
+        )
+    return items
+
+
+def make_modules(count: int) -> list[dict]:
+    rng = random.Random(SEED)
+    modules = []
+    for i in range(count):
+        status = rng.choice(("completed", "active", "locked"))
+        modules.append(
+            {
+                "id": f"m{i}",
+                "title": f"Module {i}",
+                "description": "Generated module description. " * 3,
+                "status": status,
+                "progress": 100 if status == "completed" else rng.randint(0, 99),
+            }
+        )
+    return modules
+
+
+def make_quiz_payload(count: int, string_options: bool = False) -> list[dict]:
+    """Quiz questions as the model returns them, in either options format."""
+    rng = random.Random(SEED)
+    questions = []
+    for i in range(count):
+        texts = [f"Option {o} for question {i} " * 3 for o in "ABCD"]
+        options = (
+            texts
+            if string_options
+            else [{"id": o.upper(), "text": t} for o, t in zip("abcd", texts)]
+        )
+        questions.append(
+            {
+                "id": f"q{i}",
+                "question": f"Generated question {i} about a concept? " * 2,
+                "difficulty": rng.choice(("easy", "medium", "hard")),
+                "explanation": "Because of the reason explained in the lesson. " * 5,
+                "options": options,
+                "correct_id": rng.choice("abcd"),
+            }
+        )
+    return questions
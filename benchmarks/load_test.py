@@ -0,0 +1,415 @@
+"""
+Load test for the SkillForge service layer.
+
+Simulates learners going through onboarding, the adaptive diagnostic, course
+generation, a lab module (lesson, practice answer, code run, quiz, tutor chat)
+and a review session, calling the same services the event handlers call.
+Unless --base-url is given, a fake OpenAI server from benchmarks.fake_openai
+is started, so the numbers measure the app's own overhead plus the
+configured model latency.
+
+    python -m benchmarks.load_test --learners 200 --concurrency 50
+
+Reports throughput, p50/p95/p99 latency per step and memory per session.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import signal
+import asyncio
+import argparse
+import resource
+import tempfile
+import subprocess
+import tracemalloc
+from collections import defaultdict
+from contextlib import asynccontextmanager
+import numpy as np
+
+TOPICS = [
+    "Python programming",
+    "Rust ownership",
+    "SQL databases",
+    "Neural networks",
+    "AWS fundamentals",
+    "Spanish grammar",
+]
+LEARNER_CODE = "def double(x):\n    return x + x\n"
+
+
+class Recorder:
+    """Collects the latency and outcome of every step of every learner."""
+
+    def __init__(self):
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+
+    @asynccontextmanager
+    async def step(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.errors[name] += 1
+            raise
+        finally:
+            self.latencies[name].append(time.perf_counter() - start)
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        rows = {}
+        for name, values in self.latencies.items():
+            samples = np.array(values) * 1000
+            rows[name] = {
+                "count": len(values),
+                "errors": self.errors.get(name, 0),
+                "mean_ms": float(samples.mean()),
+                "p50_ms": float(np.percentile(samples, 50)),
+                "p95_ms": float(np.percentile(samples, 95)),
+                "p99_ms": float(np.percentile(samples, 99)),
+                "max_ms": float(samples.max()),
+            }
+        return rows
+
+
+async def run_learner(index: int, args, recorder: Recorder, sessions: dict):
+    from app.services.adaptive_testing import (
+        estimate_ability,
+        item_location,
+        probability_correct,
+        select_next_item,
+        should_stop,
+    )
+    from app.services.ai_generator import generate_module_content
+    from app.services.code_runner import get_code_runner
+    from app.services.diagnostic_generator import (
+        generate_adaptive_curriculum,
+        generate_diagnostic_questions,
+        phrase_recommended_focus,
+    )
+    from app.services.diagnostic_scoring import canonical_subtopics, score_diagnostic
+    from app.services.grader import grade_text
+    from app.services.progress_store import get_progress_writer, serialize_section
+    from app.services.question_bank import get_question_bank
+    from app.services.srs_scheduler import review_deck
+    from app.services.translation import CANONICAL_LANGUAGE
+    from app.services.tutor_generator import stream_tutor_response
+
+    rng = random.Random(args.seed * 100003 + index)
+    topic = TOPICS[index % args.topics]
+    language = args.languages[index % len(args.languages)]
+    ability = rng.gauss(0, 1)
+    bank = get_question_bank()
+    session: dict = {"topic": topic, "language": language}
+    sessions[index] = session
+
+    async with recorder.step("onboarding.diagnostic_bank"):
+        items = await generate_diagnostic_questions(topic, language)
+    asked: set[str] = set()
+    subtopics: list[str] = []
+    responses: list[tuple[float, bool]] = []
+    answers: list[dict] = []
+    theta, se = estimate_ability(responses)
+    while not should_stop(len(responses), se, len(items)):
+        async with recorder.step("diagnostic.answer_question"):
+            item = select_next_item(items, asked, theta, subtopics)
+            if item is None:
+                break
+            location = item_location(item)
+            correct = rng.random() < float(probability_correct(ability, location))
+            asked.add(item["id"])
+            subtopics.append(item.get("subtopic"))
+            responses.append((location, correct))
+            answers.append({"question_id": item["id"], "is_correct": correct})
+            await bank.record_response(item["id"], correct)
+            theta, se = estimate_ability(responses)
+    async with recorder.step("diagnostic.complete"):
+        results = score_diagnostic(items, answers, language, theta)
+        results["recommended_focus"] = await phrase_recommended_focus(
+            topic, results, language
+        )
+    session["diagnostic"] = results
+
+    async with recorder.step("course.generate_path"):
+        analysis = score_diagnostic(
+            canonical_subtopics(items), answers, CANONICAL_LANGUAGE, theta
+        )
+        modules = await generate_adaptive_curriculum(topic, analysis, language)
+    session["modules"] = modules
+    title = modules[0]["title"] if modules else "Introduction"
+
+    async with recorder.step("lab.load_module"):
+        module = await generate_module_content(topic, title, language)
+    session["module"] = module
+    exercise = (module.get("exercises") or [{}])[0]
+    async with recorder.step("lab.check_answer"):
+        expected = exercise.get("expected_answer", "")
+        grade_text(expected, expected)
+    if not args.skip_sandbox:
+        async with recorder.step("lab.run_code"):
+            await get_code_runner().run(LEARNER_CODE)
+    for question in (module.get("quiz_questions") or [])[: args.quiz_answers]:
+        async with recorder.step("lab.submit_quiz"):
+            correct = rng.random() < 0.7
+            await bank.record_response(question["id"], correct)
+    context = {
+        "topic": topic,
+        "module_title": title,
+        "module_content": module.get("content", ""),
+    }
+    history: list[dict] = []
+    for turn in range(args.tutor_messages):
+        message = f"Can you explain part {turn + 1} again?"
+        reply = ""
+        async with recorder.step("tutor.send_message"):
+            async for delta in stream_tutor_response(
+                message, context, "simple", language, history
+            ):
+                reply += delta
+        history += [
+            {"role": "user", "content": message},
+            {"role": "assistant", "content": reply},
+        ]
+    session["chat"] = history
+
+    async with recorder.step("review.complete_session"):
+        now = time.strftime("%Y-%m-%dT%H:%M:%S")
+        cards = [
+            {
+                "concept": card.get("front", ""),
+                "definition": card.get("back", ""),
+                "next_review_date": now,
+                "interval_days": 0,
+                "ease_factor": 2.5,
+                "repetitions": 0,
+            }
+            for card in module.get("flashcards") or []
+        ]
+        qualities = np.array([rng.randint(2, 5) for _ in cards])
+        session["reviews"] = review_deck(cards, qualities)
+
+    async with recorder.step("auth.save_user_progress"):
+        sections = {
+            "diagnostic": serialize_section(results),
+            "course": serialize_section({"topic": topic, "modules": modules}),
+            "reviews": serialize_section({"items": session["reviews"]}),
+        }
+        get_progress_writer().enqueue(f"learner{index}@example.com", sections)
+
+
+def _start_fake_server(args, log_path: str) -> tuple[subprocess.Popen, str]:
+    import socket
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    with open(log_path, "wb") as log:
+        process = subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "benchmarks.fake_openai",
+                "--port",
+                str(port),
+                "--latency-ms",
+                str(args.latency_ms),
+                "--sigma",
+                str(args.sigma),
+                "--token-ms",
+                str(args.token_ms),
+                "--seed",
+                str(args.seed),
+            ],
+            cwd=root,
+            stderr=log,
+        )
+    return (process, f"http://127.0.0.1:{port}/v1")
+
+
+async def _wait_for_server(
+    base_url: str,
+    process: subprocess.Popen | None = None,
+    log_path: str | None = None,
+    timeout: float = 15.0,
+):
+    """
+    Waits for the OpenAI server to answer. Fails straight away with the fake
+    server's error output if `process` exits before it does.
+    """
+    import httpx
+
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while True:
+            try:
+                await client.get(base_url.rsplit("/v1", 1)[0] + "/stats")
+                return
+            except httpx.TransportError:
+                if process is not None and process.poll() is not None:
+                    with open(log_path, encoding="utf-8", errors="replace") as log:
+                        output = log.read().strip()
+                    raise RuntimeError(
+                        f"Fake OpenAI server exited with code {process.returncode}:"
+                        f"\n{output}"
+                    )
+                if time.monotonic() > deadline:
+                    raise RuntimeError(f"No OpenAI server answering at {base_url}")
+                await asyncio.sleep(0.1)
+
+
+def _rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def run(args) -> dict:
+    from app.services.code_runner import code_runner_lifespan
+    from app.services.openai_client import openai_client_lifespan
+    from app.services.progress_store import progress_store_lifespan
+    from app.services.question_bank import question_bank_lifespan
+
+    recorder = Recorder()
+    sessions: dict[int, dict] = {}
+    semaphore = asyncio.Semaphore(args.concurrency)
+    failures = 0
+
+    async def guarded(index: int):
+        nonlocal failures
+        async with semaphore:
+            try:
+                await run_learner(index, args, recorder, sessions)
+            except Exception as e:
+                failures += 1
+                print(f"learner {index} failed: {e!r}", file=sys.stderr)
+
+    async with (
+        openai_client_lifespan(),
+        progress_store_lifespan(),
+        question_bank_lifespan(),
+        code_runner_lifespan(),
+    ):
+        rss_before = _rss_mb()
+        if args.trace_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        await asyncio.gather(*(guarded(i) for i in range(args.learners)))
+        elapsed = time.perf_counter() - start
+        traced = tracemalloc.get_traced_memory()[0] if args.trace_memory else None
+        rss_after = _rss_mb()
+    steps = recorder.summary()
+    completed = args.learners - failures
+    report = {
+        "learners": args.learners,
+        "concurrency": args.concurrency,
+        "completed": completed,
+        "failed": failures,
+        "elapsed_s": elapsed,
+        "learners_per_s": completed / elapsed if elapsed else 0.0,
+        "steps_per_s": sum(s["count"] for s in steps.values()) / elapsed
+        if elapsed
+        else 0.0,
+        "peak_rss_mb": rss_after,
+        "rss_growth_per_session_kb": (rss_after - rss_before)
+        * 1024
+        / max(completed, 1),
+        "steps": steps,
+    }
+    if traced is not None:
+        report["traced_per_session_kb"] = traced / 1024 / max(len(sessions), 1)
+    return report
+
+
+def print_report(report: dict):
+    print(
+        f"{report['completed']}/{report['learners']} learners in "
+        f"{report['elapsed_s']:.1f}s at concurrency {report['concurrency']}: "
+        f"{report['learners_per_s']:.2f} learners/s, "
+        f"{report['steps_per_s']:.1f} steps/s"
+    )
+    print(
+        f"peak RSS {report['peak_rss_mb']:.0f} MB, "
+        f"RSS growth {report['rss_growth_per_session_kb']:.1f} KB/session"
+        + (
+            f", traced {report['traced_per_session_kb']:.1f} KB/session"
+            if "traced_per_session_kb" in report
+            else ""
+        )
+    )
+    header = (
+        f"{'step':32} {'count':>6} {'err':>4} "
+        f"{'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}"
+    )
+    print(header)
+    print("-" * len(header))
+    for name, row in sorted(report["steps"].items()):
+        print(
+            f"{name:32} {row['count']:>6} {row['errors']:>4} {row['p50_ms']:>9.1f} "
+            f"{row['p95_ms']:>9.1f} {row['p99_ms']:>9.1f} {row['max_ms']:>9.1f}"
+        )
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--learners", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=25)
+    parser.add_argument(
+        "--topics", type=int, default=3, help="distinct topics learners share"
+    )
+    parser.add_argument(
+        "--languages", type=lambda v: v.split(","), default=["en", "es"]
+    )
+    parser.add_argument("--quiz-answers", type=int, default=5)
+    parser.add_argument("--tutor-messages", type=int, default=2)
+    parser.add_argument("--skip-sandbox", action="store_true")
+    parser.add_argument(
+        "--base-url", help="use a running OpenAI-compatible server instead"
+    )
+    parser.add_argument("--latency-ms", type=float, default=800)
+    parser.add_argument("--sigma", type=float, default=0.4)
+    parser.add_argument("--token-ms", type=float, default=15)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--data-dir", help="directory for cache and store files (default: fresh)"
+    )
+    parser.add_argument(
+        "--trace-memory", action="store_true", help="also measure with tracemalloc"
+    )
+    parser.add_argument("--json", help="write the report to this file")
+    args = parser.parse_args(argv)
+    args.topics = max(1, min(args.topics, len(TOPICS)))
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    data_dir = args.data_dir or tempfile.mkdtemp(prefix="skillforge-load-")
+    process = None
+    log_path = os.path.join(data_dir, "fake_openai.log")
+    base_url = args.base_url
+    if base_url is None:
+        process, base_url = _start_fake_server(args, log_path)
+    os.environ["OPENAI_BASE_URL"] = base_url
+    os.environ.setdefault("OPENAI_API_KEY", "load-test")
+    for name, filename in (
+        ("SKILLFORGE_CACHE_PATH", "cache.db"),
+        ("SKILLFORGE_QUESTION_BANK_PATH", "questions.db"),
+        ("SKILLFORGE_PROGRESS_DB_PATH", "progress.db"),
+    ):
+        os.environ[name] = os.path.join(data_dir, filename)
+    try:
+        asyncio.run(_wait_for_server(base_url, process, log_path))
+        report = asyncio.run(run(args))
+    finally:
+        if process is not None:
+            process.send_signal(signal.SIGINT)
+            process.wait(timeout=10)
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+import pytest
+from app.states.review import ReviewState
+from app.states.courses import CourseState
+from app.states.user_stats import UserStatsState
+from benchmarks.helpers import compute, make_state
+
+
+@pytest.fixture
+def review_state(review_items):
+    state = make_state(ReviewState, review_items=review_items)
+    state._rebuild_due_index()
+    return state
+
+
+def test_pending_reviews(benchmark, review_state):
+    pending = benchmark(compute, review_state, "pending_reviews")
+    assert all(item["id"] for item in pending)
+
+
+def test_pending_count(benchmark, review_state):
+    count = benchmark(compute, review_state, "pending_count")
+    assert count == len(compute(review_state, "pending_reviews"))
+
+
+def test_current_item(benchmark, review_state):
+    benchmark(compute, review_state, "current_item")
+
+
+def test_pending_reviews_without_index(benchmark, review_items):
+    """
+    Items replaced without rebuilding the index are re-sorted by due date
+    and re-mapped by id on every evaluation.
+    """
+    state = make_state(ReviewState, review_items=review_items)
+    benchmark(compute, state, "pending_reviews")
+
+
+@pytest.mark.parametrize(
+    "var_name",
+    ["overall_progress", "completed_count", "total_count", "is_course_complete"],
+)
+def test_course_progress(benchmark, modules, var_name):
+    state = make_state(CourseState, modules=modules)
+    benchmark(compute, state, var_name)
+
+
+@pytest.mark.parametrize("xp_total", [120, 1_250, 4_999, 250_000])
+@pytest.mark.parametrize("var_name", ["level_name", "level_progress", "next_level_xp"])
+def test_level(benchmark, xp_total, var_name):
+    state = make_state(UserStatsState, xp_total=xp_total)
+    benchmark(compute, state, var_name)
@@ -0,0 +1,32 @@
+import pytest
+from app.states.lab import LabState
+from benchmarks.helpers import make_quiz_payload
+
+
+@pytest.mark.parametrize("count", [10, 1_000], ids=["realistic", "large"])
+@pytest.mark.parametrize("string_options", [False, True], ids=["objects", "strings"])
+def test_normalize_quiz_questions(benchmark, count, string_options):
+    payload = make_quiz_payload(count, string_options)
+    normalized = benchmark(LabState._normalize_quiz_questions, None, payload)
+    assert len(normalized) == count
+    assert all(q["correct_id"] for q in normalized)
+
+
+@pytest.mark.parametrize("count", [10, 1_000], ids=["realistic", "large"])
+def test_normalize_exercises(benchmark, count):
+    payload = [
+        {"id": f"e{i}", "task": f"Write function {i}.", "solution": "pass"}
+        for i in range(count)
+    ]
+    normalized = benchmark(LabState._normalize_exercises, None, payload)
+    assert normalized[0]["prompt"] == "Write function 0."
+
+
+@pytest.mark.parametrize("count", [10, 1_000], ids=["realistic", "large"])
+def test_normalize_flashcards(benchmark, count):
+    payload = [
+        {"id": f"f{i}", "term": f"Term {i}", "definition": "Meaning."}
+        for i in range(count)
+    ]
+    normalized = benchmark(LabState._normalize_flashcards, None, payload)
+    assert normalized[0]["front"] == "Term 0"
@@ -0,0 +1,38 @@
+import random
+from app.services.adaptive_testing import (
+    estimate_ability,
+    item_location,
+    probability_correct,
+    select_next_item,
+    should_stop,
+)
+
+BANK = [
+    {"id": f"{difficulty}-{i}", "difficulty": difficulty, "subtopic": f"s{i % 4}"}
+    for difficulty in ("easy", "medium", "hard")
+    for i in range(8)
+]
+FIXED_TEST_LENGTH = 8
+
+
+def simulated_test_length(ability: float, rng: random.Random) -> int:
+    asked: set[str] = set()
+    subtopics: list[str] = []
+    responses: list[tuple[float, bool]] = []
+    theta, se = estimate_ability(responses)
+    while not should_stop(len(responses), se, len(BANK)):
+        item = select_next_item(BANK, asked, theta, subtopics)
+        location = item_location(item)
+        correct = rng.random() < float(probability_correct(ability, location))
+        asked.add(item["id"])
+        subtopics.append(item["subtopic"])
+        responses.append((location, correct))
+        theta, se = estimate_ability(responses)
+    return len(responses)
+
+
+def test_adaptive_test_is_shorter_than_fixed_test():
+    rng = random.Random(7)
+    lengths = [simulated_test_length(rng.gauss(0, 1), rng) for _ in range(300)]
+    assert sum(lengths) / len(lengths) < FIXED_TEST_LENGTH
+    assert max(lengths) <= FIXED_TEST_LENGTH
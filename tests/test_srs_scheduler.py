@@ -0,0 +1,39 @@
+from datetime import datetime
+from app.services.srs_scheduler import item_repetitions, review_deck
+
+NOW = datetime(2024, 1, 1, 9, 0)
+
+
+def legacy_item(interval_days: int) -> dict:
+    return {
+        "id": f"legacy-{interval_days}",
+        "next_review_date": NOW.isoformat(),
+        "interval_days": interval_days,
+        "ease_factor": 2.5,
+    }
+
+
+def test_repetitions_inferred_from_interval():
+    assert [item_repetitions(legacy_item(d)) for d in (0, 1, 4, 6, 30)] == [
+        0,
+        1,
+        2,
+        2,
+        3,
+    ]
+
+
+def test_stored_repetitions_are_kept():
+    assert item_repetitions({**legacy_item(30), "repetitions": 7}) == 7
+
+
+def test_mature_legacy_card_keeps_growing():
+    (reviewed,) = review_deck([legacy_item(30)], [4], now=NOW)
+    assert reviewed["repetitions"] == 4
+    assert reviewed["interval_days"] == 75
+
+
+def test_failed_legacy_card_restarts():
+    (reviewed,) = review_deck([legacy_item(30)], [1], now=NOW)
+    assert reviewed["repetitions"] == 0
+    assert reviewed["interval_days"] == 1
@@ -0,0 +1,39 @@
+import asyncio
+from types import SimpleNamespace
+import app.services.tutor_generator as tutor_generator
+from app.services.tutor_generator import (
+    FALLBACK_RESPONSE,
+    exchange_turns,
+    stream_tutor_response,
+)
+
+
+def failing_client():
+    async def create(**kwargs):
+        raise ConnectionError("model unavailable")
+
+    return SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(create=create))
+    )
+
+
+async def collect(stream) -> str:
+    return "".join([delta async for delta in stream])
+
+
+def test_failed_stream_is_not_remembered_as_a_reply(monkeypatch):
+    monkeypatch.setattr(tutor_generator, "get_client", failing_client)
+    reply = asyncio.run(
+        collect(stream_tutor_response("What is a pointer?", {}, "simple"))
+    )
+    assert reply == FALLBACK_RESPONSE
+    assert exchange_turns("What is a pointer?", reply) == [
+        {"role": "user", "content": "What is a pointer?"}
+    ]
+
+
+def test_real_reply_is_remembered():
+    assert exchange_turns("What is a pointer?", "An address.") == [
+        {"role": "user", "content": "What is a pointer?"},
+        {"role": "assistant", "content": "An address."},
+    ]